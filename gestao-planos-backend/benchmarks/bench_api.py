@@ -0,0 +1,204 @@
+"""Benchmark da API de beneficiários com o test client do Flask.
+
+Para cada tamanho de base (gerada por gerar_dados.py e reaproveitada entre
+execuções em --dados), mede listagem, filtros, busca, consulta, inclusão,
+alteração e exportações. O resultado é um JSON que pode ser comparado com
+o de outro commit.
+
+Uso:
+    python benchmarks/bench_api.py --tamanhos 10000,100000 --saida atual.json
+    python benchmarks/bench_api.py --tamanhos 10000 --comparar atual.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gerar_dados import gerar_cpf, popular  # noqa: E402
+
+from sqlalchemy import select  # noqa: E402
+
+from src.database.database import db  # noqa: E402
+from src.models.beneficiario import Beneficiario  # noqa: E402
+from src.main import create_app, inicializar_banco  # noqa: E402
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DADOS_PADRAO = os.path.join(RAIZ, 'instance', 'benchmarks')
+
+
+def novo_beneficiario(indice, total):
+    return {
+        'nome_completo': f'Benchmark {indice} Souza', 'data_nascimento': '1990-05-17', 'sexo': 'F',
+        'cpf': gerar_cpf(total + indice), 'rg': '12345678', 'orgao_emissor_rg': 'SSP',
+        'data_emissao_rg': '2010-01-01', 'nome_mae': 'Maria Souza', 'estado_civil': 'Solteiro',
+        'logradouro': 'Rua das Palmeiras', 'numero_endereco': '100', 'bairro': 'Centro',
+        'cidade': 'São Paulo', 'uf': 'SP', 'cep': '01001-000', 'telefone_celular': '11999990000',
+        'email': f'bench{indice}@exemplo.com.br', 'plano_saude_vinculado': 'Plano Ouro',
+        'data_inicio_cobertura': '2024-01-01', 'tipo_beneficiario': 'Titular',
+        'numero_carteira_plano': f'CARTB{indice:08d}', 'data_adesao_plano': '2024-01-01'
+    }
+
+
+def cenarios(total, ids):
+    """(nome, repetições, função(cliente, i) -> resposta, status esperado)
+
+    `ids` são beneficiários ativos usados nas consultas e alterações.
+    """
+    return [
+        ('listar', None, lambda c, i: c.get('/api/beneficiarios?per_page=20'), 200),
+        ('listar_pagina_profunda', None,
+         lambda c, i: c.get(f'/api/beneficiarios?per_page=20&page={max(total // 40, 1)}'), 200),
+        ('listar_cursor', None, lambda c, i: c.get('/api/beneficiarios?per_page=20&cursor='), 200),
+        ('listar_projecao', None, lambda c, i: c.get(
+            '/api/beneficiarios?per_page=100&fields=id,matricula,nome_completo,cpf,situacao_cadastral'), 200),
+        ('filtrar_situacao', None, lambda c, i: c.get('/api/beneficiarios?situacao=Suspenso&per_page=20'), 200),
+        ('filtrar_nome', None, lambda c, i: c.get('/api/beneficiarios?nome=silva&per_page=20'), 200),
+        ('buscar', None, lambda c, i: c.get('/api/beneficiarios?q=Araújo&per_page=20'), 200),
+        ('obter', None, lambda c, i: c.get(f'/api/beneficiarios/{ids[i]}'), 200),
+        ('historico', None, lambda c, i: c.get(f'/api/beneficiarios/{ids[i]}/historico'), 200),
+        ('estatisticas', None, lambda c, i: c.get('/api/beneficiarios/estatisticas'), 200),
+        ('criar', None, lambda c, i: c.post('/api/beneficiarios', json=novo_beneficiario(i, total)), 201),
+        ('atualizar', None, lambda c, i: c.put(
+            f'/api/beneficiarios/{ids[i]}', json={'telefone_celular': f'1198888{i:04d}'}), 200),
+        ('exportar_csv', 3, lambda c, i: c.get('/api/beneficiarios/export/csv?situacao=Suspenso'), 200),
+        ('exportar_pdf', 3, lambda c, i: c.get('/api/beneficiarios/export/pdf?situacao=Cancelado'), 200),
+    ]
+
+
+def preparar_base(diretorio, total):
+    """Arquivo SQLite com `total` beneficiários, gerado uma vez e reaproveitado"""
+    os.makedirs(diretorio, exist_ok=True)
+    arquivo = os.path.join(diretorio, f'beneficiarios_{total}.db')
+    if not os.path.exists(arquivo):
+        temporario = arquivo + '.tmp'
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{temporario}'})
+        inicio = time.perf_counter()
+        with app.app_context():
+            db.create_all()
+            popular(total)
+            inicializar_banco()
+            # Fechar todas as conexões aplica o WAL ao arquivo antes de renomeá-lo
+            db.session.remove()
+            db.engine.dispose()
+        print(f'base de {total} gerada em {time.perf_counter() - inicio:.1f}s', file=sys.stderr)
+        os.replace(temporario, arquivo)
+    return arquivo
+
+
+def medir(base, total, repeticoes, filtro):
+    # Cópia descartável: os cenários de escrita não alteram a base gerada
+    copia = base + '.execucao'
+    shutil.copyfile(base, copia)
+    try:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{copia}',
+            'CACHE_BACKEND': 'desativado',  # mede o trabalho real, não o cache
+            'RELATORIO_PDF_WORKERS': 1,
+        })
+        cliente = app.test_client()
+        with app.app_context():
+            ids = db.session.scalars(
+                select(Beneficiario.id).where(Beneficiario.ativo.is_(True), Beneficiario.id >= total // 2)
+                .order_by(Beneficiario.id).limit(repeticoes + 1)
+            ).all()
+        resultados = {}
+        for nome, vezes, requisicao, esperado in cenarios(total, ids):
+            if filtro and nome not in filtro:
+                continue
+            vezes = vezes or repeticoes
+            requisicao(cliente, 0)  # aquecimento
+            tempos = []
+            for i in range(1, vezes + 1):
+                inicio = time.perf_counter()
+                resposta = requisicao(cliente, i)
+                resposta.get_data()  # consome respostas em streaming
+                tempos.append((time.perf_counter() - inicio) * 1000)
+                if resposta.status_code != esperado:
+                    raise RuntimeError(f'{nome}: status {resposta.status_code}, esperado {esperado}')
+            tempos.sort()
+            resultados[nome] = {
+                'repeticoes': vezes,
+                'mediana_ms': round(statistics.median(tempos), 3),
+                'p95_ms': round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 3),
+                'min_ms': round(tempos[0], 3),
+                'max_ms': round(tempos[-1], 3),
+            }
+            print(f'{total:>9} {nome:<24} {resultados[nome]["mediana_ms"]:>10.2f} ms', file=sys.stderr)
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        return resultados
+    finally:
+        for sufixo in ('', '-wal', '-shm'):
+            if os.path.exists(copia + sufixo):
+                os.remove(copia + sufixo)
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual, anterior):
+    """Variação percentual da mediana por cenário, em relação a `anterior`"""
+    print(f"{'tamanho':>9} {'cenário':<24} {'anterior':>10} {'atual':>10} {'variação':>9}")
+    for tamanho, cenarios_atuais in atual['resultados'].items():
+        for nome, medida in cenarios_atuais.items():
+            referencia = anterior['resultados'].get(tamanho, {}).get(nome)
+            if not referencia:
+                continue
+            antes, depois = referencia['mediana_ms'], medida['mediana_ms']
+            variacao = (depois - antes) / antes * 100 if antes else 0
+            print(f'{tamanho:>9} {nome:<24} {antes:>10.2f} {depois:>10.2f} {variacao:>+8.1f}%')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamanhos', default='10000', help='ex.: 10000,100000,1000000')
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--cenarios', default='', help='apenas estes cenários (separados por vírgula)')
+    parser.add_argument('--dados', default=DADOS_PADRAO, help='diretório das bases geradas')
+    parser.add_argument('--saida', help='arquivo JSON com os resultados')
+    parser.add_argument('--comparar', help='JSON de uma execução anterior')
+    args = parser.parse_args()
+
+    filtro = {nome for nome in args.cenarios.split(',') if nome}
+    resultado = {
+        'commit': commit_atual(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'repeticoes': args.repeticoes,
+        'resultados': {},
+    }
+    for total in (int(t) for t in args.tamanhos.split(',')):
+        base = preparar_base(args.dados, total)
+        resultado['resultados'][str(total)] = medir(base, total, args.repeticoes, filtro)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    else:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            comparar(resultado, json.load(arquivo))
+
+
+if __name__ == '__main__':
+    main()
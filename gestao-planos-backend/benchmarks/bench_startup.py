@@ -0,0 +1,79 @@
+"""Benchmark do tempo de inicialização de um worker (import + criação do app).
+
+Cada medição roda num processo Python novo, como um worker recém-criado
+do gunicorn, contra um banco SQLite temporário já inicializado.
+
+Uso:
+    python benchmarks/bench_startup.py [--execucoes 15] [--raiz CAMINHO]
+
+Para comparar com outra versão, aponte --raiz para um checkout dela, ex.:
+    git worktree add /tmp/antes <commit>
+    python benchmarks/bench_startup.py --raiz /tmp/antes/gestao-planos-backend
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ_PADRAO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executado em cada processo filho. Versões sem create_app criam o app no import.
+MEDICAO = """
+import sys, time
+inicio = time.perf_counter()
+import src.main as main
+app = main.create_app() if hasattr(main, 'create_app') else main.app
+fim = time.perf_counter()
+print(fim - inicio, int('reportlab' in sys.modules), len(sys.modules))
+"""
+
+INICIALIZACAO = """
+import src.main as main
+if hasattr(main, 'create_app'):
+    app = main.create_app()
+    with app.app_context():
+        main.inicializar_banco()
+"""
+
+
+def executar(raiz, codigo, ambiente):
+    resultado = subprocess.run(
+        [sys.executable, '-c', codigo], cwd=raiz, env=ambiente,
+        capture_output=True, text=True, check=True
+    )
+    return resultado.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--execucoes', type=int, default=15)
+    parser.add_argument('--raiz', default=RAIZ_PADRAO, help='diretório do backend (com src/)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        ambiente = dict(os.environ)
+        ambiente['DATABASE_URL'] = f"sqlite:///{os.path.join(diretorio, 'bench.db')}"
+        ambiente['PYTHONPATH'] = args.raiz
+        ambiente['PYTHONDONTWRITEBYTECODE'] = ''
+
+        # Prepara o banco e aquece o cache de bytecode antes de medir
+        executar(args.raiz, INICIALIZACAO, ambiente)
+        executar(args.raiz, MEDICAO, ambiente)
+
+        tempos = []
+        for _ in range(args.execucoes):
+            tempo, reportlab, modulos = executar(args.raiz, MEDICAO, ambiente)
+            tempos.append(float(tempo) * 1000)
+
+    print(f'raiz: {args.raiz}')
+    print(f'execuções: {args.execucoes}')
+    print(f'mediana: {statistics.median(tempos):.1f} ms  '
+          f'(mín {min(tempos):.1f} ms, máx {max(tempos):.1f} ms)')
+    print(f"reportlab carregado no boot: {'sim' if int(reportlab) else 'não'}")
+    print(f'módulos carregados: {modulos}')
+
+
+if __name__ == '__main__':
+    main()
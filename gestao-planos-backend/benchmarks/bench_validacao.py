@@ -0,0 +1,88 @@
+"""Benchmark da validação de CPF, CEP e data de nascimento: por registro x vetorizada.
+
+Compara os validadores de BeneficiarioSchema, chamados registro a registro,
+com src/schemas/validacao_lote sobre as mesmas colunas, confere que os
+erros encontrados são os mesmos e imprime a vazão de cada um.
+
+Uso:
+    python benchmarks/bench_validacao.py --registros 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gerar_dados import gerar_cpf  # noqa: E402
+
+from marshmallow import ValidationError  # noqa: E402
+
+from src.schemas.beneficiario_schema import BeneficiarioSchema  # noqa: E402
+from src.schemas.validacao_lote import erros_por_linha  # noqa: E402
+
+
+def gerar_registros(total, semente=42):
+    """Registros com ~10% de CPFs, CEPs e datas inválidos"""
+    aleatorio = random.Random(semente)
+    hoje = date.today()
+    registros = []
+    for indice in range(total):
+        cpf = gerar_cpf(indice)
+        if aleatorio.random() < 0.1:
+            cpf = cpf[:-1] + str((int(cpf[-1]) + 1) % 10)
+        cep = f'{aleatorio.randrange(10 ** 8):08d}'
+        cep = f'{cep[:5]}-{cep[5:]}' if aleatorio.random() < 0.9 else cep[:7]
+        nascimento = hoje - timedelta(days=aleatorio.randrange(-30, 30000))
+        registros.append({'cpf': cpf, 'cep': cep, 'data_nascimento': nascimento})
+    return registros
+
+
+def por_registro(registros):
+    schema = BeneficiarioSchema()
+    validadores = {
+        'cpf': schema.validate_cpf,
+        'cep': schema.validate_cep,
+        'data_nascimento': schema.validate_data_nascimento,
+    }
+    erros = {}
+    for indice, registro in enumerate(registros):
+        for campo, validador in validadores.items():
+            try:
+                validador(registro[campo])
+            except ValidationError as e:
+                erros.setdefault(indice, {})[campo] = e.messages
+    return erros
+
+
+def medir(funcao, registros, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(registros)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--registros', type=int, default=100000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    registros = gerar_registros(args.registros)
+    tempo_registro, esperado = medir(por_registro, registros, args.repeticoes)
+    tempo_lote, obtido = medir(erros_por_linha, registros, args.repeticoes)
+    if obtido != esperado:
+        raise SystemExit('A validação vetorizada encontrou erros diferentes da validação por registro')
+
+    print(f'{len(esperado)} de {args.registros} registros com erro (resultados idênticos)')
+    for nome, tempo in (('por registro', tempo_registro), ('vetorizada', tempo_lote)):
+        print(f'{nome:<13} {tempo * 1000:>9.1f} ms {args.registros / tempo:>12,.0f} registros/s')
+    print(f'ganho: {tempo_registro / tempo_lote:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
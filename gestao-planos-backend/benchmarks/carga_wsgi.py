@@ -0,0 +1,185 @@
+"""Teste de carga do app no gunicorn: requisições/s por número de workers.
+
+Para cada valor de --workers, sobe o gunicorn (gunicorn.conf.py, wsgi:app)
+sobre uma cópia de uma base gerada por gerar_dados.py, em modo WAL, e
+dispara requisições de leitura (listagem, consulta, histórico e busca em
+ids e páginas aleatórios) a partir de --clientes processos com conexões
+keep-alive. Imprime vazão e latências e o ganho em relação ao primeiro
+valor de --workers.
+
+Clientes e servidor disputam os mesmos núcleos: para medir a escala com
+precisão, rode os clientes em outra máquina com --url apontando para um
+gunicorn já em execução.
+
+Uso:
+    python benchmarks/carga_wsgi.py --workers 1,2,4,8 --clientes 16 --duracao 20
+    python benchmarks/carga_wsgi.py --url http://servidor:5002 --clientes 32
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def caminhos(total, aleatorio):
+    """Mistura de leituras; ids e páginas variam para não medir só o cache de respostas"""
+    beneficiario_id = aleatorio.randrange(1, total + 1)
+    return aleatorio.choice((
+        f'/api/beneficiarios?per_page=20&page={aleatorio.randrange(1, max(total // 20, 1) + 1)}',
+        f'/api/beneficiarios?per_page=20&situacao=Suspenso&nome={aleatorio.choice("abcdefg")}',
+        f'/api/beneficiarios/{beneficiario_id}',
+        f'/api/beneficiarios/{beneficiario_id}/historico',
+        f'/api/beneficiarios?q={aleatorio.choice(("Silva", "Souza", "Ana", "Lima"))}&per_page=20',
+    ))
+
+
+def cliente(url, total, duracao, semente, fila):
+    partes = urlsplit(url)
+    conexao = http.client.HTTPConnection(partes.hostname, partes.port or 80, timeout=30)
+    aleatorio = random.Random(semente)
+    latencias, erros = [], 0
+    fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        inicio = time.perf_counter()
+        try:
+            conexao.request('GET', caminhos(total, aleatorio))
+            resposta = conexao.getresponse()
+            resposta.read()
+            if resposta.status >= 500:  # 404 de ids removidos faz parte da mistura
+                erros += 1
+        except (OSError, http.client.HTTPException):
+            erros += 1
+            conexao.close()
+            continue
+        latencias.append(time.perf_counter() - inicio)
+    conexao.close()
+    fila.put((latencias, erros))
+
+
+def disparar(url, total, clientes, duracao):
+    fila = multiprocessing.Queue()
+    processos = [
+        multiprocessing.Process(target=cliente, args=(url, total, duracao, semente, fila))
+        for semente in range(clientes)
+    ]
+    for processo in processos:
+        processo.start()
+    latencias, erros = [], 0
+    for _ in processos:
+        parciais, erros_cliente = fila.get()
+        latencias.extend(parciais)
+        erros += erros_cliente
+    for processo in processos:
+        processo.join()
+    latencias.sort()
+    return {
+        'requisicoes': len(latencias),
+        'por_segundo': len(latencias) / duracao,
+        'mediana_ms': statistics.median(latencias) * 1000 if latencias else 0,
+        'p99_ms': latencias[int(len(latencias) * 0.99)] * 1000 if latencias else 0,
+        'erros': erros,
+    }
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def aguardar(processo, url, limite=60):
+    partes = urlsplit(url)
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        if processo.poll() is not None:
+            raise RuntimeError(f'o gunicorn terminou com código {processo.returncode}')
+        try:
+            conexao = http.client.HTTPConnection(partes.hostname, partes.port, timeout=2)
+            conexao.request('GET', '/api/beneficiarios?per_page=1')
+            if conexao.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('o gunicorn não respondeu a tempo')
+
+
+def subir_gunicorn(banco, workers, threads):
+    porta = porta_livre()
+    ambiente = dict(
+        os.environ,
+        DATABASE_URL=f'sqlite:///{banco}',
+        GUNICORN_BIND=f'127.0.0.1:{porta}',
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_THREADS=str(threads),
+        GUNICORN_ACCESSLOG='',  # sem log de acesso durante a medição
+        GUNICORN_MAX_REQUESTS='0',
+        GUNICORN_LOGLEVEL='warning',
+        HISTORICO_ARQUIVO_DIR=os.path.join(os.path.dirname(banco), 'arquivo_historico'),
+    )
+    processo = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'], cwd=RAIZ, env=ambiente
+    )
+    url = f'http://127.0.0.1:{porta}'
+    try:
+        aguardar(processo, url)
+    except Exception:
+        processo.terminate()
+        raise
+    return processo, url
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', default='1,2,4', help='valores de GUNICORN_WORKERS a medir')
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--clientes', type=int, default=8)
+    parser.add_argument('--duracao', type=float, default=15, help='segundos por medição')
+    parser.add_argument('--beneficiarios', type=int, default=10000)
+    parser.add_argument('--dados', default=os.path.join(RAIZ, 'instance', 'benchmarks'))
+    parser.add_argument('--url', help='servidor já em execução (não sobe o gunicorn)')
+    args = parser.parse_args()
+
+    if args.url:
+        resultado = disparar(args.url, args.beneficiarios, args.clientes, args.duracao)
+        print(f"{resultado['por_segundo']:.0f} req/s, mediana {resultado['mediana_ms']:.1f} ms, "
+              f"p99 {resultado['p99_ms']:.1f} ms, {resultado['erros']} erros")
+        return
+
+    from bench_api import preparar_base
+
+    base = preparar_base(args.dados, args.beneficiarios)
+    copia = base + '.carga'
+    referencia = None
+    print(f"{'workers':>7} {'req/s':>9} {'mediana':>10} {'p99':>10} {'erros':>6} {'ganho':>6}  "
+          f"({os.cpu_count()} núcleos, {args.clientes} clientes)")
+    for workers in (int(n) for n in args.workers.split(',')):
+        shutil.copyfile(base, copia)
+        processo, url = subir_gunicorn(copia, workers, args.threads)
+        try:
+            resultado = disparar(url, args.beneficiarios, args.clientes, args.duracao)
+        finally:
+            processo.terminate()
+            processo.wait()
+            for sufixo in ('', '-wal', '-shm'):
+                if os.path.exists(copia + sufixo):
+                    os.remove(copia + sufixo)
+        referencia = referencia or resultado['por_segundo']
+        print(f"{workers:>7} {resultado['por_segundo']:>9.0f} {resultado['mediana_ms']:>8.1f}ms "
+              f"{resultado['p99_ms']:>8.1f}ms {resultado['erros']:>6} "
+              f"{resultado['por_segundo'] / referencia:>5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
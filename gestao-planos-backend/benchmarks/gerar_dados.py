@@ -0,0 +1,188 @@
+"""Gerador de dados sintéticos de beneficiários para os benchmarks.
+
+Cria titulares e dependentes com CPFs válidos (mesmo cálculo de
+BeneficiarioSchema.validate_cpf) e o histórico de alterações, com
+inserts em massa direto na tabela. O resultado é determinístico para
+uma mesma semente.
+
+Uso:
+    python benchmarks/gerar_dados.py --beneficiarios 100000 --banco /tmp/bench.db
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from src.database.database import db  # noqa: E402
+from src.models.beneficiario import CAMPO_ALTERACOES, Beneficiario, HistoricoBeneficiario  # noqa: E402
+from src.schemas.beneficiario_schema import digitos_verificadores_cpf  # noqa: E402
+
+LOTE = 5000
+FRACAO_DEPENDENTES = 0.4
+ALTERACOES_POR_BENEFICIARIO = 2  # média de gravações após a criação
+
+NOMES = (
+    'Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Fernando', 'Gabriela', 'Henrique', 'Isabela',
+    'João', 'Larissa', 'Marcos', 'Natália', 'Otávio', 'Paula', 'Rafael', 'Sofia', 'Tiago',
+    'Vitória', 'Wagner', 'Yasmin', 'Cecília', 'Érico', 'Lúcia'
+)
+SOBRENOMES = (
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima',
+    'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Araújo', 'Melo', 'Barbosa', 'Conceição'
+)
+CIDADES = (('São Paulo', 'SP'), ('Rio de Janeiro', 'RJ'), ('Belo Horizonte', 'MG'), ('Curitiba', 'PR'),
+           ('Porto Alegre', 'RS'), ('Salvador', 'BA'), ('Recife', 'PE'), ('Goiânia', 'GO'))
+PLANOS = ('Plano Bronze', 'Plano Prata', 'Plano Ouro', 'Plano Diamante', 'Plano Empresarial')
+SITUACOES = (('Ativo', 85), ('Suspenso', 8), ('Cancelado', 5), ('Inativo', 2))
+ESTADOS_CIVIS = ('Solteiro', 'Casado', 'Divorciado', 'Viúvo', 'União Estável')
+PARENTESCOS = ('Cônjuge', 'Filho(a)', 'Filho(a)', 'Enteado(a)', 'Pai', 'Mãe')
+CAMPOS_ALTERADOS = ('telefone_celular', 'email', 'logradouro', 'plano_saude_vinculado', 'situacao_cadastral')
+
+
+def gerar_cpf(indice):
+    """CPF válido e único para cada índice, no formato 000.000.000-00"""
+    base = f'{100000000 + indice:09d}'
+    cpf = base + digitos_verificadores_cpf(base)
+    return f'{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}'
+
+
+class GeradorBeneficiarios:
+    """Monta as linhas de beneficiários e histórico para um banco vazio"""
+
+    def __init__(self, semente=42, agora=None):
+        self.aleatorio = random.Random(semente)
+        self.agora = agora or datetime(2025, 1, 1)
+        self._situacoes = [s for s, _ in SITUACOES]
+        self._pesos = [p for _, p in SITUACOES]
+
+    def data(self, inicio, fim):
+        return inicio + timedelta(days=self.aleatorio.randrange((fim - inicio).days))
+
+    def beneficiario(self, beneficiario_id, titular=None):
+        a = self.aleatorio
+        nome = f'{a.choice(NOMES)} {a.choice(SOBRENOMES)} {a.choice(SOBRENOMES)}'
+        cidade, uf = a.choice(CIDADES)
+        criacao = self.agora - timedelta(minutes=a.randrange(3 * 365 * 24 * 60))
+        situacao = a.choices(self._situacoes, self._pesos)[0]
+        inicio_cobertura = self.data(date(2015, 1, 1), criacao.date() + timedelta(days=1))
+        linha = {
+            'id': beneficiario_id,
+            'matricula': f'BEN{beneficiario_id:017d}',
+            'nome_completo': nome,
+            'data_nascimento': self.data(date(1940, 1, 1), date(2020, 1, 1)),
+            'sexo': a.choice(('M', 'F')),
+            'cpf': gerar_cpf(beneficiario_id),
+            'rg': f'{a.randrange(10 ** 8):08d}',
+            'orgao_emissor_rg': 'SSP',
+            'data_emissao_rg': self.data(date(2000, 1, 1), date(2024, 1, 1)),
+            'nome_mae': f'{a.choice(NOMES)} {a.choice(SOBRENOMES)}',
+            'estado_civil': a.choice(ESTADOS_CIVIS),
+            'nacionalidade': 'Brasileira',
+            'logradouro': f'Rua {a.choice(SOBRENOMES)}',
+            'numero_endereco': str(a.randrange(1, 3000)),
+            'complemento_endereco': a.choice((None, None, f'Apto {a.randrange(1, 200)}')),
+            'bairro': 'Centro',
+            'cidade': cidade,
+            'uf': uf,
+            'cep': f'{a.randrange(10 ** 8):08d}',
+            'telefone_fixo': a.choice((None, f'11{a.randrange(10 ** 8):08d}')),
+            'telefone_celular': f'11{a.randrange(10 ** 9):09d}',
+            'email': f'beneficiario{beneficiario_id}@exemplo.com.br',
+            'plano_saude_vinculado': titular['plano_saude_vinculado'] if titular else a.choice(PLANOS),
+            'data_inicio_cobertura': inicio_cobertura,
+            'data_termino_cobertura': None,
+            'situacao_cadastral': situacao,
+            'tipo_beneficiario': 'Dependente' if titular else 'Titular',
+            'grau_parentesco': a.choice(PARENTESCOS) if titular else None,
+            'id_titular': titular['id'] if titular else None,
+            'numero_carteira_plano': f'CART{beneficiario_id:010d}',
+            'data_adesao_plano': inicio_cobertura,
+            'data_cancelamento_plano': criacao.date() if situacao == 'Cancelado' else None,
+            'motivo_cancelamento': 'Solicitação do titular' if situacao == 'Cancelado' else None,
+            'data_criacao': criacao,
+            'data_atualizacao': criacao,
+            'ativo': situacao != 'Inativo',
+        }
+        return linha
+
+    def historico(self, linha):
+        """Registro de criação e algumas gravações posteriores (conjuntos de alterações)"""
+        a = self.aleatorio
+        registros = [{
+            'beneficiario_id': linha['id'], 'campo_alterado': 'CRIACAO', 'valor_antigo': None,
+            'valor_novo': 'Beneficiário criado', 'data_alteracao': linha['data_criacao'],
+            'usuario_alteracao': 'Sistema', 'alteracoes': None
+        }]
+        for n in range(a.randrange(ALTERACOES_POR_BENEFICIARIO * 2 + 1)):
+            campos = a.sample(CAMPOS_ALTERADOS, a.randrange(1, 4))
+            registros.append({
+                'beneficiario_id': linha['id'], 'campo_alterado': CAMPO_ALTERACOES,
+                'valor_antigo': None, 'valor_novo': None,
+                'data_alteracao': linha['data_criacao'] + timedelta(days=n + 1),
+                'usuario_alteracao': 'Sistema',
+                'alteracoes': {campo: [f'{campo} anterior', f'{campo} {n}'] for campo in campos}
+            })
+        return registros
+
+    def linhas(self, total):
+        """Gera (beneficiário, histórico) para `total` beneficiários, ids 1..total"""
+        titulares = []
+        for beneficiario_id in range(1, total + 1):
+            titular = None
+            if titulares and self.aleatorio.random() < FRACAO_DEPENDENTES:
+                titular = self.aleatorio.choice(titulares)
+            linha = self.beneficiario(beneficiario_id, titular)
+            if titular is None and linha['ativo']:
+                titulares.append({k: linha[k] for k in ('id', 'plano_saude_vinculado')})
+            yield linha, self.historico(linha)
+
+
+def popular(total, semente=42, progresso=None):
+    """Insere `total` beneficiários (e histórico) no banco vazio do app atual"""
+    if db.session.scalar(select(func.count(Beneficiario.id))):
+        raise RuntimeError('O banco já possui beneficiários')
+
+    gerador = GeradorBeneficiarios(semente)
+    beneficiarios, historicos = [], []
+    with db.engine.begin() as conexao:
+        for n, (linha, historico) in enumerate(gerador.linhas(total), start=1):
+            beneficiarios.append(linha)
+            historicos.extend(historico)
+            if len(beneficiarios) >= LOTE or n == total:
+                conexao.execute(insert(Beneficiario.__table__), beneficiarios)
+                conexao.execute(insert(HistoricoBeneficiario.__table__), historicos)
+                beneficiarios, historicos = [], []
+                if progresso:
+                    progresso(n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--beneficiarios', type=int, default=10000)
+    parser.add_argument('--banco', required=True, help='arquivo SQLite a criar')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    from src.main import create_app, inicializar_banco
+
+    if os.path.exists(args.banco):
+        parser.error(f'{args.banco} já existe')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(args.banco)}'})
+    inicio = time.perf_counter()
+    with app.app_context():
+        db.create_all()
+        popular(args.beneficiarios, args.semente,
+                progresso=lambda n: print(f'\r{n} beneficiários', end='', file=sys.stderr))
+        # Índice de busca e resumo das estatísticas a partir dos dados gerados
+        inicializar_banco()
+    print(f'\n{args.beneficiarios} beneficiários gerados em {time.perf_counter() - inicio:.1f}s', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Teste de estresse do gerador de matrículas entre processos.
+
+Inicia vários processos (fork, como os workers do gunicorn) que geram
+matrículas ao mesmo tempo e confere que não há repetições, que cada
+processo gera em ordem crescente e que todas têm o formato BENM + 16.
+
+Uso:
+    python benchmarks/stress_matricula.py --processos 8 --por-processo 500000
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import matricula  # noqa: E402
+
+# Caracteres do nó na matrícula (depois do prefixo e do tempo)
+POSICAO_NO = slice(
+    len(matricula.PREFIXO) + matricula.LARGURA_TEMPO,
+    len(matricula.PREFIXO) + matricula.LARGURA_TEMPO + matricula.LARGURA_NO,
+)
+
+
+def gerar_lote(total, saida, inicio):
+    # Todos começam juntos para disputar os mesmos milissegundos
+    while time.time() < inicio:
+        pass
+    matriculas = [matricula.gerar() for _ in range(total)]
+    with open(saida, 'w') as arquivo:
+        arquivo.write('\n'.join(matriculas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processos', type=int, default=8)
+    parser.add_argument('--por-processo', type=int, default=500000)
+    args = parser.parse_args()
+
+    # Um diretório de travas só deste teste, para não disputar nós com o app
+    os.environ['MATRICULA_LOCK_DIR'] = tempfile.mkdtemp(prefix='matricula-lock-')
+    contexto = multiprocessing.get_context('fork')
+    # O pai já reservou um nó antes do fork: os filhos não podem reaproveitá-lo
+    do_pai = matricula.gerar()
+    with tempfile.TemporaryDirectory() as diretorio:
+        saidas = [os.path.join(diretorio, f'{n}.txt') for n in range(args.processos)]
+        inicio = time.time() + 1
+        processos = [
+            contexto.Process(target=gerar_lote, args=(args.por_processo, saida, inicio)) for saida in saidas
+        ]
+        for processo in processos:
+            processo.start()
+        for processo in processos:
+            processo.join()
+            if processo.exitcode:
+                raise SystemExit(f'processo terminou com código {processo.exitcode}')
+        duracao = time.time() - inicio
+
+        vistas, nos, problemas = {do_pai}, {do_pai[POSICAO_NO]}, []
+        for saida in saidas:
+            with open(saida) as arquivo:
+                matriculas = arquivo.read().split('\n')
+            if matriculas != sorted(matriculas):
+                problemas.append(f'{saida}: fora de ordem')
+            if any(len(m) != 20 or not m.startswith(matricula.PREFIXO) for m in matriculas):
+                problemas.append(f'{saida}: formato inválido')
+            nos.update(m[POSICAO_NO] for m in matriculas)
+            vistas.update(matriculas)
+
+    total = args.processos * args.por_processo + 1
+    repetidas = total - len(vistas)
+    print(f'{total} matrículas em {duracao:.1f}s ({total / duracao:,.0f}/s), '
+          f'{len(nos)} nós, {repetidas} repetidas')
+    if repetidas or problemas:
+        raise SystemExit('\n'.join(problemas) or 'colisões encontradas')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Configuração do gunicorn para produção (gunicorn -c gunicorn.conf.py wsgi:app).
+
+Todas as opções podem ser ajustadas por variáveis de ambiente:
+- GUNICORN_BIND: endereço (padrão 0.0.0.0:5002)
+- GUNICORN_WORKERS: processos (padrão 2 x núcleos + 1)
+- GUNICORN_THREADS: threads por processo (padrão 2; acima de 1 usa o worker gthread)
+- GUNICORN_PRELOAD: carrega o app no mestre antes do fork (padrão 1)
+- GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_MAX_REQUESTS
+- GUNICORN_ACCESSLOG (vazio desliga), GUNICORN_LOGLEVEL
+
+Recarga sem derrubar requisições: `kill -HUP <mestre>` troca os workers aos
+poucos, esperando os atuais terminarem (graceful_timeout). Com o preload,
+o HUP reaproveita o código já carregado no mestre; para publicar código
+novo, use `kill -USR2 <mestre>` (sobe um mestre novo) e depois
+`kill -TERM <mestre antigo>`, ou rode com GUNICORN_PRELOAD=0.
+"""
+import multiprocessing
+import os
+
+
+def _inteiro(variavel, padrao):
+    return int(os.environ.get(variavel, padrao))
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5002')
+workers = _inteiro('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+threads = _inteiro('GUNICORN_THREADS', 2)
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+timeout = _inteiro('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _inteiro('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = 5
+# Reinicia cada worker depois de N requisições (com variação, para não reiniciarem juntos)
+max_requests = _inteiro('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None  # vazio desliga o log de acesso
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # Com o preload, o engine foi criado no mestre: cada worker abre as próprias conexões
+    if server.cfg.preload_app:
+        from src.database.database import descartar_conexoes_herdadas
+        descartar_conexoes_herdadas(server.app.wsgi())
@@ -0,0 +1,93 @@
+"""tabelas base (user, beneficiarios, historico_beneficiarios)
+
+Revision ID: 0000_tabelas_base
+Revises:
+Create Date: 2026-10-17 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0000_tabelas_base'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Esquema original; as revisões seguintes acrescentam índices e colunas.
+    # Bancos criados por `flask init-db` (create_all) já têm as tabelas, por isso if_not_exists
+    op.create_table(
+        'user',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=80), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('username'),
+        sa.UniqueConstraint('email'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'beneficiarios',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('matricula', sa.String(length=20), nullable=False),
+        sa.Column('nome_completo', sa.String(length=200), nullable=False),
+        sa.Column('data_nascimento', sa.Date(), nullable=False),
+        sa.Column('sexo', sa.String(length=10), nullable=False),
+        sa.Column('cpf', sa.String(length=14), nullable=False),
+        sa.Column('rg', sa.String(length=20), nullable=False),
+        sa.Column('orgao_emissor_rg', sa.String(length=10), nullable=False),
+        sa.Column('data_emissao_rg', sa.Date(), nullable=False),
+        sa.Column('nome_mae', sa.String(length=200), nullable=False),
+        sa.Column('estado_civil', sa.String(length=20), nullable=False),
+        sa.Column('nacionalidade', sa.String(length=50), nullable=False),
+        sa.Column('logradouro', sa.String(length=200), nullable=False),
+        sa.Column('numero_endereco', sa.String(length=10), nullable=False),
+        sa.Column('complemento_endereco', sa.String(length=100), nullable=True),
+        sa.Column('bairro', sa.String(length=100), nullable=False),
+        sa.Column('cidade', sa.String(length=100), nullable=False),
+        sa.Column('uf', sa.String(length=2), nullable=False),
+        sa.Column('cep', sa.String(length=9), nullable=False),
+        sa.Column('telefone_fixo', sa.String(length=15), nullable=True),
+        sa.Column('telefone_celular', sa.String(length=15), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('plano_saude_vinculado', sa.String(length=100), nullable=False),
+        sa.Column('data_inicio_cobertura', sa.Date(), nullable=False),
+        sa.Column('data_termino_cobertura', sa.Date(), nullable=True),
+        sa.Column('situacao_cadastral', sa.String(length=20), nullable=False),
+        sa.Column('tipo_beneficiario', sa.String(length=20), nullable=False),
+        sa.Column('grau_parentesco', sa.String(length=30), nullable=True),
+        sa.Column('id_titular', sa.Integer(), nullable=True),
+        sa.Column('numero_carteira_plano', sa.String(length=30), nullable=False),
+        sa.Column('data_adesao_plano', sa.Date(), nullable=False),
+        sa.Column('data_cancelamento_plano', sa.Date(), nullable=True),
+        sa.Column('motivo_cancelamento', sa.Text(), nullable=True),
+        sa.Column('data_criacao', sa.DateTime(), nullable=True),
+        sa.Column('data_atualizacao', sa.DateTime(), nullable=True),
+        sa.Column('ativo', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['id_titular'], ['beneficiarios.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('matricula'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'historico_beneficiarios',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('beneficiario_id', sa.Integer(), nullable=False),
+        sa.Column('campo_alterado', sa.String(length=100), nullable=False),
+        sa.Column('valor_antigo', sa.Text(), nullable=True),
+        sa.Column('valor_novo', sa.Text(), nullable=True),
+        sa.Column('data_alteracao', sa.DateTime(), nullable=True),
+        sa.Column('usuario_alteracao', sa.String(length=100), nullable=True),
+        sa.ForeignKeyConstraint(['beneficiario_id'], ['beneficiarios.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_table('historico_beneficiarios')
+    op.drop_table('beneficiarios')
+    op.drop_table('user')
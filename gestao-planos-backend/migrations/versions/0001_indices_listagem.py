@@ -0,0 +1,38 @@
+"""indices da listagem de beneficiarios e do historico
+
+Revision ID: 0001_indices_listagem
+Revises: 0000_tabelas_base
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_indices_listagem'
+down_revision = '0000_tabelas_base'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bancos criados por `flask init-db` (create_all) já têm os índices, por isso if_not_exists
+    op.create_index('ix_beneficiarios_ativo_nome', 'beneficiarios',
+                    ['ativo', 'nome_completo'], if_not_exists=True)
+    op.create_index('ix_beneficiarios_ativo_situacao_nome', 'beneficiarios',
+                    ['ativo', 'situacao_cadastral', 'nome_completo'], if_not_exists=True)
+    op.create_index('ix_beneficiarios_ativo_tipo_nome', 'beneficiarios',
+                    ['ativo', 'tipo_beneficiario', 'nome_completo'], if_not_exists=True)
+    op.create_index('ix_beneficiarios_id_titular', 'beneficiarios',
+                    ['id_titular', 'ativo'], if_not_exists=True)
+    op.create_index('ix_historico_beneficiario_data', 'historico_beneficiarios',
+                    ['beneficiario_id', 'data_alteracao'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_historico_beneficiario_data', table_name='historico_beneficiarios', if_exists=True)
+    op.drop_index('ix_beneficiarios_id_titular', table_name='beneficiarios', if_exists=True)
+    op.drop_index('ix_beneficiarios_ativo_tipo_nome', table_name='beneficiarios', if_exists=True)
+    op.drop_index('ix_beneficiarios_ativo_situacao_nome', table_name='beneficiarios', if_exists=True)
+    op.drop_index('ix_beneficiarios_ativo_nome', table_name='beneficiarios', if_exists=True)
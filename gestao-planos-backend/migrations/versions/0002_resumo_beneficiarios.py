@@ -0,0 +1,32 @@
+"""tabela de resumo para as estatisticas do dashboard
+
+Revision ID: 0002_resumo_beneficiarios
+Revises: 0001_indices_listagem
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_resumo_beneficiarios'
+down_revision = '0001_indices_listagem'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'resumo_beneficiarios',
+        sa.Column('dimensao', sa.String(length=30), nullable=False),
+        sa.Column('chave', sa.String(length=100), nullable=False),
+        sa.Column('quantidade', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('dimensao', 'chave'),
+        if_not_exists=True
+    )
+    # O conteúdo é calculado na revisão 0007 (ou por `flask init-db`)
+
+
+def downgrade():
+    op.drop_table('resumo_beneficiarios')
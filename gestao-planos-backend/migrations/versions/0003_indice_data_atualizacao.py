@@ -0,0 +1,25 @@
+"""indice em data_atualizacao para a ETag da listagem
+
+Revision ID: 0003_indice_data_atualizacao
+Revises: 0002_resumo_beneficiarios
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_indice_data_atualizacao'
+down_revision = '0002_resumo_beneficiarios'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_beneficiarios_data_atualizacao', 'beneficiarios',
+                    ['data_atualizacao'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_beneficiarios_data_atualizacao', table_name='beneficiarios', if_exists=True)
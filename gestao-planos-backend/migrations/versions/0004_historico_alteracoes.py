@@ -0,0 +1,28 @@
+"""conjunto de alterações (JSON) no histórico de beneficiários
+
+Revision ID: 0004_historico_alteracoes
+Revises: 0003_indice_data_atualizacao
+Create Date: 2026-10-17 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_historico_alteracoes'
+down_revision = '0003_indice_data_atualizacao'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bancos criados por `flask init-db` (create_all) já têm a coluna
+    colunas = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('historico_beneficiarios')}
+    if 'alteracoes' not in colunas:
+        op.add_column('historico_beneficiarios', sa.Column('alteracoes', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('historico_beneficiarios') as batch_op:
+        batch_op.drop_column('alteracoes')
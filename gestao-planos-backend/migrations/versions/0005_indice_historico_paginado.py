@@ -0,0 +1,29 @@
+"""indice (beneficiario_id, data_alteracao, id) para a paginação do histórico
+
+Revision ID: 0005_indice_historico_paginado
+Revises: 0004_historico_alteracoes
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_indice_historico_paginado'
+down_revision = '0004_historico_alteracoes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_historico_beneficiario_data_id', 'historico_beneficiarios',
+                    ['beneficiario_id', 'data_alteracao', 'id'], if_not_exists=True)
+    # O novo índice tem o antigo como prefixo
+    op.drop_index('ix_historico_beneficiario_data', table_name='historico_beneficiarios', if_exists=True)
+
+
+def downgrade():
+    op.create_index('ix_historico_beneficiario_data', 'historico_beneficiarios',
+                    ['beneficiario_id', 'data_alteracao'], if_not_exists=True)
+    op.drop_index('ix_historico_beneficiario_data_id', table_name='historico_beneficiarios', if_exists=True)
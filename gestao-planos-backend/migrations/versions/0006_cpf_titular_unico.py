@@ -0,0 +1,35 @@
+"""indice unico parcial de CPF dos titulares ativos
+
+Revision ID: 0006_cpf_titular_unico
+Revises: 0005_indice_historico_paginado
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_cpf_titular_unico'
+down_revision = '0005_indice_historico_paginado'
+branch_labels = None
+depends_on = None
+
+CONDICAO = sa.text("tipo_beneficiario = 'Titular' AND ativo")
+
+
+def upgrade():
+    duplicados = op.get_bind().execute(sa.text(
+        "SELECT cpf FROM beneficiarios WHERE tipo_beneficiario = 'Titular' AND ativo "
+        "GROUP BY cpf HAVING COUNT(*) > 1"
+    )).scalars().all()
+    if duplicados:
+        raise RuntimeError(
+            'Há titulares ativos com o mesmo CPF; resolva antes de migrar: ' + ', '.join(duplicados)
+        )
+    op.create_index('ux_beneficiarios_cpf_titular_ativo', 'beneficiarios', ['cpf'], unique=True,
+                    sqlite_where=CONDICAO, postgresql_where=CONDICAO, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ux_beneficiarios_cpf_titular_ativo', table_name='beneficiarios', if_exists=True)
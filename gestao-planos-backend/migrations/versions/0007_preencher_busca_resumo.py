@@ -0,0 +1,41 @@
+"""cria e preenche o índice de busca (FTS5) e o resumo das estatísticas
+
+Revision ID: 0007_preencher_busca_resumo
+Revises: 0006_cpf_titular_unico
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy.exc import OperationalError
+
+from src.services import busca, estatisticas
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_preencher_busca_resumo'
+down_revision = '0006_cpf_titular_unico'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conexao = op.get_bind()
+    # O resumo é recalculado do zero: vale tanto para banco vazio quanto para
+    # um banco com beneficiários anteriores à tabela (0002)
+    estatisticas.reconstruir(conexao)
+
+    if conexao.dialect.name != 'sqlite':
+        return
+    # Savepoint: sem FTS5/trigram no SQLite, a busca continua com LIKE
+    with conexao.begin_nested() as savepoint:
+        try:
+            busca.criar_indice(conexao)
+        except OperationalError:
+            savepoint.rollback()
+            return
+    busca.reconstruir(conexao)
+
+
+def downgrade():
+    op.execute(f'DROP TABLE IF EXISTS {busca.TABELA}')
+    op.execute('DELETE FROM resumo_beneficiarios')
@@ -1,3 +1,130 @@
+import os
+
+from flask import has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Bind opcional (SQLALCHEMY_BINDS) usado pelas leituras das requisições GET
+BIND_LEITURA = 'leitura'
+
+METODOS_LEITURA = ('GET', 'HEAD')
+
+
+class SessaoRoteada(Session):
+    """Sessão que envia as consultas de requisições GET/HEAD para a réplica de leitura.
+
+    Sem o bind 'leitura' configurado, ou fora de uma requisição (CLI,
+    tarefas em segundo plano), tudo vai para o banco principal. Flushes
+    sempre usam o banco principal.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() \
+                and request.method in METODOS_LEITURA:
+            engine = self._db.engines.get(BIND_LEITURA)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': SessaoRoteada})
+
+
+def _sqlite_em_memoria(url):
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def _opcoes_pool(app, url):
+    """Opções de pool do engine; SQLite em memória usa o StaticPool do Flask-SQLAlchemy"""
+    if _sqlite_em_memoria(url):
+        return {}
+    opcoes = {
+        'pool_size': app.config['DATABASE_POOL_SIZE'],
+        'max_overflow': app.config['DATABASE_MAX_OVERFLOW'],
+        'pool_timeout': app.config['DATABASE_POOL_TIMEOUT'],
+    }
+    if make_url(url).get_backend_name() != 'sqlite':
+        # Servidores de banco derrubam conexões ociosas
+        opcoes.update(pool_pre_ping=True, pool_recycle=app.config['DATABASE_POOL_RECYCLE'])
+    return opcoes
+
+
+def _pragmas_sqlite(app, somente_leitura):
+    pragmas = [
+        f"busy_timeout = {int(app.config['SQLITE_BUSY_TIMEOUT'])}",
+        f"cache_size = {int(app.config['SQLITE_CACHE_SIZE'])}",
+        f"mmap_size = {int(app.config['SQLITE_MMAP_SIZE'])}",
+    ]
+    if somente_leitura:
+        pragmas.append('query_only = ON')
+    else:
+        # journal_mode é persistente e exige escrita: só no banco principal
+        pragmas.append(f"journal_mode = {app.config['SQLITE_JOURNAL_MODE']}")
+    pragmas.append(f"synchronous = {app.config['SQLITE_SYNCHRONOUS']}")
+    return pragmas
+
+
+def configurar_banco(app, uri_padrao):
+    """Configura o banco a partir do ambiente e inicializa o Flask-SQLAlchemy.
+
+    Variáveis de ambiente (todas opcionais):
+    - DATABASE_URL: banco principal (padrão: `uri_padrao`, SQLite local)
+    - DATABASE_READ_URL: réplica somente leitura para as requisições GET;
+      para SQLite pode ser o mesmo arquivo, ex.
+      sqlite:///file:/caminho/app.db?mode=ro&uri=true
+    - DATABASE_POOL_SIZE, DATABASE_MAX_OVERFLOW, DATABASE_POOL_TIMEOUT,
+      DATABASE_POOL_RECYCLE: pool de conexões
+    - SQLITE_BUSY_TIMEOUT (ms), SQLITE_CACHE_SIZE, SQLITE_MMAP_SIZE,
+      SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS: pragmas aplicados a cada conexão
+    """
+    padroes = {
+        'SQLALCHEMY_DATABASE_URI': ('DATABASE_URL', uri_padrao),
+        'DATABASE_READ_URL': ('DATABASE_READ_URL', None),
+        'DATABASE_POOL_SIZE': ('DATABASE_POOL_SIZE', 5),
+        'DATABASE_MAX_OVERFLOW': ('DATABASE_MAX_OVERFLOW', 10),
+        'DATABASE_POOL_TIMEOUT': ('DATABASE_POOL_TIMEOUT', 30),
+        'DATABASE_POOL_RECYCLE': ('DATABASE_POOL_RECYCLE', 1800),
+        'SQLITE_BUSY_TIMEOUT': ('SQLITE_BUSY_TIMEOUT', 5000),
+        'SQLITE_CACHE_SIZE': ('SQLITE_CACHE_SIZE', -64000),  # negativo = KiB (64 MB)
+        'SQLITE_MMAP_SIZE': ('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        'SQLITE_JOURNAL_MODE': ('SQLITE_JOURNAL_MODE', 'WAL'),
+        'SQLITE_SYNCHRONOUS': ('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    }
+    for chave, (variavel, padrao) in padroes.items():
+        valor = os.environ.get(variavel, padrao)
+        if isinstance(padrao, int) and valor is not None:
+            valor = int(valor)
+        app.config.setdefault(chave, valor)
+    app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
+
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', _opcoes_pool(app, uri))
+    if app.config['DATABASE_READ_URL']:
+        uri_leitura = app.config['DATABASE_READ_URL']
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        binds.setdefault(BIND_LEITURA, {'url': uri_leitura, **_opcoes_pool(app, uri_leitura)})
+
+    db.init_app(app)
+
+    with app.app_context():
+        for chave, engine in db.engines.items():
+            if engine.dialect.name != 'sqlite':
+                continue
+            pragmas = _pragmas_sqlite(app, somente_leitura=chave == BIND_LEITURA)
+
+            @event.listens_for(engine, 'connect')
+            def _aplicar_pragmas(conexao, registro, pragmas=pragmas):
+                cursor = conexao.cursor()
+                for pragma in pragmas:
+                    cursor.execute(f'PRAGMA {pragma}')
+                cursor.close()
+
 
-db = SQLAlchemy()
+def descartar_conexoes_herdadas(app):
+    """Após um fork, descarta os pools herdados sem fechar as conexões do processo pai"""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
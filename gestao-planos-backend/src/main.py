@@ -3,49 +3,96 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+import click
+from flask import Flask
 from flask_cors import CORS
-from src.database.database import db
+from src.database.database import configurar_banco, db
 from src.models.beneficiario import Beneficiario, HistoricoBeneficiario
+from src.models.estatistica import ResumoBeneficiario
 from src.routes.user import user_bp
 from src.routes.beneficiario_simple import beneficiario_bp
+from src.services import arquivo_historico, busca, cache, compressao, estaticos, estatisticas, exportacao, json_rapido, metricas
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+def create_app(config=None):
+    """Cria a aplicação; `config` sobrescreve as configurações padrão e do ambiente.
 
-# Configurar CORS para permitir requisições do frontend
-CORS(app, origins=['*'])
+    O boot não toca no esquema do banco: tabelas, índice de busca e resumo
+    das estatísticas são criados pelas migrações (`flask --app src.main db
+    upgrade`, que também montam um banco vazio desde a revisão base) ou por
+    `flask --app src.main init-db`, que cria direto o esquema atual.
+    """
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+    if config:
+        app.config.update(config)
 
-# Registrar blueprints
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(beneficiario_bp, url_prefix='/api')
+    # Configurar CORS para permitir requisições do frontend
+    CORS(app, origins=['*'])
 
-# Configuração do banco de dados
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
+    # Registrar blueprints
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(beneficiario_bp, url_prefix='/api')
 
-# Criar tabelas
-with app.app_context():
-    db.create_all()
+    # Configuração do banco de dados (DATABASE_URL, DATABASE_READ_URL etc. no ambiente)
+    configurar_banco(app, f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}")
+    # Flask-Migrate (alembic) só é usado pelos comandos `flask db`; carregá-lo
+    # apenas quando o app é criado pela CLI poupa o import em cada worker
+    if click.get_current_context(silent=True) is not None:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+    # Listagens codificadas com orjson, quando instalado (mesmos bytes do jsonify)
+    json_rapido.init_app(app)
+
+    # Latência, consultas SQL e serialização por endpoint (GET /metrics)
+    metricas.init_app(app)
+
+    # Índice de busca textual (FTS5) dos beneficiários
+    busca.init_app(app)
+
+    # Resumo das estatísticas do dashboard
+    estatisticas.init_app(app)
+
+    # Cache de respostas das rotas de leitura
+    cache.init_app(app)
+
+    # Fila de exportações em segundo plano
+    exportacao.init_app(app)
+
+    # Arquivamento do histórico antigo em bancos mensais
+    arquivo_historico.init_app(app)
 
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
+    # Manifesto dos arquivos estáticos do frontend (ver serve)
+    estaticos.init_app(app)
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+    # gzip/brotli conforme o Accept-Encoding; registrado por último, roda antes das métricas
+    compressao.init_app(app)
+
+    @app.cli.command('init-db')
+    def init_db():
+        """Cria as tabelas, o índice de busca e o resumo das estatísticas"""
+        inicializar_banco()
+        click.echo('Banco de dados inicializado')
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        return estaticos.servir(path)
+
+    return app
+
+
+def inicializar_banco():
+    """Cria o que falta no banco do app atual; pode ser executado várias vezes"""
+    db.create_all()
+    busca.preparar()
+    estatisticas.preparar()
 
 
 if __name__ == '__main__':
+    app = create_app()
+    # Servidor de desenvolvimento: garante o banco antes de subir.
+    # Em produção: gunicorn -c gunicorn.conf.py wsgi:app
+    with app.app_context():
+        inicializar_banco()
     app.run(host='0.0.0.0', port=5002, debug=True)
-
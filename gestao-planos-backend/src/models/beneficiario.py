@@ -1,9 +1,25 @@
 from src.database.database import db
+from src.services import matricula
 from datetime import datetime
-import uuid
 
 class Beneficiario(db.Model):
     __tablename__ = 'beneficiarios'
+    __table_args__ = (
+        # Índices alinhados aos filtros da listagem (sempre ativo=True, ORDER BY nome_completo)
+        db.Index('ix_beneficiarios_ativo_nome', 'ativo', 'nome_completo'),
+        db.Index('ix_beneficiarios_ativo_situacao_nome', 'ativo', 'situacao_cadastral', 'nome_completo'),
+        db.Index('ix_beneficiarios_ativo_tipo_nome', 'ativo', 'tipo_beneficiario', 'nome_completo'),
+        # Busca de dependentes de um titular
+        db.Index('ix_beneficiarios_id_titular', 'id_titular', 'ativo'),
+        # MAX(data_atualizacao) usado na ETag da listagem
+        db.Index('ix_beneficiarios_data_atualizacao', 'data_atualizacao'),
+        # Um único titular ativo por CPF, garantido pelo banco mesmo com inclusões concorrentes
+        db.Index(
+            'ux_beneficiarios_cpf_titular_ativo', 'cpf', unique=True,
+            sqlite_where=db.text("tipo_beneficiario = 'Titular' AND ativo"),
+            postgresql_where=db.text("tipo_beneficiario = 'Titular' AND ativo")
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     matricula = db.Column(db.String(20), unique=True, nullable=False)
@@ -59,11 +75,10 @@ class Beneficiario(db.Model):
         if not self.matricula:
             self.matricula = self.gerar_matricula()
     
-    def gerar_matricula(self):
-        """Gera uma matrícula única para o beneficiário"""
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        random_suffix = str(uuid.uuid4())[:4].upper()
-        return f"BEN{timestamp}{random_suffix}"
+    @staticmethod
+    def gerar_matricula():
+        """Gera uma matrícula única e crescente para o beneficiário (ver services/matricula)"""
+        return matricula.gerar()
     
     def __repr__(self):
         return f'<Beneficiario {self.nome_completo} - {self.matricula}>'
@@ -109,8 +124,16 @@ class Beneficiario(db.Model):
         }
 
 
+# campo_alterado dos registros de conjunto de alterações (uma linha por gravação)
+CAMPO_ALTERACOES = 'ALTERACOES'
+
+
 class HistoricoBeneficiario(db.Model):
     __tablename__ = 'historico_beneficiarios'
+    __table_args__ = (
+        # Páginas do histórico: faixa (beneficiario_id, data_alteracao, id) em ordem decrescente
+        db.Index('ix_historico_beneficiario_data_id', 'beneficiario_id', 'data_alteracao', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     beneficiario_id = db.Column(db.Integer, db.ForeignKey('beneficiarios.id'), nullable=False)
@@ -119,10 +142,28 @@ class HistoricoBeneficiario(db.Model):
     valor_novo = db.Column(db.Text)
     data_alteracao = db.Column(db.DateTime, default=datetime.utcnow)
     usuario_alteracao = db.Column(db.String(100), default='Sistema')
+    # Conjunto de alterações: {campo: [valor_antigo, valor_novo]}
+    alteracoes = db.Column(db.JSON)
     
     def __repr__(self):
         return f'<HistoricoBeneficiario {self.beneficiario_id} - {self.campo_alterado}>'
     
+    def por_campo(self):
+        """Registros no formato de uma linha por campo, expandindo conjuntos de alterações"""
+        base = {
+            'id': self.id,
+            'beneficiario_id': self.beneficiario_id,
+            'data_alteracao': self.data_alteracao,
+            'usuario_alteracao': self.usuario_alteracao
+        }
+        if self.alteracoes is None:
+            return [dict(base, campo_alterado=self.campo_alterado,
+                         valor_antigo=self.valor_antigo, valor_novo=self.valor_novo)]
+        return [
+            dict(base, campo_alterado=campo, valor_antigo=antigo, valor_novo=novo)
+            for campo, (antigo, novo) in self.alteracoes.items()
+        ]
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -131,6 +172,7 @@ class HistoricoBeneficiario(db.Model):
             'valor_antigo': self.valor_antigo,
             'valor_novo': self.valor_novo,
             'data_alteracao': self.data_alteracao.isoformat() if self.data_alteracao else None,
-            'usuario_alteracao': self.usuario_alteracao
+            'usuario_alteracao': self.usuario_alteracao,
+            'alteracoes': self.alteracoes
         }
 
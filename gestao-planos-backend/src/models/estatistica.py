@@ -0,0 +1,19 @@
+from src.database.database import db
+
+class ResumoBeneficiario(db.Model):
+    """Contadores agregados de beneficiários, mantidos a cada inclusão/alteração"""
+    __tablename__ = 'resumo_beneficiarios'
+    
+    dimensao = db.Column(db.String(30), primary_key=True)  # 'total', 'ativos', 'situacao', 'tipo', 'plano', 'mes_cadastro'
+    chave = db.Column(db.String(100), primary_key=True, default='')
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<ResumoBeneficiario {self.dimensao}:{self.chave} = {self.quantidade}>'
+    
+    def to_dict(self):
+        return {
+            'dimensao': self.dimensao,
+            'chave': self.chave,
+            'quantidade': self.quantidade
+        }
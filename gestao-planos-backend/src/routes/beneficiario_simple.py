@@ -1,23 +1,46 @@
-from flask import Blueprint, request, jsonify, make_response
+from flask import Blueprint, Response, current_app, request, jsonify, make_response, send_file, stream_with_context, url_for
 from flask_cors import cross_origin
-from src.models.beneficiario import Beneficiario, HistoricoBeneficiario
+from src.models.beneficiario import CAMPO_ALTERACOES, Beneficiario, HistoricoBeneficiario
 from src.database.database import db
+from src.services import arquivo_historico, busca, cache, condicional, estatisticas, exportacao, json_rapido, metricas
+from src.services.busca import aplicar_filtros
 from src.schemas.beneficiario_schema import (
-    beneficiario_schema, beneficiarios_schema, 
-    historico_beneficiario_schema, historicos_beneficiario_schema
+    beneficiario_schema, beneficiarios_schema, beneficiarios_serializador, historicos_beneficiario_schema
 )
 from marshmallow import ValidationError
-from sqlalchemy import or_, and_
-from datetime import datetime
-import csv
+from sqlalchemy import or_, and_, func, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timezone
+import base64
+import binascii
 import io
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
+import json
+import os
 
 beneficiario_bp = Blueprint('beneficiario', __name__)
 
+# Exportação CSV: linhas lidas e enviadas por lote, sem carregar o resultado inteiro
+LOTE_EXPORTACAO_CSV = 1000
+COLUNAS_CSV = (
+    Beneficiario.matricula, Beneficiario.nome_completo, Beneficiario.cpf,
+    Beneficiario.data_nascimento, Beneficiario.sexo, Beneficiario.telefone_celular,
+    Beneficiario.email, Beneficiario.plano_saude_vinculado, Beneficiario.situacao_cadastral,
+    Beneficiario.tipo_beneficiario, Beneficiario.data_criacao
+)
+
+# Inclusão em lote: máximo de dependentes por requisição (LOTE_MAX_DEPENDENTES)
+MAX_DEPENDENTES_LOTE = 100
+
+# Formato colunar opcional da listagem (Accept): cada campo aparece uma vez, com a lista de valores
+MIME_COLUNAR = 'application/vnd.columnar+json'
+
+# Tamanho de página da listagem (offset e cursor)
+MAX_POR_PAGINA = 100
+
+# Histórico: registros por página (cada conjunto de alterações conta como um)
+POR_PAGINA_HISTORICO = 100
+MAX_POR_PAGINA_HISTORICO = 1000
+
 def registrar_historico(beneficiario_id, campo, valor_antigo, valor_novo, usuario='Sistema'):
     """Registra uma alteração no histórico do beneficiário"""
     historico = HistoricoBeneficiario(
@@ -29,52 +52,257 @@ def registrar_historico(beneficiario_id, campo, valor_antigo, valor_novo, usuari
     )
     db.session.add(historico)
 
+def registrar_alteracoes(beneficiario_id, alteracoes, usuario='Sistema'):
+    """Registra as alterações de uma gravação, {campo: (valor_antigo, valor_novo)}.
+    
+    No modo 'conjunto' (padrão de HISTORICO_MODO) grava um único registro com
+    todas as alterações em JSON; no modo 'campo', um registro por campo.
+    """
+    if not alteracoes:
+        return
+    if current_app.config.get('HISTORICO_MODO', 'conjunto') == 'campo':
+        for campo, (valor_antigo, valor_novo) in alteracoes.items():
+            registrar_historico(beneficiario_id, campo, valor_antigo, valor_novo, usuario)
+        return
+    
+    db.session.add(HistoricoBeneficiario(
+        beneficiario_id=beneficiario_id,
+        campo_alterado=CAMPO_ALTERACOES,
+        alteracoes={
+            campo: [str(valor) if valor is not None else None for valor in valores]
+            for campo, valores in alteracoes.items()
+        },
+        usuario_alteracao=usuario
+    ))
+
+def formato_lista():
+    """'colunar' se o cliente pediu MIME_COLUNAR no Accept, senão 'json'"""
+    melhor = request.accept_mimetypes.best_match(['application/json', MIME_COLUNAR])
+    return 'colunar' if melhor == MIME_COLUNAR else 'json'
+
+def resposta_lista(serializador, linhas, formato, **extras):
+    """Corpo da listagem, com 'beneficiarios' em linhas (JSON) ou em colunas"""
+    with metricas.cronometro():
+        if formato == 'colunar':
+            resposta = json_rapido.resposta({'beneficiarios': serializador.dump_colunas(linhas), **extras})
+            resposta.mimetype = MIME_COLUNAR
+        else:
+            resposta = json_rapido.resposta({'beneficiarios': serializador.dump(linhas), **extras})
+    return resposta
+
+def cpf_titular_duplicado(erro):
+    """Indica se a IntegrityError veio do índice único de CPF dos titulares ativos"""
+    mensagem = str(erro.orig)
+    return 'ux_beneficiarios_cpf_titular_ativo' in mensagem or 'beneficiarios.cpf' in mensagem
+
+def codificar_cursor(nome, beneficiario_id, direcao):
+    """Gera um cursor opaco para a paginação por chave (nome_completo, id)"""
+    bruto = json.dumps([nome, beneficiario_id, direcao], separators=(',', ':'))
+    return base64.urlsafe_b64encode(bruto.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decodificar_cursor(cursor):
+    """Decodifica um cursor gerado por codificar_cursor; levanta ValueError se inválido"""
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        nome, beneficiario_id, direcao = json.loads(bruto)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError('Cursor inválido')
+    if not isinstance(nome, str) or not isinstance(beneficiario_id, int) or direcao not in ('next', 'prev'):
+        raise ValueError('Cursor inválido')
+    return nome, beneficiario_id, direcao
+
+def paginar_por_cursor(query, cursor, per_page):
+    """Pagina por busca de chave em (nome_completo, id), sem OFFSET e sem COUNT(*)"""
+    chave = tuple_(Beneficiario.nome_completo, Beneficiario.id)
+    direcao = 'next'
+    if cursor:
+        nome, beneficiario_id, direcao = decodificar_cursor(cursor)
+        if direcao == 'next':
+            query = query.filter(chave > tuple_(nome, beneficiario_id))
+        else:
+            query = query.filter(chave < tuple_(nome, beneficiario_id))
+    
+    if direcao == 'next':
+        query = query.order_by(Beneficiario.nome_completo, Beneficiario.id)
+    else:
+        query = query.order_by(Beneficiario.nome_completo.desc(), Beneficiario.id.desc())
+    
+    # Uma linha a mais indica se existe página seguinte na direção percorrida
+    itens = query.limit(per_page + 1).all()
+    ha_mais = len(itens) > per_page
+    itens = itens[:per_page]
+    if direcao == 'prev':
+        itens.reverse()
+    
+    next_cursor = prev_cursor = None
+    if itens:
+        primeiro, ultimo = itens[0], itens[-1]
+        if direcao == 'prev' or ha_mais:
+            next_cursor = codificar_cursor(ultimo.nome_completo, ultimo.id, 'next')
+        if (direcao == 'next' and cursor) or (direcao == 'prev' and ha_mais):
+            prev_cursor = codificar_cursor(primeiro.nome_completo, primeiro.id, 'prev')
+    
+    return itens, next_cursor, prev_cursor
+
+def codificar_cursor_historico(data_alteracao, historico_id):
+    """Cursor opaco para a paginação do histórico por (data_alteracao, id), decrescente"""
+    bruto = json.dumps([data_alteracao.isoformat(), historico_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(bruto.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decodificar_cursor_historico(cursor):
+    """Decodifica um cursor de codificar_cursor_historico; levanta ValueError se inválido"""
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data_alteracao, historico_id = json.loads(bruto)
+        data_alteracao = datetime.fromisoformat(data_alteracao)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError('Cursor inválido')
+    if not isinstance(historico_id, int):
+        raise ValueError('Cursor inválido')
+    return data_alteracao, historico_id
+
+def _data_parametro(nome, valor):
+    try:
+        data = datetime.fromisoformat(valor)
+    except ValueError:
+        raise ValueError(f'{nome} deve ser uma data ISO (AAAA-MM-DD ou AAAA-MM-DDTHH:MM:SS)')
+    # O histórico grava datas UTC sem fuso
+    if data.tzinfo is not None:
+        data = data.astimezone(timezone.utc).replace(tzinfo=None)
+    return data
+
+def filtros_historico(since=None, until=None, campo='', cursor=''):
+    """Condições sobre HistoricoBeneficiario para os filtros da consulta do histórico.
+    
+    Todas restringem a faixa (beneficiario_id, data_alteracao, id) do índice
+    ix_historico_beneficiario_data_id, exceto `campo`, avaliado nas linhas da faixa.
+    Devolve (condições, início, fim), com os limites de data_alteracao da faixa.
+    """
+    condicoes = []
+    inicio = fim = None
+    if since:
+        inicio = _data_parametro('since', since)
+        condicoes.append(HistoricoBeneficiario.data_alteracao >= inicio)
+    if until:
+        fim = _data_parametro('until', until)
+        condicoes.append(HistoricoBeneficiario.data_alteracao < fim)
+    if cursor:
+        data_alteracao, historico_id = decodificar_cursor_historico(cursor)
+        fim = data_alteracao if fim is None else min(fim, data_alteracao)
+        condicoes.append(
+            tuple_(HistoricoBeneficiario.data_alteracao, HistoricoBeneficiario.id) < tuple_(data_alteracao, historico_id)
+        )
+    if campo:
+        # Registros por campo ou conjuntos de alterações que incluem o campo
+        condicoes.append(or_(
+            HistoricoBeneficiario.campo_alterado == campo,
+            and_(
+                HistoricoBeneficiario.campo_alterado == CAMPO_ALTERACOES,
+                HistoricoBeneficiario.alteracoes[campo].as_string().isnot(None)
+            )
+        ))
+    return condicoes, inicio, fim
+
+def consulta_historico(beneficiario_id, condicoes, limite):
+    """Linha do beneficiário (versão e criação) com até `limite` registros do histórico por LEFT JOIN"""
+    return (
+        select(Beneficiario.data_atualizacao, Beneficiario.data_criacao, HistoricoBeneficiario)
+        .outerjoin(HistoricoBeneficiario, and_(
+            HistoricoBeneficiario.beneficiario_id == Beneficiario.id, *condicoes
+        ))
+        .where(Beneficiario.id == beneficiario_id)
+        .order_by(HistoricoBeneficiario.data_alteracao.desc(), HistoricoBeneficiario.id.desc())
+        .limit(limite)
+    )
+
 @beneficiario_bp.route('/beneficiarios', methods=['GET'])
 @cross_origin()
 def get_beneficiarios():
-    """Lista beneficiários com filtros opcionais"""
+    """Lista beneficiários com filtros opcionais
+    
+    Com `Accept: application/vnd.columnar+json`, 'beneficiarios' vem por
+    colunas ({campo: [valores]}) em vez de uma lista de objetos.
+    """
     try:
-        # Parâmetros de filtro
-        nome = request.args.get('nome', '')
-        cpf = request.args.get('cpf', '')
-        matricula = request.args.get('matricula', '')
-        plano = request.args.get('plano', '')
-        situacao = request.args.get('situacao', '')
-        tipo = request.args.get('tipo', '')
+        formato = formato_lista()
+        
+        # ETag fraca: qualquer escrita avança o maior data_atualizacao da tabela
+        ultima_alteracao = db.session.scalar(select(func.max(Beneficiario.data_atualizacao)))
+        etag = condicional.calcular_etag(
+            'lista', ultima_alteracao, formato, condicional.etag_args(request.args)
+        )
+        resposta = condicional.nao_modificado(etag, fraca=True)
+        if resposta is not None:
+            resposta.vary.add('Accept')
+            return resposta
+        
+        # Resposta em cache para os mesmos parâmetros
+        cache_respostas = cache.respostas()
+        chave_cache = cache_respostas.chave_lista(etag)
+        resposta = cache_respostas.obter(chave_cache, MIME_COLUNAR if formato == 'colunar' else 'application/json')
+        if resposta is not None:
+            resposta.vary.add('Accept')
+            return condicional.marcar(resposta, etag, fraca=True)
         
         # Parâmetros de paginação
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
-        
-        # Query base (apenas beneficiários ativos)
-        query = Beneficiario.query.filter_by(ativo=True)
-        
-        # Aplicar filtros
-        if nome:
-            query = query.filter(Beneficiario.nome_completo.ilike(f'%{nome}%'))
-        if cpf:
-            query = query.filter(Beneficiario.cpf.like(f'%{cpf}%'))
-        if matricula:
-            query = query.filter(Beneficiario.matricula.like(f'%{matricula}%'))
-        if plano:
-            query = query.filter(Beneficiario.plano_saude_vinculado.ilike(f'%{plano}%'))
-        if situacao:
-            query = query.filter(Beneficiario.situacao_cadastral == situacao)
-        if tipo:
-            query = query.filter(Beneficiario.tipo_beneficiario == tipo)
-        
-        # Paginação
-        beneficiarios_paginados = query.order_by(Beneficiario.nome_completo).paginate(
+        if per_page < 1:
+            return jsonify({'error': 'per_page deve ser maior que zero'}), 400
+        per_page = min(per_page, MAX_POR_PAGINA)
+        
+        # Projeção (fields=...): apenas as colunas pedidas vão ao SELECT e à resposta;
+        # a paginação por cursor sempre lê também a chave (nome_completo, id)
+        try:
+            serializador = beneficiarios_serializador.projecao(
+                request.args.get('fields'),
+                extras=('nome_completo', 'id') if 'cursor' in request.args else ()
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Query base (apenas beneficiários ativos) com os filtros da requisição
+        query = aplicar_filtros(Beneficiario.query.filter_by(ativo=True), request.args)
+        
+        # Busca livre (q) em nome, CPF, matrícula e plano
+        termo = request.args.get('q', '')
+        
+        # Paginação por cursor (opcional): custo constante em qualquer página
+        if 'cursor' in request.args:
+            if termo:
+                query = busca.buscar(query, termo, ordenar=False)
+            query = query.with_entities(*serializador.colunas)
+            try:
+                itens, next_cursor, prev_cursor = paginar_por_cursor(
+                    query, request.args.get('cursor', ''), per_page
+                )
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            resposta = cache_respostas.guardar(chave_cache, resposta_lista(
+                serializador, itens, formato,
+                next_cursor=next_cursor, prev_cursor=prev_cursor, per_page=per_page
+            ))
+            resposta.vary.add('Accept')
+            return condicional.marcar(resposta, etag, fraca=True)
+        
+        # Paginação (com busca livre, ordenada por relevância)
+        if termo:
+            query = busca.buscar(query, termo)
+        else:
+            query = query.order_by(Beneficiario.nome_completo)
+        # Apenas colunas, sem montar entidades do ORM
+        beneficiarios_paginados = query.with_entities(*serializador.colunas).paginate(
             page=page, per_page=per_page, error_out=False
         )
         
-        return jsonify({
-            'beneficiarios': beneficiarios_schema.dump(beneficiarios_paginados.items),
-            'total': beneficiarios_paginados.total,
-            'pages': beneficiarios_paginados.pages,
-            'current_page': page,
-            'per_page': per_page
-        })
+        resposta = cache_respostas.guardar(chave_cache, resposta_lista(
+            serializador, beneficiarios_paginados.items, formato,
+            total=beneficiarios_paginados.total, pages=beneficiarios_paginados.pages,
+            current_page=page, per_page=per_page
+        ))
+        resposta.vary.add('Accept')
+        return condicional.marcar(resposta, etag, fraca=True)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -87,15 +315,7 @@ def create_beneficiario():
         # Validar dados de entrada
         result = beneficiario_schema.load(request.json)
         
-        # Verificar se CPF já existe para titular
-        if result['tipo_beneficiario'] == 'Titular':
-            cpf_existente = Beneficiario.query.filter_by(
-                cpf=result['cpf'],
-                tipo_beneficiario='Titular',
-                ativo=True
-            ).first()
-            if cpf_existente:
-                return jsonify({'error': 'CPF já cadastrado como titular'}), 400
+        # CPF duplicado de titular é recusado pelo índice único (ver cpf_titular_duplicado)
         
         # Verificar se dependente tem titular válido
         if result['tipo_beneficiario'] == 'Dependente':
@@ -122,25 +342,203 @@ def create_beneficiario():
         registrar_historico(beneficiario.id, 'CRIACAO', None, 'Beneficiário criado')
         
         db.session.commit()
+        cache.respostas().invalidar_listas()
         
         return jsonify(beneficiario_schema.dump(beneficiario)), 201
         
     except ValidationError as e:
         return jsonify({'error': 'Dados inválidos', 'details': e.messages}), 400
+    except IntegrityError as e:
+        db.session.rollback()
+        if cpf_titular_duplicado(e):
+            return jsonify({'error': 'CPF já cadastrado como titular'}), 400
+        return jsonify({'error': str(e)}), 500
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@beneficiario_bp.route('/beneficiarios:batch', methods=['POST'])
+@cross_origin()
+def create_beneficiarios_lote():
+    """Cria um titular e seus dependentes em uma única transação.
+    
+    Corpo: {"titular": {...}, "dependentes": [{...}, ...]}, ou
+    {"id_titular": N, "dependentes": [...]} para incluir dependentes em um
+    titular existente. tipo_beneficiario e id_titular são preenchidos pela
+    rota. Qualquer erro recusa o lote inteiro, assim como um lote vazio ou
+    com mais dependentes que o limite (recusados antes da validação).
+    """
+    try:
+        dados = request.get_json(silent=True)
+        if not isinstance(dados, dict) or not isinstance(dados.get('titular', {}), dict) \
+                or not isinstance(dados.get('dependentes', []), list) \
+                or not all(isinstance(dependente, dict) for dependente in dados.get('dependentes', [])):
+            return jsonify({'error': 'Envie {"titular": {...}, "dependentes": [...]}'}), 400
+        if ('titular' in dados) == ('id_titular' in dados):
+            return jsonify({'error': 'Informe "titular" ou "id_titular", mas não ambos'}), 400
+        limite = current_app.config.get('LOTE_MAX_DEPENDENTES', MAX_DEPENDENTES_LOTE)
+        if len(dados.get('dependentes', [])) > limite:
+            return jsonify({'error': f'O lote aceita no máximo {limite} dependentes'}), 400
+        if 'id_titular' in dados and not dados.get('dependentes'):
+            return jsonify({'error': 'Lote vazio: informe ao menos um dependente'}), 400
+        
+        # Validação de todos os registros antes de qualquer consulta ao banco
+        erros = {}
+        titular = None
+        if 'titular' in dados:
+            try:
+                titular = beneficiario_schema.load({**dados['titular'], 'tipo_beneficiario': 'Titular'})
+            except ValidationError as e:
+                erros['titular'] = e.messages
+        try:
+            dependentes = beneficiarios_schema.load([
+                {**dependente, 'tipo_beneficiario': 'Dependente'} for dependente in dados.get('dependentes', [])
+            ])
+        except ValidationError as e:
+            dependentes, erros['dependentes'] = [], e.messages
+        for indice, dependente in enumerate(dependentes):
+            if not dependente.get('grau_parentesco'):
+                erros.setdefault('dependentes', {}).setdefault(indice, {})['grau_parentesco'] = [
+                    'Grau de parentesco é obrigatório para dependentes'
+                ]
+        if erros:
+            return jsonify({'error': 'Dados inválidos', 'details': erros}), 400
+        
+        id_titular = dados.get('id_titular')
+        if titular is None:
+            # Única consulta de validação: o titular informado existe e está ativo
+            existe = db.session.scalar(select(Beneficiario.id).where(
+                Beneficiario.id == id_titular, Beneficiario.tipo_beneficiario == 'Titular', Beneficiario.ativo.is_(True)
+            ))
+            if existe is None:
+                return jsonify({'error': 'Titular não encontrado ou inativo'}), 400
+        else:
+            # CPF duplicado é recusado pelo índice único no flush
+            titular = Beneficiario(**titular)
+            db.session.add(titular)
+            db.session.flush()
+            id_titular = titular.id
+        
+        # Um único INSERT ... RETURNING para todos os dependentes
+        novos = [Beneficiario(**{**dependente, 'id_titular': id_titular}) for dependente in dependentes]
+        db.session.add_all(novos)
+        db.session.flush()
+        
+        criados = ([titular] if isinstance(titular, Beneficiario) else []) + novos
+        for beneficiario in criados:
+            registrar_historico(beneficiario.id, 'CRIACAO', None, 'Beneficiário criado')
+        
+        db.session.commit()
+        cache.respostas().invalidar_listas()
+        
+        return jsonify({
+            'titular': beneficiario_schema.dump(titular) if isinstance(titular, Beneficiario) else None,
+            'dependentes': beneficiarios_schema.dump(novos)
+        }), 201
+        
+    except IntegrityError as e:
+        db.session.rollback()
+        if cpf_titular_duplicado(e):
+            return jsonify({'error': 'CPF já cadastrado como titular'}), 400
+        return jsonify({'error': str(e)}), 500
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@beneficiario_bp.route('/beneficiarios/import', methods=['POST'])
+@cross_origin()
+def import_beneficiarios():
+    """Importa beneficiários em lote a partir de um arquivo CSV ou NDJSON"""
+    from src.services import importacao  # leitura de CSV carregada só quando usada
+    
+    try:
+        arquivo = request.files.get('arquivo')
+        if arquivo is None:
+            return jsonify({'error': 'Envie o arquivo no campo "arquivo"'}), 400
+        
+        # Formato pelo parâmetro, ou pela extensão do arquivo
+        formato = request.args.get('formato') or (
+            'csv' if (arquivo.filename or '').lower().endswith('.csv') else 'ndjson'
+        )
+        if formato not in ('csv', 'ndjson'):
+            return jsonify({'error': 'Formato deve ser csv ou ndjson'}), 400
+        
+        tamanho_lote = request.args.get(
+            'lote', current_app.config.get('IMPORTACAO_LOTE', importacao.LOTE_PADRAO), type=int
+        )
+        if tamanho_lote < 1:
+            return jsonify({'error': 'O tamanho do lote deve ser positivo'}), 400
+        
+        registros = importacao.ler_registros(arquivo.stream, formato)
+        try:
+            resultado = importacao.ImportacaoBeneficiarios(tamanho_lote).executar(registros)
+        finally:
+            # Lotes já confirmados continuam gravados mesmo se um lote posterior falhar
+            cache.respostas().invalidar_listas()
+        
+        return jsonify(resultado)
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@beneficiario_bp.route('/beneficiarios/estatisticas', methods=['GET'])
+@cross_origin()
+def get_estatisticas():
+    """Estatísticas agregadas de beneficiários para o dashboard"""
+    try:
+        return jsonify(estatisticas.obter())
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @beneficiario_bp.route('/beneficiarios/<int:beneficiario_id>', methods=['GET'])
 @cross_origin()
 def get_beneficiario(beneficiario_id):
     """Obtém um beneficiário específico"""
     try:
-        beneficiario = Beneficiario.query.filter_by(id=beneficiario_id, ativo=True).first()
-        if not beneficiario:
+        # Apenas o timestamp da versão atual, para responder 304 sem serializar
+        versao = db.session.execute(
+            select(Beneficiario.data_atualizacao).filter_by(id=beneficiario_id, ativo=True)
+        ).first()
+        if versao is None:
             return jsonify({'error': 'Beneficiário não encontrado'}), 404
         
-        return jsonify(beneficiario_schema.dump(beneficiario))
+        fields = request.args.get('fields')
+        try:
+            serializador = beneficiarios_serializador.projecao(fields)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        etag = condicional.calcular_etag(
+            'beneficiario', beneficiario_id, versao.data_atualizacao, condicional.etag_args(request.args)
+        )
+        resposta = condicional.nao_modificado(etag, ultima_modificacao=versao.data_atualizacao)
+        if resposta is not None:
+            return resposta
+        
+        if fields:
+            # Projeção: leitura só das colunas pedidas, sem passar pelo cache
+            linha = db.session.execute(
+                select(*serializador.colunas).filter_by(id=beneficiario_id, ativo=True)
+            ).first()
+            if linha is None:
+                return jsonify({'error': 'Beneficiário não encontrado'}), 404
+            with metricas.cronometro():
+                resposta = jsonify(serializador.dump([linha])[0])
+        else:
+            cache_respostas = cache.respostas()
+            chave_cache = cache_respostas.chave_beneficiario(beneficiario_id, etag)
+            resposta = cache_respostas.obter(chave_cache)
+            if resposta is None:
+                beneficiario = Beneficiario.query.filter_by(id=beneficiario_id, ativo=True).first()
+                if not beneficiario:
+                    return jsonify({'error': 'Beneficiário não encontrado'}), 404
+                with metricas.cronometro():
+                    resposta = jsonify(beneficiario_schema.dump(beneficiario))
+                resposta = cache_respostas.guardar(chave_cache, resposta)
+        
+        return condicional.marcar(resposta, etag, ultima_modificacao=versao.data_atualizacao)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -157,20 +555,28 @@ def update_beneficiario(beneficiario_id):
         # Validar dados de entrada
         result = beneficiario_schema.load(request.json, partial=True)
         
-        # Verificar alterações e registrar histórico
+        # Verificar alterações e registrar histórico (um registro por gravação)
+        alteracoes = {}
         for campo, novo_valor in result.items():
             valor_antigo = getattr(beneficiario, campo)
             if valor_antigo != novo_valor:
-                registrar_historico(beneficiario_id, campo, valor_antigo, novo_valor)
+                alteracoes[campo] = (valor_antigo, novo_valor)
                 setattr(beneficiario, campo, novo_valor)
+        registrar_alteracoes(beneficiario_id, alteracoes)
         
         beneficiario.data_atualizacao = datetime.utcnow()
         db.session.commit()
+        cache.respostas().invalidar_beneficiario(beneficiario_id)
         
         return jsonify(beneficiario_schema.dump(beneficiario))
         
     except ValidationError as e:
         return jsonify({'error': 'Dados inválidos', 'details': e.messages}), 400
+    except IntegrityError as e:
+        db.session.rollback()
+        if cpf_titular_duplicado(e):
+            return jsonify({'error': 'CPF já cadastrado como titular'}), 400
+        return jsonify({'error': str(e)}), 500
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -203,6 +609,7 @@ def delete_beneficiario(beneficiario_id):
         registrar_historico(beneficiario_id, 'EXCLUSAO', 'Ativo', 'Inativo')
         
         db.session.commit()
+        cache.respostas().invalidar_beneficiario(beneficiario_id)
         
         return '', 204
         
@@ -211,84 +618,97 @@ def delete_beneficiario(beneficiario_id):
         return jsonify({'error': str(e)}), 500
 
 @beneficiario_bp.route('/beneficiarios/<int:beneficiario_id>/historico', methods=['GET'])
-@cross_origin()
+@cross_origin(expose_headers=['X-Next-Cursor', 'Link'])
 def get_historico_beneficiario(beneficiario_id):
-    """Obtém o histórico de alterações de um beneficiário"""
+    """Obtém o histórico de alterações de um beneficiário, do mais recente ao mais antigo.
+    
+    Parâmetros opcionais: per_page (registros por página), cursor (cabeçalho
+    X-Next-Cursor da página anterior), since/until (data ISO, intervalo
+    [since, until)) e campo (só alterações desse campo). O corpo continua
+    sendo a lista de alterações; a página seguinte vem nos cabeçalhos
+    X-Next-Cursor e Link. Registros antigos são lidos dos arquivos mensais
+    (services/arquivo_historico) quando a página chega até eles.
+    """
     try:
-        beneficiario = Beneficiario.query.filter_by(id=beneficiario_id).first()
-        if not beneficiario:
+        per_page = min(max(request.args.get('per_page', POR_PAGINA_HISTORICO, type=int), 1), MAX_POR_PAGINA_HISTORICO)
+        campo = request.args.get('campo', '').strip()
+        try:
+            condicoes, inicio, fim = filtros_historico(
+                request.args.get('since'), request.args.get('until'), campo, request.args.get('cursor', '')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Uma única consulta: a linha do beneficiário confirma que ele existe e traz a
+        # versão da ETag; o histórico vem por LEFT JOIN, já filtrado e limitado
+        linhas = db.session.execute(consulta_historico(beneficiario_id, condicoes, per_page + 1)).all()
+        if not linhas:
             return jsonify({'error': 'Beneficiário não encontrado'}), 404
         
-        historico = HistoricoBeneficiario.query.filter_by(
-            beneficiario_id=beneficiario_id
-        ).order_by(HistoricoBeneficiario.data_alteracao.desc()).all()
-        
-        return jsonify(historicos_beneficiario_schema.dump(historico))
+        # Toda alteração que gera histórico também avança data_atualizacao
+        versao = linhas[0].data_atualizacao
+        etag = condicional.calcular_etag('historico', beneficiario_id, versao, condicional.etag_args(request.args))
+        resposta = condicional.nao_modificado(etag, ultima_modificacao=versao)
+        if resposta is not None:
+            return resposta
+        
+        historico = [linha.HistoricoBeneficiario for linha in linhas if linha.HistoricoBeneficiario is not None]
+        if len(historico) <= per_page:
+            # Página incompleta no banco principal: continua nos meses arquivados
+            recentes = {registro.id for registro in historico}
+            criacao = linhas[0].data_criacao
+            inicio = criacao if inicio is None or (criacao and criacao > inicio) else inicio
+            historico += [
+                registro for registro in arquivo_historico.arquivo().consultar(
+                    beneficiario_id, condicoes, per_page + 1 - len(historico), inicio, fim
+                )
+                if registro.id not in recentes
+            ]
+        next_cursor = None
+        if len(historico) > per_page:
+            historico = historico[:per_page]
+            next_cursor = codificar_cursor_historico(historico[-1].data_alteracao, historico[-1].id)
+        
+        # Conjuntos de alterações são expandidos no formato de um registro por campo
+        registros = [linha for registro in historico for linha in registro.por_campo()]
+        if campo:
+            registros = [linha for linha in registros if linha['campo_alterado'] == campo]
+        # Sem cache de respostas: a consulta acima já é a da versão (ETag), e a
+        # página depende dos cabeçalhos de cursor, que o cache não guarda
+        with metricas.cronometro():
+            resposta = jsonify(historicos_beneficiario_schema.dump(registros))
+        if next_cursor:
+            resposta.headers['X-Next-Cursor'] = next_cursor
+            proxima = url_for(
+                '.get_historico_beneficiario', beneficiario_id=beneficiario_id,
+                **{**request.args.to_dict(), 'cursor': next_cursor}
+            )
+            resposta.headers['Link'] = f'<{proxima}>; rel="next"'
+        
+        return condicional.marcar(resposta, etag, ultima_modificacao=versao)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@beneficiario_bp.route('/beneficiarios/cache/metricas', methods=['GET'])
+@cross_origin()
+def get_metricas_cache():
+    """Acertos e falhas do cache de respostas"""
+    return jsonify(cache.respostas().metricas())
+
 @beneficiario_bp.route('/beneficiarios/export/pdf', methods=['GET'])
 @cross_origin()
 def export_beneficiarios_pdf():
     """Exporta beneficiários para PDF"""
+    from src.services import relatorio_pdf  # reportlab só é carregado na primeira exportação
+    
     try:
         # Aplicar os mesmos filtros da listagem
-        nome = request.args.get('nome', '')
-        cpf = request.args.get('cpf', '')
-        matricula = request.args.get('matricula', '')
-        plano = request.args.get('plano', '')
-        situacao = request.args.get('situacao', '')
-        tipo = request.args.get('tipo', '')
-        
-        query = Beneficiario.query.filter_by(ativo=True)
-        
-        if nome:
-            query = query.filter(Beneficiario.nome_completo.ilike(f'%{nome}%'))
-        if cpf:
-            query = query.filter(Beneficiario.cpf.like(f'%{cpf}%'))
-        if matricula:
-            query = query.filter(Beneficiario.matricula.like(f'%{matricula}%'))
-        if plano:
-            query = query.filter(Beneficiario.plano_saude_vinculado.ilike(f'%{plano}%'))
-        if situacao:
-            query = query.filter(Beneficiario.situacao_cadastral == situacao)
-        if tipo:
-            query = query.filter(Beneficiario.tipo_beneficiario == tipo)
-        
-        beneficiarios = query.order_by(Beneficiario.nome_completo).all()
+        linhas = relatorio_pdf.consultar_linhas(request.args)
         
         # Criar PDF
         buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-
-        # Título
-        elements.append(Paragraph("Relatório de Beneficiários", getSampleStyleSheet()['h1']))
-
-        # Tabela de dados
-        data = [[
-            'Matrícula', 'Nome Completo', 'CPF', 'Plano de Saúde', 'Situação'
-        ]]
-        for b in beneficiarios:
-            data.append([
-                b.matricula, b.nome_completo, b.cpf, b.plano_saude_vinculado, b.situacao_cadastral
-            ])
-
-        table = Table(data)
-        style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ])
-        table.setStyle(style)
-
-        elements.append(table)
-        doc.build(elements)
+        relatorio_pdf.gerar_pdf(linhas, buffer, workers=current_app.config.get('RELATORIO_PDF_WORKERS'))
 
         buffer.seek(0)
         
@@ -301,67 +721,101 @@ def export_beneficiarios_pdf():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@beneficiario_bp.route('/beneficiarios/export/pdf/jobs', methods=['POST'])
+@cross_origin()
+def submit_exportacao_pdf():
+    """Enfileira a exportação em PDF para processamento em segundo plano"""
+    try:
+        filtros = request.get_json(silent=True) or {}
+        tarefa, criada = exportacao.fila().submeter(filtros.get('filtros', filtros))
+        
+        response = jsonify(tarefa.to_dict())
+        response.status_code = 202 if criada else 200
+        response.headers['Location'] = url_for('.get_exportacao_pdf', tarefa_id=tarefa.id)
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@beneficiario_bp.route('/beneficiarios/export/pdf/jobs/<tarefa_id>', methods=['GET'])
+@cross_origin()
+def get_exportacao_pdf(tarefa_id):
+    """Consulta o status e o progresso de uma exportação em PDF"""
+    tarefa = exportacao.fila().obter(tarefa_id)
+    if not tarefa:
+        return jsonify({'error': 'Exportação não encontrada ou expirada'}), 404
+    
+    return jsonify(tarefa.to_dict())
+
+@beneficiario_bp.route('/beneficiarios/export/pdf/jobs/<tarefa_id>/download', methods=['GET'])
+@cross_origin()
+def download_exportacao_pdf(tarefa_id):
+    """Baixa o PDF gerado por uma exportação concluída"""
+    tarefa = exportacao.fila().obter(tarefa_id)
+    if not tarefa:
+        return jsonify({'error': 'Exportação não encontrada ou expirada'}), 404
+    if tarefa.status != exportacao.CONCLUIDA:
+        return jsonify({'error': 'Exportação ainda não concluída', 'status': tarefa.status}), 409
+    if not os.path.exists(tarefa.arquivo):
+        return jsonify({'error': 'Exportação não encontrada ou expirada'}), 404
+    
+    return send_file(
+        tarefa.arquivo,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f'beneficiarios_{tarefa.concluida_em.strftime("%Y%m%d_%H%M%S")}.pdf'
+    )
+
 @beneficiario_bp.route('/beneficiarios/export/csv', methods=['GET'])
 @cross_origin()
 def export_beneficiarios_csv():
     """Exporta beneficiários para CSV"""
+    import csv
+    
     try:
         # Aplicar os mesmos filtros da listagem
-        nome = request.args.get('nome', '')
-        cpf = request.args.get('cpf', '')
-        matricula = request.args.get('matricula', '')
-        plano = request.args.get('plano', '')
-        situacao = request.args.get('situacao', '')
-        tipo = request.args.get('tipo', '')
-        
-        query = Beneficiario.query.filter_by(ativo=True)
-        
-        if nome:
-            query = query.filter(Beneficiario.nome_completo.ilike(f'%{nome}%'))
-        if cpf:
-            query = query.filter(Beneficiario.cpf.like(f'%{cpf}%'))
-        if matricula:
-            query = query.filter(Beneficiario.matricula.like(f'%{matricula}%'))
-        if plano:
-            query = query.filter(Beneficiario.plano_saude_vinculado.ilike(f'%{plano}%'))
-        if situacao:
-            query = query.filter(Beneficiario.situacao_cadastral == situacao)
-        if tipo:
-            query = query.filter(Beneficiario.tipo_beneficiario == tipo)
-        
-        beneficiarios = query.order_by(Beneficiario.nome_completo).all()
-        
-        # Criar CSV
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Cabeçalho
-        writer.writerow([
-            'Matrícula', 'Nome Completo', 'CPF', 'Data Nascimento', 'Sexo',
-            'Telefone Celular', 'Email', 'Plano de Saúde', 'Situação',
-            'Tipo Beneficiário', 'Data Criação'
-        ])
-        
-        # Dados
-        for beneficiario in beneficiarios:
+        query = aplicar_filtros(Beneficiario.query.filter_by(ativo=True), request.args)
+        
+        # Apenas as colunas exportadas, lidas em lotes pelo cursor do banco
+        linhas = query.with_entities(*COLUNAS_CSV).order_by(
+            Beneficiario.nome_completo
+        ).yield_per(LOTE_EXPORTACAO_CSV)
+        
+        def gerar_csv():
+            output = io.StringIO()
+            writer = csv.writer(output)
+            
+            # Cabeçalho
             writer.writerow([
-                beneficiario.matricula,
-                beneficiario.nome_completo,
-                beneficiario.cpf,
-                beneficiario.data_nascimento.strftime('%d/%m/%Y') if beneficiario.data_nascimento else '',
-                beneficiario.sexo,
-                beneficiario.telefone_celular,
-                beneficiario.email,
-                beneficiario.plano_saude_vinculado,
-                beneficiario.situacao_cadastral,
-                beneficiario.tipo_beneficiario,
-                beneficiario.data_criacao.strftime('%d/%m/%Y %H:%M') if beneficiario.data_criacao else ''
+                'Matrícula', 'Nome Completo', 'CPF', 'Data Nascimento', 'Sexo',
+                'Telefone Celular', 'Email', 'Plano de Saúde', 'Situação',
+                'Tipo Beneficiário', 'Data Criação'
             ])
+            
+            # Dados: cada lote é escrito e enviado antes de ler o próximo
+            for n, linha in enumerate(linhas, start=1):
+                writer.writerow([
+                    linha.matricula,
+                    linha.nome_completo,
+                    linha.cpf,
+                    linha.data_nascimento.strftime('%d/%m/%Y') if linha.data_nascimento else '',
+                    linha.sexo,
+                    linha.telefone_celular,
+                    linha.email,
+                    linha.plano_saude_vinculado,
+                    linha.situacao_cadastral,
+                    linha.tipo_beneficiario,
+                    linha.data_criacao.strftime('%d/%m/%Y %H:%M') if linha.data_criacao else ''
+                ])
+                if n % LOTE_EXPORTACAO_CSV == 0:
+                    yield output.getvalue()
+                    output.seek(0)
+                    output.truncate()
+            
+            yield output.getvalue()
         
-        # Preparar resposta
-        output.seek(0)
-        response = make_response(output.getvalue())
-        response.headers['Content-Type'] = 'text/csv'
+        # Resposta em streaming: o primeiro byte sai antes do fim da consulta
+        response = Response(stream_with_context(gerar_csv()), mimetype='text/csv')
         response.headers['Content-Disposition'] = f'attachment; filename=beneficiarios_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
         
         return response
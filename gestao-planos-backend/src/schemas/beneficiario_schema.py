@@ -2,6 +2,25 @@ from marshmallow import Schema, fields, validate, validates, ValidationError
 from datetime import datetime
 import re
 
+from src.models.beneficiario import Beneficiario
+from src.schemas.serializador import SerializadorLinhas
+
+
+def digitos_verificadores_cpf(base):
+    """Os dois dígitos verificadores de um CPF a partir dos 9 primeiros dígitos"""
+    # Primeiro dígito verificador
+    soma = sum(int(base[i]) * (10 - i) for i in range(9))
+    resto = soma % 11
+    digito1 = 0 if resto < 2 else 11 - resto
+    
+    # Segundo dígito verificador (inclui o primeiro, com peso 2)
+    soma = sum(int(base[i]) * (11 - i) for i in range(9)) + digito1 * 2
+    resto = soma % 11
+    digito2 = 0 if resto < 2 else 11 - resto
+    
+    return f'{digito1}{digito2}'
+
+
 class BeneficiarioSchema(Schema):
     id = fields.Int(dump_only=True)
     matricula = fields.Str(dump_only=True)
@@ -63,20 +82,7 @@ class BeneficiarioSchema(Schema):
         if cpf == cpf[0] * 11:
             raise ValidationError('CPF inválido')
         
-        # Validação do primeiro dígito verificador
-        soma = sum(int(cpf[i]) * (10 - i) for i in range(9))
-        resto = soma % 11
-        digito1 = 0 if resto < 2 else 11 - resto
-        
-        if int(cpf[9]) != digito1:
-            raise ValidationError('CPF inválido')
-        
-        # Validação do segundo dígito verificador
-        soma = sum(int(cpf[i]) * (11 - i) for i in range(10))
-        resto = soma % 11
-        digito2 = 0 if resto < 2 else 11 - resto
-        
-        if int(cpf[10]) != digito2:
+        if cpf[9:] != digitos_verificadores_cpf(cpf[:9]):
             raise ValidationError('CPF inválido')
     
     @validates('cep')
@@ -113,3 +119,6 @@ beneficiarios_schema = BeneficiarioSchema(many=True)
 historico_beneficiario_schema = HistoricoBeneficiarioSchema()
 historicos_beneficiario_schema = HistoricoBeneficiarioSchema(many=True)
 
+# Dump pré-compilado das listagens: recebe linhas de query.with_entities(*colunas)
+beneficiarios_serializador = SerializadorLinhas(BeneficiarioSchema, Beneficiario)
+
@@ -0,0 +1,91 @@
+from marshmallow import fields
+
+
+def _formatar_iso(formatados):
+    """Conversor de datas que formata cada valor distinto uma única vez"""
+    def formatar(valor):
+        texto = formatados.get(valor)
+        if texto is None:
+            texto = formatados[valor] = valor.isoformat()
+        return texto
+    return formatar
+
+
+class SerializadorLinhas:
+    """Versão pré-compilada do dump de um schema, para linhas de um select() por colunas.
+
+    Os campos do schema são resolvidos uma vez, na criação, em pares
+    (nome, conversor). Textos, inteiros e booleanos já vêm do banco no tipo
+    que o marshmallow produziria e passam direto; datas viram isoformat().
+    Campos de outros tipos usam o próprio field.serialize, mantendo o
+    resultado idêntico ao de schema.dump.
+    """
+
+    def __init__(self, schema, modelo, nomes=None, extras=()):
+        self.schema = schema() if isinstance(schema, type) else schema
+        self.modelo = modelo
+        campos = self.schema.dump_fields
+        if nomes is None:
+            nomes = campos
+        desconhecidos = [nome for nome in nomes if nome not in campos]
+        if desconhecidos:
+            raise ValueError(f"Campos inválidos: {', '.join(desconhecidos)}")
+
+        # Ordem do schema, sem repetições
+        self.nomes = tuple(nome for nome in campos if nome in nomes)
+        self._campos = tuple(campos[nome] for nome in self.nomes)
+        # Colunas extras (ex.: chave do cursor) vão ao SELECT, mas não à resposta
+        self.colunas = tuple(
+            getattr(modelo, campo.attribute or nome) for nome, campo in zip(self.nomes, self._campos)
+        ) + tuple(getattr(modelo, extra) for extra in extras if extra not in self.nomes)
+
+    def projecao(self, fields, extras=()):
+        """Serializador restrito aos campos de `fields` ("id,nome_completo,...").
+
+        Sem campos informados devolve o próprio serializador (todos os campos).
+        Levanta ValueError se algum campo não existir no schema.
+        """
+        nomes = [nome.strip() for nome in (fields or '').split(',') if nome.strip()]
+        if not nomes:
+            return self
+        return SerializadorLinhas(self.schema, self.modelo, nomes, extras)
+
+    def _conversores(self):
+        datas = {}
+        conversores = []  # novos a cada dump: o cache de datas vale só para a resposta
+        for nome, campo in zip(self.nomes, self._campos):
+            if type(campo) in (fields.String, fields.Email, fields.Integer, fields.Boolean):
+                conversores.append(None)
+            elif type(campo) in (fields.Date, fields.DateTime) and campo.format in (None, 'iso'):
+                conversores.append(_formatar_iso(datas))
+            else:
+                conversores.append(
+                    lambda valor, nome=nome, campo=campo: campo._serialize(valor, nome, None)
+                )
+        return conversores
+
+    def dump(self, linhas):
+        """Lista de dicts equivalente a schema.dump(many=True) das mesmas linhas
+
+        Colunas extras no fim de cada linha são ignoradas.
+        """
+        conversores = self._conversores()
+        nomes = self.nomes
+        return [
+            {
+                nome: valor if valor is None or converter is None else converter(valor)
+                for nome, converter, valor in zip(nomes, conversores, linha)
+            }
+            for linha in linhas
+        ]
+
+    def dump_colunas(self, linhas):
+        """Os mesmos valores de dump(), por coluna: {campo: [valor de cada linha]}"""
+        conversores = self._conversores()
+        colunas = list(zip(*linhas)) or [()] * len(self.nomes)
+        return {
+            nome: list(valores) if converter is None else [
+                valor if valor is None else converter(valor) for valor in valores
+            ]
+            for nome, converter, valores in zip(self.nomes, conversores, colunas)
+        }
@@ -0,0 +1,131 @@
+"""Validação vetorizada (NumPy) de CPF, CEP e data de nascimento para cargas em lote.
+
+Cada validador recebe a coluna inteira e devolve {mensagem: máscara}, com
+uma máscara booleana por erro (True = linha com o erro). As mensagens e as
+regras são as mesmas de BeneficiarioSchema; BeneficiarioLoteSchema troca os
+validadores por registro por estes quando usado com many=True.
+"""
+from datetime import date
+
+import numpy as np
+from marshmallow import ValidationError, validates_schema
+
+from src.schemas.beneficiario_schema import BeneficiarioSchema
+
+# Pesos dos dígitos verificadores do CPF
+PESOS_DV1 = np.arange(10, 1, -1, dtype=np.int32)
+PESOS_DV2 = np.arange(11, 2, -1, dtype=np.int32)
+
+CPF_TAMANHO = 'CPF deve ter 11 dígitos'
+CPF_INVALIDO = 'CPF inválido'
+CEP_TAMANHO = 'CEP deve ter 8 dígitos'
+NASCIMENTO_FUTURO = 'Data de nascimento não pode ser futura'
+NASCIMENTO_HOJE = 'Data de nascimento deve ser anterior à data atual'
+
+
+def _caracteres(valores):
+    """Matriz (linhas, largura) com o código de cada caractere; 0 completa as linhas curtas"""
+    textos = np.asarray(valores, dtype=str)
+    if textos.size == 0:
+        return np.zeros((0, 1), dtype=np.uint32)
+    return textos.view(np.uint32).reshape(len(textos), -1)
+
+
+def _digitos(valores):
+    """(valor de cada caractere como dígito, máscara de dígitos ASCII, dígitos por linha)"""
+    # Sem sinal: caracteres abaixo de '0' dão valores enormes, e basta um teste <= 9
+    valores = _caracteres(valores) - np.uint32(ord('0'))
+    mascara = valores <= 9
+    return valores, mascara, mascara.sum(axis=1, dtype=np.int32)
+
+
+def _verificador(soma):
+    resto = soma % 11
+    return np.where(resto < 2, 0, 11 - resto)
+
+
+def validar_cpfs(cpfs):
+    """Máscaras de erro de uma coluna de CPFs, com ou sem pontuação"""
+    valores, mascara, quantidade = _digitos(cpfs)
+    tamanho_errado = quantidade != 11
+    invalido = np.zeros(len(tamanho_errado), dtype=bool)
+
+    completos = ~tamanho_errado
+    if completos.any():
+        # Linhas com exatamente 11 dígitos: os dígitos formam uma matriz (n, 11)
+        digitos = valores[completos][mascara[completos]].astype(np.int32).reshape(-1, 11)
+        repetidos = (digitos == digitos[:, :1]).all(axis=1)
+        dv1 = _verificador(digitos[:, :9] @ PESOS_DV1)
+        dv2 = _verificador(digitos[:, :9] @ PESOS_DV2 + dv1 * 2)
+        invalido[completos] = repetidos | (dv1 != digitos[:, 9]) | (dv2 != digitos[:, 10])
+
+    return {CPF_TAMANHO: tamanho_errado, CPF_INVALIDO: invalido}
+
+
+def validar_ceps(ceps):
+    """Máscaras de erro de uma coluna de CEPs, com ou sem hífen"""
+    _, _, quantidade = _digitos(ceps)
+    return {CEP_TAMANHO: quantidade != 8}
+
+
+def validar_datas_nascimento(datas, hoje=None):
+    """Máscaras de erro de uma coluna de datas de nascimento (date)"""
+    # Dias desde 01/01/0001: converter date por date.toordinal é bem mais rápido que datetime64
+    datas = np.fromiter(map(date.toordinal, datas), dtype=np.int64, count=len(datas))
+    hoje = (hoje or date.today()).toordinal()
+    return {NASCIMENTO_FUTURO: datas > hoje, NASCIMENTO_HOJE: datas == hoje}
+
+
+VALIDADORES = {
+    'cpf': validar_cpfs,
+    'cep': validar_ceps,
+    'data_nascimento': validar_datas_nascimento,
+}
+
+
+def erros_por_linha(registros, validadores=VALIDADORES):
+    """Erros dos registros no formato de schema.load(many=True): {índice: {campo: [mensagens]}}
+
+    Registros sem o campo (ausente ou já recusado por outro validador) são ignorados.
+    """
+    erros = {}
+    for campo, validador in validadores.items():
+        valores = [registro.get(campo) for registro in registros]
+        indices = range(len(valores))
+        if None in valores:
+            indices = [indice for indice, valor in enumerate(valores) if valor is not None]
+            valores = [valores[indice] for indice in indices]
+        if not valores:
+            continue
+        for mensagem, mascara in validador(valores).items():
+            for posicao in np.flatnonzero(mascara).tolist():
+                erros.setdefault(indices[posicao], {}).setdefault(campo, []).append(mensagem)
+    return erros
+
+
+class BeneficiarioLoteSchema(BeneficiarioSchema):
+    """BeneficiarioSchema para cargas com many=True: CPF, CEP e data de nascimento
+    validados de uma vez para todo o lote, com os mesmos erros por linha.
+
+    Diferente da classe base, o campo recusado por esses validadores continua
+    em valid_data; as cargas em lote descartam a linha inteira com erro.
+    """
+
+    # Sem os @validates por registro da classe base
+    def validate_cpf(self, value, **kwargs):
+        pass
+
+    def validate_cep(self, value, **kwargs):
+        pass
+
+    def validate_data_nascimento(self, value, **kwargs):
+        pass
+
+    # Roda mesmo com erros de campo em outras linhas, para não deixar de validar nenhuma
+    @validates_schema(pass_collection=True, skip_on_field_errors=False)
+    def validar_lote(self, dados, many, **kwargs):
+        registros = dados if many else [dados]
+        erros = erros_por_linha(registros)
+        if not erros:
+            return
+        raise ValidationError(erros if many else erros[0])
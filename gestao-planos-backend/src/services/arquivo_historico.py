@@ -0,0 +1,266 @@
+"""Arquivamento do histórico de beneficiários em bancos SQLite mensais.
+
+Registros com data_alteracao anterior ao horizonte (HISTORICO_ARQUIVO_MESES,
+contado em meses fechados) saem de historico_beneficiarios e vão para
+arquivos historico_AAAA_MM.db em HISTORICO_ARQUIVO_DIR, com a mesma tabela,
+os mesmos ids e o mesmo índice. O banco principal fica só com o histórico
+recente; a consulta do histórico continua nos arquivos quando a página
+alcança meses arquivados.
+
+Um índice (indice.db no mesmo diretório) guarda em quais meses cada
+beneficiário tem registros arquivados. A consulta só abre essas partições, e
+nenhuma quando a faixa pedida começa depois do último mês arquivado (caso de
+quem foi criado depois do horizonte). Arquivos sem índice, de versões
+anteriores, são indexados na próxima execução do arquivamento.
+
+O arquivamento é feito pelo comando `flask arquivar-historico`, pensado
+para ser agendado (cron) uma vez por mês.
+"""
+import os
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+import click
+from flask import current_app
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, delete, insert, select
+from sqlalchemy.engine import make_url
+
+from src.database.database import db
+from src.models.beneficiario import HistoricoBeneficiario
+
+LOTE = 5000
+PADRAO_ARQUIVO = re.compile(r'^historico_(\d{4})_(\d{2})\.db$')
+
+historico = HistoricoBeneficiario.__table__
+
+# Meses (AAAA-MM) com registros arquivados de cada beneficiário
+NOME_INDICE = 'indice.db'
+indice = Table(
+    'meses_beneficiario', MetaData(),
+    Column('beneficiario_id', Integer, primary_key=True),
+    Column('mes', String(7), primary_key=True),
+    sqlite_with_rowid=False,
+)
+
+
+def inicio_do_mes(data):
+    return datetime(data.year, data.month, 1)
+
+
+def somar_meses(mes, meses):
+    indice = mes.year * 12 + mes.month - 1 + meses
+    return datetime(indice // 12, indice % 12 + 1, 1)
+
+
+class ArquivoHistorico:
+    """Partições mensais do histórico arquivado em um diretório"""
+
+    def __init__(self, diretorio, meses):
+        self.diretorio = diretorio
+        self.meses = meses
+        self._engines = {}
+        self._particoes = None
+        self._lock = threading.Lock()
+
+    def caminho(self, mes):
+        return os.path.join(self.diretorio, f'historico_{mes.year:04d}_{mes.month:02d}.db')
+
+    @property
+    def caminho_indice(self):
+        return os.path.join(self.diretorio, NOME_INDICE)
+
+    def horizonte(self, agora=None):
+        """Início do mês mais antigo mantido no banco principal"""
+        return somar_meses(inicio_do_mes(agora or datetime.utcnow()), -self.meses)
+
+    def particoes(self):
+        """Meses arquivados (início do mês), do mais recente ao mais antigo"""
+        try:
+            # A lista só muda quando um arquivo é criado, o que muda a data do diretório
+            versao = os.stat(self.diretorio).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        if self._particoes is None or self._particoes[0] != versao:
+            meses = []
+            for nome in os.listdir(self.diretorio):
+                encontrado = PADRAO_ARQUIVO.match(nome)
+                if encontrado:
+                    meses.append(datetime(int(encontrado.group(1)), int(encontrado.group(2)), 1))
+            self._particoes = (versao, sorted(meses, reverse=True))
+        return self._particoes[1]
+
+    def fim_arquivado(self):
+        """Fim (exclusivo) do último mês arquivado, ou None sem arquivos"""
+        particoes = self.particoes()
+        return somar_meses(particoes[0], 1) if particoes else None
+
+    def meses_do_beneficiario(self, beneficiario_id):
+        """Meses arquivados com registros do beneficiário, do mais recente ao mais antigo"""
+        if not os.path.exists(self.caminho_indice):
+            return self.particoes()
+        with self._engine_leitura(self.caminho_indice).connect() as conexao:
+            meses = conexao.scalars(
+                select(indice.c.mes).where(indice.c.beneficiario_id == beneficiario_id).order_by(indice.c.mes.desc())
+            ).all()
+        return [datetime.strptime(mes, '%Y-%m') for mes in meses]
+
+    def _engine_leitura(self, caminho):
+        with self._lock:
+            engine = self._engines.get(caminho)
+            if engine is None:
+                engine = self._engines[caminho] = create_engine(
+                    f'sqlite:///file:{caminho}?mode=ro&uri=true'
+                )
+            return engine
+
+    def consultar(self, beneficiario_id, condicoes, limite, inicio=None, fim=None):
+        """Até `limite` registros arquivados do beneficiário, do mais recente ao mais antigo.
+
+        `condicoes` são as mesmas do histórico no banco principal; `inicio` e
+        `fim` (inclusivos) descartam os meses fora da faixa sem abri-los, e
+        só são abertos os meses em que o índice registra o beneficiário. Os
+        registros voltam como HistoricoBeneficiario fora da sessão.
+        """
+        fim_arquivado = self.fim_arquivado()
+        if fim_arquivado is None or (inicio is not None and inicio >= fim_arquivado):
+            return []
+        registros = []
+        for mes in self.meses_do_beneficiario(beneficiario_id):
+            if len(registros) >= limite:
+                break
+            if (fim is not None and mes > fim) or (inicio is not None and somar_meses(mes, 1) <= inicio):
+                continue
+            with self._engine_leitura(self.caminho(mes)).connect() as conexao:
+                linhas = conexao.execute(
+                    select(historico)
+                    .where(historico.c.beneficiario_id == beneficiario_id, *condicoes)
+                    .order_by(historico.c.data_alteracao.desc(), historico.c.id.desc())
+                    .limit(limite - len(registros))
+                ).all()
+            registros.extend(HistoricoBeneficiario(**linha._mapping) for linha in linhas)
+        return registros
+
+    def arquivar(self, horizonte=None, progresso=None):
+        """Move para os arquivos mensais o histórico anterior ao horizonte; devolve o total movido.
+
+        Cada lote é gravado nos arquivos e no índice antes de ser apagado do
+        banco principal; gravações repetidas (INSERT OR IGNORE) tornam
+        seguro repetir o comando após uma interrupção.
+        """
+        horizonte = horizonte or self.horizonte()
+        os.makedirs(self.diretorio, exist_ok=True)
+        destinos = {}
+        total = ultimo_id = 0
+        if not os.path.exists(self.caminho_indice):
+            self._indexar_particoes()
+        engine_indice = create_engine(f'sqlite:///{self.caminho_indice}')
+        try:
+            while True:
+                # Percorre pelo id: os registros antigos estão no começo da tabela
+                linhas = db.session.execute(
+                    select(historico)
+                    .where(historico.c.data_alteracao < horizonte, historico.c.id > ultimo_id)
+                    .order_by(historico.c.id)
+                    .limit(LOTE)
+                ).all()
+                if not linhas:
+                    break
+
+                por_mes = defaultdict(list)
+                for linha in linhas:
+                    por_mes[inicio_do_mes(linha.data_alteracao)].append(dict(linha._mapping))
+                for mes, registros in por_mes.items():
+                    destino = destinos.get(mes)
+                    if destino is None:
+                        destino = destinos[mes] = create_engine(f'sqlite:///{self.caminho(mes)}')
+                        historico.create(destino, checkfirst=True)
+                    with destino.begin() as conexao:
+                        conexao.execute(insert(historico).prefix_with('OR IGNORE'), registros)
+                with engine_indice.begin() as conexao:
+                    conexao.execute(insert(indice).prefix_with('OR IGNORE'), [
+                        {'beneficiario_id': beneficiario_id, 'mes': f'{mes:%Y-%m}'}
+                        for mes, registros in por_mes.items()
+                        for beneficiario_id in {registro['beneficiario_id'] for registro in registros}
+                    ])
+
+                db.session.execute(delete(historico).where(historico.c.id.in_([linha.id for linha in linhas])))
+                db.session.commit()
+                ultimo_id = linhas[-1].id
+                total += len(linhas)
+                if progresso:
+                    progresso(total)
+        finally:
+            for destino in destinos.values():
+                destino.dispose()
+            engine_indice.dispose()
+        return total
+
+    def _indexar_particoes(self):
+        """Cria o índice a partir das partições já existentes (vazio, se não houver)"""
+        temporario = self.caminho_indice + '.tmp'
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        engine_indice = create_engine(f'sqlite:///{temporario}')
+        try:
+            indice.create(engine_indice)
+            for mes in self.particoes():
+                origem = create_engine(f'sqlite:///file:{self.caminho(mes)}?mode=ro&uri=true')
+                try:
+                    with origem.connect() as conexao:
+                        ids = conexao.scalars(select(historico.c.beneficiario_id).distinct()).all()
+                finally:
+                    origem.dispose()
+                if ids:
+                    with engine_indice.begin() as conexao:
+                        conexao.execute(insert(indice), [
+                            {'beneficiario_id': beneficiario_id, 'mes': f'{mes:%Y-%m}'} for beneficiario_id in ids
+                        ])
+        finally:
+            engine_indice.dispose()
+        # Só um índice completo passa a ser usado pelas consultas
+        os.replace(temporario, self.caminho_indice)
+
+    def fechar(self):
+        with self._lock:
+            for engine in self._engines.values():
+                engine.dispose()
+            self._engines.clear()
+
+
+def _diretorio_padrao(app):
+    """Ao lado do arquivo do banco principal, ou na pasta instance do app"""
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:'):
+        return os.path.join(os.path.dirname(os.path.abspath(url.database)), 'arquivo_historico')
+    return os.path.join(app.instance_path, 'arquivo_historico')
+
+
+def init_app(app):
+    """Configura o diretório e o horizonte do arquivo e registra `flask arquivar-historico`"""
+    app.config.setdefault('HISTORICO_ARQUIVO_MESES', int(os.environ.get('HISTORICO_ARQUIVO_MESES', 12)))
+    app.config.setdefault('HISTORICO_ARQUIVO_DIR', os.environ.get('HISTORICO_ARQUIVO_DIR') or _diretorio_padrao(app))
+    app.extensions['arquivo_historico'] = ArquivoHistorico(
+        app.config['HISTORICO_ARQUIVO_DIR'], app.config['HISTORICO_ARQUIVO_MESES']
+    )
+
+    @app.cli.command('arquivar-historico')
+    @click.option('--meses', type=int, default=None, help='meses mantidos no banco principal')
+    @click.option('--vacuum', is_flag=True, help='executa VACUUM no SQLite principal ao final')
+    def arquivar_historico(meses, vacuum):
+        """Move o histórico antigo para os arquivos mensais"""
+        atual = arquivo()
+        horizonte = atual.horizonte() if meses is None else somar_meses(inicio_do_mes(datetime.utcnow()), -meses)
+        total = atual.arquivar(horizonte, progresso=lambda n: click.echo(f'\r{n} registros', nl=False, err=True))
+        if total:
+            click.echo(err=True)
+        click.echo(f'{total} registros anteriores a {horizonte:%Y-%m-%d} arquivados em {atual.diretorio}')
+        if vacuum and db.engine.dialect.name == 'sqlite':
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conexao:
+                conexao.exec_driver_sql('VACUUM')
+
+
+def arquivo():
+    """Arquivo de histórico do app atual"""
+    return current_app.extensions['arquivo_historico']
@@ -0,0 +1,269 @@
+import re
+import unicodedata
+
+import click
+from flask import current_app, has_app_context
+from sqlalchemy import Integer, event, func, literal_column, or_, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql import column, table
+
+from src.database.database import db
+from src.models.beneficiario import Beneficiario
+
+# Índice de busca textual (SQLite FTS5 com tokenizador trigram).
+# O trigram permite casar substrings com o índice, o que um LIKE '%x%'
+# sobre B-tree não consegue. Os valores são gravados já normalizados.
+TABELA = 'beneficiarios_busca'
+TAMANHO_MINIMO = 3  # o trigram só casa termos com pelo menos 3 caracteres
+LOTE_REINDEXACAO = 2000
+
+# Filtro da listagem -> coluna do índice
+COLUNAS = {
+    'nome': 'nome',
+    'cpf': 'cpf',
+    'matricula': 'matricula',
+    'plano': 'plano',
+}
+
+indice = table(
+    TABELA,
+    column('rowid', Integer),
+    column('nome'),
+    column('cpf'),
+    column('matricula'),
+    column('plano'),
+    column('rank'),
+)
+
+
+def normalizar_texto(valor):
+    """Remove acentos, converte para minúsculas e colapsa espaços"""
+    if not valor:
+        return ''
+    decomposto = unicodedata.normalize('NFKD', valor)
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(sem_acentos.lower().split())
+
+
+def normalizar_documento(valor):
+    """Mantém apenas os dígitos (CPF com ou sem pontuação)"""
+    return re.sub(r'[^0-9]', '', valor or '')
+
+
+def normalizar_termo(filtro, termo):
+    if filtro == 'cpf':
+        return normalizar_documento(termo)
+    return normalizar_texto(termo)
+
+
+def valores_indexados(beneficiario):
+    """Valores normalizados gravados no índice para um beneficiário"""
+    return {
+        'id': beneficiario.id,
+        'nome': normalizar_texto(beneficiario.nome_completo),
+        'cpf': normalizar_documento(beneficiario.cpf),
+        'matricula': normalizar_texto(beneficiario.matricula),
+        'plano': normalizar_texto(beneficiario.plano_saude_vinculado),
+    }
+
+
+def indice_ativo():
+    """Indica se o índice FTS existe no banco do app atual (verificado uma vez)"""
+    if not has_app_context():
+        return False
+    ativo = current_app.extensions.get('busca')
+    if ativo is None:
+        ativo = current_app.extensions['busca'] = _indice_existe()
+    return ativo
+
+
+def _indice_existe():
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    with db.engine.connect() as conexao:
+        return conexao.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TABELA,)
+        ).first() is not None
+
+
+def _frase(termo):
+    return '"' + termo.replace('"', '""') + '"'
+
+
+def _consulta_fts(filtro, termo):
+    """Monta a expressão MATCH do FTS5 para uma coluna, ou None se o termo for curto"""
+    normalizado = normalizar_termo(filtro, termo)
+    if len(normalizado) < TAMANHO_MINIMO:
+        return None
+    if filtro is not None:
+        return f'{COLUNAS[filtro]} : {_frase(normalizado)}'
+    # Busca livre: o CPF é indexado só com dígitos, então um termo com
+    # pontuação (123.456.789-09) também é procurado pelos seus dígitos
+    digitos = normalizar_documento(termo)
+    if len(digitos) >= TAMANHO_MINIMO and digitos != normalizado:
+        return f'{_frase(normalizado)} OR cpf : {_frase(digitos)}'
+    return _frase(normalizado)
+
+
+def _match(consulta):
+    return literal_column(TABELA).op('MATCH')(consulta)
+
+
+def filtrar(query, filtro, termo):
+    """Aplica um filtro de substring usando o índice; sem índice, usa LIKE como antes"""
+    consulta = _consulta_fts(filtro, termo) if indice_ativo() else None
+    if consulta is not None:
+        ids = select(indice.c.rowid).where(_match(consulta))
+        return query.filter(Beneficiario.id.in_(ids))
+
+    if filtro == 'nome':
+        return query.filter(Beneficiario.nome_completo.ilike(f'%{termo}%'))
+    if filtro == 'cpf':
+        return query.filter(Beneficiario.cpf.like(f'%{termo}%'))
+    if filtro == 'matricula':
+        return query.filter(Beneficiario.matricula.like(f'%{termo}%'))
+    return query.filter(Beneficiario.plano_saude_vinculado.ilike(f'%{termo}%'))
+
+
+def aplicar_filtros(query, args):
+    """Aplica os filtros da listagem (também usados nas exportações)"""
+    # Filtros de substring passam pelo índice de busca textual quando disponível
+    for filtro in ('nome', 'cpf', 'matricula', 'plano'):
+        termo = args.get(filtro, '')
+        if termo:
+            query = filtrar(query, filtro, termo)
+
+    situacao = args.get('situacao', '')
+    if situacao:
+        query = query.filter(Beneficiario.situacao_cadastral == situacao)
+    tipo = args.get('tipo', '')
+    if tipo:
+        query = query.filter(Beneficiario.tipo_beneficiario == tipo)
+
+    return query
+
+
+def buscar(query, termo, ordenar=True):
+    """Busca livre em nome, CPF, matrícula e plano, ordenada por relevância.
+
+    Correspondências no início do nome vêm primeiro, seguidas pelo rank
+    (bm25) do FTS5. Sem índice, filtra com LIKE e ordena por nome. Com
+    ordenar=False apenas filtra, deixando a ordenação para o chamador.
+    """
+    consulta = _consulta_fts(None, termo) if indice_ativo() else None
+    if consulta is None:
+        query = query.filter(or_(
+            Beneficiario.nome_completo.ilike(f'%{termo}%'),
+            Beneficiario.cpf.like(f'%{termo}%'),
+            Beneficiario.matricula.like(f'%{termo}%'),
+            Beneficiario.plano_saude_vinculado.ilike(f'%{termo}%'),
+        ))
+        if ordenar:
+            query = query.order_by(Beneficiario.nome_completo, Beneficiario.id)
+        return query
+
+    if not ordenar:
+        return query.filter(Beneficiario.id.in_(select(indice.c.rowid).where(_match(consulta))))
+
+    prefixo = normalizar_texto(termo).replace('%', '').replace('_', '') + '%'
+    relevancia = select(
+        indice.c.rowid.label('id'),
+        indice.c.nome.like(prefixo).label('prefixo'),
+        indice.c.rank.label('rank'),
+    ).where(_match(consulta)).cte('relevancia')
+    # Sem MATERIALIZED o SQLite pode achatar a subconsulta e refazer o MATCH
+    # para cada beneficiário (ex.: no COUNT da paginação)
+    if db.engine.dialect.dbapi.sqlite_version_info >= (3, 35):
+        relevancia = relevancia.prefix_with('MATERIALIZED')
+
+    return query.join(relevancia, relevancia.c.id == Beneficiario.id).order_by(
+        relevancia.c.prefixo.desc(), relevancia.c.rank, Beneficiario.nome_completo, Beneficiario.id
+    )
+
+
+def indexar(conexao, beneficiarios):
+    """Insere ou substitui beneficiários no índice (lista de valores_indexados)"""
+    linhas = list(beneficiarios)
+    if not linhas:
+        return
+    conexao.execute(indice.delete().where(indice.c.rowid.in_([l['id'] for l in linhas])))
+    conexao.execute(
+        indice.insert(),
+        [{'rowid': l['id'], 'nome': l['nome'], 'cpf': l['cpf'],
+          'matricula': l['matricula'], 'plano': l['plano']} for l in linhas]
+    )
+
+
+def reconstruir(conexao):
+    """Recria o conteúdo do índice a partir da tabela beneficiarios"""
+    conexao.execute(indice.delete())
+    colunas = select(
+        Beneficiario.id, Beneficiario.nome_completo, Beneficiario.cpf,
+        Beneficiario.matricula, Beneficiario.plano_saude_vinculado
+    ).order_by(Beneficiario.id)
+    lote = []
+    total = 0
+    for linha in conexao.execute(colunas):
+        lote.append(valores_indexados(linha))
+        if len(lote) >= LOTE_REINDEXACAO:
+            indexar(conexao, lote)
+            total += len(lote)
+            lote = []
+    indexar(conexao, lote)
+    return total + len(lote)
+
+
+def criar_indice(conexao):
+    """Cria a tabela FTS5; OperationalError se o SQLite não tiver FTS5/trigram"""
+    conexao.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA} "
+        f"USING fts5(nome, cpf, matricula, plano, tokenize='trigram')"
+    )
+
+
+def preparar():
+    """Cria o índice FTS5 (se o banco suportar) e o preenche se estiver vazio.
+
+    Faz parte da inicialização explícita do banco (flask init-db), não do boot.
+    """
+    current_app.extensions['busca'] = False
+    if db.engine.dialect.name != 'sqlite':
+        return
+    try:
+        with db.engine.begin() as conexao:
+            criar_indice(conexao)
+            indexados = conexao.execute(select(func.count()).select_from(indice)).scalar()
+            if not indexados and conexao.execute(select(func.count(Beneficiario.id))).scalar():
+                reconstruir(conexao)
+    except OperationalError:
+        # SQLite compilado sem FTS5/trigram: os filtros continuam com LIKE
+        return
+    current_app.extensions['busca'] = True
+
+
+def init_app(app):
+    """Registra o comando de reindexação; o índice é detectado no primeiro uso"""
+    app.extensions['busca'] = None
+
+    @app.cli.command('reindexar-busca')
+    def reindexar_busca():
+        """Reconstrói o índice de busca textual de beneficiários"""
+        with db.engine.begin() as conexao:
+            total = reconstruir(conexao)
+        click.echo(f'{total} beneficiários indexados')
+
+
+@event.listens_for(Beneficiario, 'after_insert')
+def _indexar_inclusao(mapper, conexao, beneficiario):
+    if indice_ativo():
+        indexar(conexao, [valores_indexados(beneficiario)])
+
+
+@event.listens_for(Beneficiario, 'after_update')
+def _indexar_alteracao(mapper, conexao, beneficiario):
+    if not indice_ativo():
+        return
+    estado = db.inspect(beneficiario)
+    campos = ('nome_completo', 'cpf', 'matricula', 'plano_saude_vinculado')
+    if any(estado.attrs[campo].history.has_changes() for campo in campos):
+        indexar(conexao, [valores_indexados(beneficiario)])
@@ -0,0 +1,193 @@
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from urllib.parse import urlencode
+
+from flask import Response, current_app
+
+
+class CacheLocal:
+    """Cache em memória do processo, com descarte LRU e expiração por TTL"""
+
+    nome = 'local'
+
+    def __init__(self, capacidade=1024, ttl=60):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            valor, expira_em = item
+            if expira_em is not None and expira_em <= time.monotonic():
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return valor
+
+    def definir(self, chave, valor, ttl=-1):
+        """Grava um valor; ttl=-1 usa o TTL padrão e ttl=None não expira"""
+        ttl = self.ttl if ttl == -1 else ttl
+        expira_em = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._itens[chave] = (valor, expira_em)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+
+    def remover(self, chave):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def tamanho(self):
+        return len(self._itens)
+
+
+class CacheRedis:
+    """Cache compartilhado entre processos/servidores, via Redis (opcional)"""
+
+    nome = 'redis'
+
+    def __init__(self, url, ttl=60, prefixo='gestao-planos:'):
+        import redis  # dependência opcional, carregada só quando configurada
+
+        self.cliente = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefixo = prefixo
+
+    def obter(self, chave):
+        return self.cliente.get(self.prefixo + chave)
+
+    def definir(self, chave, valor, ttl=-1):
+        ttl = self.ttl if ttl == -1 else ttl
+        self.cliente.set(self.prefixo + chave, valor, ex=ttl)
+
+    def remover(self, chave):
+        self.cliente.delete(self.prefixo + chave)
+
+    def tamanho(self):
+        return None
+
+
+class CacheNulo:
+    """Backend usado com CACHE_BACKEND='desativado': não guarda nada"""
+
+    nome = 'desativado'
+
+    def obter(self, chave):
+        return None
+
+    def definir(self, chave, valor, ttl=-1):
+        pass
+
+    def remover(self, chave):
+        pass
+
+    def tamanho(self):
+        return 0
+
+
+class CacheRespostas:
+    """Cache de respostas JSON das rotas de leitura de beneficiários.
+
+    As chaves são a ETag da resposta, que já combina a versão dos dados
+    (data_atualizacao do registro ou o maior da tabela), o formato e os
+    parâmetros normalizados. Assim o corpo em cache é sempre o da versão
+    anunciada, mesmo com o cache local de cada worker: uma gravação feita
+    em outro processo muda a versão e, com ela, a chave. As listagens usam
+    ainda um token de geração: invalidar é trocar o token, o que libera de
+    uma vez as entradas antigas do próprio processo. Se o token for
+    descartado pelo LRU, um novo é criado, então entradas antigas nunca são
+    reaproveitadas por engano. O histórico não passa pelo cache: é paginado
+    por cursor e validado só pela ETag.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.acertos = Counter()
+        self.falhas = Counter()
+
+    @staticmethod
+    def normalizar_args(args):
+        return urlencode(sorted((k, v) for k, v in args.items(multi=True) if v != ''))
+
+    def _geracao(self, nome):
+        token = self.backend.obter(f'geracao:{nome}')
+        if token is None:
+            token = self._nova_geracao(nome)
+        return token.decode() if isinstance(token, bytes) else token
+
+    def _nova_geracao(self, nome):
+        token = uuid.uuid4().hex[:12]
+        self.backend.definir(f'geracao:{nome}', token, ttl=None)
+        return token
+
+    def chave_lista(self, etag):
+        return f"lista:{self._geracao('lista')}:{etag}"
+
+    def chave_beneficiario(self, beneficiario_id, etag):
+        return f'beneficiario:{beneficiario_id}:{etag}'
+
+    def obter(self, chave, mimetype='application/json'):
+        """Resposta em cache para a chave, ou None"""
+        tipo = chave.split(':', 1)[0]
+        corpo = self.backend.obter(chave)
+        if corpo is None:
+            self.falhas[tipo] += 1
+            return None
+        self.acertos[tipo] += 1
+        return Response(corpo, mimetype=mimetype)
+
+    def guardar(self, chave, resposta):
+        """Guarda o corpo de uma resposta 200 e a devolve"""
+        if resposta.status_code == 200:
+            self.backend.definir(chave, resposta.get_data())
+        return resposta
+
+    def invalidar_listas(self):
+        self._nova_geracao('lista')
+
+    def invalidar_beneficiario(self, beneficiario_id):
+        """Invalida todas as listagens; a entrada do beneficiário muda de chave com a nova versão"""
+        self.invalidar_listas()
+
+    def metricas(self):
+        acertos, falhas = sum(self.acertos.values()), sum(self.falhas.values())
+        return {
+            'backend': self.backend.nome,
+            'acertos': acertos,
+            'falhas': falhas,
+            'taxa_acerto': round(acertos / (acertos + falhas), 4) if acertos + falhas else 0,
+            'por_tipo': {
+                tipo: {'acertos': self.acertos[tipo], 'falhas': self.falhas[tipo]}
+                for tipo in sorted(set(self.acertos) | set(self.falhas))
+            },
+            'itens': self.backend.tamanho()
+        }
+
+
+def init_app(app):
+    """Configura o cache de respostas a partir de CACHE_BACKEND ('local', 'redis' ou 'desativado')"""
+    app.config.setdefault('CACHE_BACKEND', 'local')
+    app.config.setdefault('CACHE_TTL', 60)
+    app.config.setdefault('CACHE_CAPACIDADE', 1024)
+    app.config.setdefault('CACHE_REDIS_URL', None)
+
+    backend = app.config['CACHE_BACKEND']
+    if backend == 'desativado':
+        backend = CacheNulo()
+    elif backend == 'redis':
+        backend = CacheRedis(app.config['CACHE_REDIS_URL'], ttl=app.config['CACHE_TTL'])
+    else:
+        backend = CacheLocal(app.config['CACHE_CAPACIDADE'], ttl=app.config['CACHE_TTL'])
+    app.extensions['cache'] = CacheRespostas(backend)
+
+
+def respostas():
+    """Cache de respostas do app atual"""
+    return current_app.extensions['cache']
@@ -0,0 +1,111 @@
+"""Compressão negociada (Accept-Encoding) das respostas: brotli, se instalado, ou gzip.
+
+Respostas comuns são comprimidas de uma vez; respostas em streaming (exportação
+CSV) são comprimidas parte a parte, sem juntar o corpo na memória. Arquivos
+(send_file e estáticos, com direct_passthrough) seguem como estão: mantêm
+Content-Length, faixas (Range) e o sendfile do servidor. Os estáticos têm
+variantes .br/.gz prontas no disco (ver estaticos).
+"""
+import zlib
+
+from flask import request
+
+try:
+    import brotli  # dependência opcional: sem ela, apenas gzip
+except ImportError:
+    brotli = None
+
+TIPOS_COMPRIMIVEIS = {
+    'application/json', 'application/vnd.columnar+json', 'text/csv', 'application/pdf',
+    'text/plain', 'text/html', 'text/css', 'application/javascript', 'text/javascript', 'image/svg+xml',
+}
+
+
+class CompressorGzip:
+    def __init__(self, nivel):
+        # wbits=31: formato gzip (cabeçalho e CRC), não zlib puro
+        self._objeto = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+
+    def comprimir(self, dados):
+        return self._objeto.compress(dados)
+
+    def finalizar(self):
+        return self._objeto.flush()
+
+
+class CompressorBrotli:
+    def __init__(self, qualidade):
+        self._objeto = brotli.Compressor(quality=qualidade)
+
+    def comprimir(self, dados):
+        return self._objeto.process(dados)
+
+    def finalizar(self):
+        return self._objeto.finish()
+
+
+def _compressor(codificacao, config):
+    if codificacao == 'br':
+        return CompressorBrotli(config['COMPRESSAO_QUALIDADE_BROTLI'])
+    return CompressorGzip(config['COMPRESSAO_NIVEL_GZIP'])
+
+
+def _comprimir_partes(partes, compressor):
+    for parte in partes:
+        dados = compressor.comprimir(parte)
+        if dados:
+            yield dados
+    yield compressor.finalizar()
+
+
+def _codificacao_aceita():
+    codificacoes = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(codificacoes)
+
+
+def comprimir_resposta(resposta, config):
+    """Comprime a resposta conforme o Accept-Encoding da requisição, quando valer a pena"""
+    if resposta.mimetype not in TIPOS_COMPRIMIVEIS or request.method == 'HEAD' or resposta.direct_passthrough:
+        return resposta
+    resposta.vary.add('Accept-Encoding')
+    if resposta.status_code != 200 or 'Content-Encoding' in resposta.headers or 'Range' in request.headers:
+        return resposta
+    codificacao = _codificacao_aceita()
+    if codificacao is None:
+        return resposta
+
+    compressor = _compressor(codificacao, config)
+    if resposta.is_streamed:
+        partes = resposta.iter_encoded()
+        original = resposta.response
+        resposta.response = _comprimir_partes(partes, compressor)
+        if hasattr(original, 'close'):
+            resposta.call_on_close(original.close)
+        resposta.headers.pop('Content-Length', None)
+    else:
+        dados = resposta.get_data()
+        if len(dados) < config['COMPRESSAO_TAMANHO_MINIMO']:
+            return resposta
+        resposta.set_data(compressor.comprimir(dados) + compressor.finalizar())
+
+    resposta.headers['Content-Encoding'] = codificacao
+    # O corpo comprimido não é byte a byte o original: ETag forte vira fraca e faixas deixam de valer
+    etag, fraca = resposta.get_etag()
+    if etag and not fraca:
+        resposta.set_etag(etag, weak=True)
+    resposta.headers.pop('Accept-Ranges', None)
+    return resposta
+
+
+def init_app(app):
+    """Comprime as respostas do app (COMPRESSAO_ATIVA=False desliga)"""
+    app.config.setdefault('COMPRESSAO_ATIVA', True)
+    app.config.setdefault('COMPRESSAO_TAMANHO_MINIMO', 500)  # bytes; corpos menores vão sem compressão
+    app.config.setdefault('COMPRESSAO_NIVEL_GZIP', 6)
+    app.config.setdefault('COMPRESSAO_QUALIDADE_BROTLI', 5)
+    if not app.config['COMPRESSAO_ATIVA']:
+        return
+
+    @app.after_request
+    def _comprimir(resposta):
+        return comprimir_resposta(resposta, app.config)
@@ -0,0 +1,42 @@
+import hashlib
+
+from flask import Response, request
+
+from src.services.cache import CacheRespostas
+
+
+def calcular_etag(*partes):
+    """ETag a partir das partes que determinam o conteúdo da resposta"""
+    bruto = '|'.join('' if parte is None else str(parte) for parte in partes)
+    return hashlib.sha1(bruto.encode('utf-8')).hexdigest()[:20]
+
+
+def nao_modificado(etag, fraca=False, ultima_modificacao=None):
+    """Resposta 304 se o cliente já tem esta versão, ou None.
+
+    Deve ser chamada antes de carregar e serializar os dados: o objetivo é
+    responder apenas com o timestamp, sem passar pelo marshmallow.
+    """
+    if request.if_none_match:
+        if not request.if_none_match.contains_weak(etag):
+            return None
+    elif ultima_modificacao is None or request.if_modified_since is None:
+        return None
+    elif ultima_modificacao.replace(microsecond=0) > request.if_modified_since.replace(tzinfo=None):
+        return None
+
+    return marcar(Response(status=304), etag, fraca, ultima_modificacao)
+
+
+def marcar(resposta, etag, fraca=False, ultima_modificacao=None):
+    """Adiciona ETag/Last-Modified e exige revalidação a cada uso"""
+    resposta.set_etag(etag, weak=fraca)
+    if ultima_modificacao is not None:
+        resposta.last_modified = ultima_modificacao
+    resposta.headers['Cache-Control'] = 'no-cache'
+    return resposta
+
+
+def etag_args(args):
+    """Parâmetros da requisição normalizados para compor a ETag"""
+    return CacheRespostas.normalizar_args(args)
@@ -0,0 +1,226 @@
+"""Arquivos estáticos do frontend servidos a partir de um manifesto em memória.
+
+O diretório estático é lido uma vez, no boot: caminho, tipo, tamanho, data e
+ETag de cada arquivo ficam num dicionário, sem stat por requisição. Arquivos
+com hash no nome (assets/index-XXXXXXXX.js) vão com cache imutável; variantes
+pré-comprimidas (.br/.gz ao lado do original) são servidas quando o cliente as
+aceita. Elas são geradas no deploy, por
+`flask --app src.main comprimir-estaticos`; o boot só lê as que existem (com
+ESTATICOS_PRE_COMPRIMIR=True, também gera as que faltam). O corpo segue pelo
+wsgi.file_wrapper do servidor (sendfile no gunicorn), sem passar pela
+compressão por requisição. O index.html do fallback da SPA fica na memória.
+"""
+import gzip
+import mimetypes
+import os
+import re
+import tempfile
+from datetime import datetime, timezone
+
+import click
+from flask import Response, current_app, request
+from werkzeug.wsgi import wrap_file
+
+try:
+    import brotli  # dependência opcional: sem ela, apenas variantes .gz
+except ImportError:
+    brotli = None
+
+# Hash de conteúdo que o Vite põe no nome dos bundles (index-C_yrbXCG.js)
+NOME_COM_HASH = re.compile(r'-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+# Extensão da variante -> Content-Encoding, em ordem de preferência
+VARIANTES = (('.br', 'br'), ('.gz', 'gzip'))
+TIPOS_PRE_COMPRIMIVEIS = {'.js', '.mjs', '.css', '.html', '.svg', '.json', '.map', '.txt', '.ico'}
+
+
+class ArquivoEstatico:
+    def __init__(self, caminho, tamanho, modificado_em):
+        self.caminho = caminho
+        self.tamanho = tamanho
+        self.modificado_em = modificado_em
+        self.etag = f'{int(modificado_em.timestamp())}-{tamanho:x}'
+
+
+class ManifestoEstaticos:
+    """Índice dos arquivos do diretório estático, com as variantes comprimidas de cada um"""
+
+    def __init__(self, diretorio, max_age, pre_comprimir=False):
+        self.diretorio = diretorio
+        self.max_age = max_age
+        self.pre_comprimir = pre_comprimir
+        self.arquivos = {}
+        self.index = None
+        self.construir()
+
+    def _gerar_variantes(self):
+        """Gera as variantes que faltam; diretório só de leitura fica sem elas"""
+        if not (self.pre_comprimir and self.diretorio and os.access(self.diretorio, os.W_OK)):
+            return
+        try:
+            comprimir_diretorio(self.diretorio)
+        except OSError as e:
+            current_app.logger.warning('Variantes comprimidas não geradas em %s: %s', self.diretorio, e)
+
+    def construir(self):
+        self._gerar_variantes()
+        arquivos = {}
+        if self.diretorio and os.path.isdir(self.diretorio):
+            for raiz, _, nomes in os.walk(self.diretorio):
+                for nome in nomes:
+                    caminho = os.path.join(raiz, nome)
+                    relativo = os.path.relpath(caminho, self.diretorio).replace(os.sep, '/')
+                    estado = os.stat(caminho)
+                    arquivos[relativo] = ArquivoEstatico(
+                        caminho, estado.st_size, datetime.fromtimestamp(int(estado.st_mtime), timezone.utc)
+                    )
+
+        entradas = {}
+        for relativo, arquivo in arquivos.items():
+            if relativo.endswith(tuple(extensao for extensao, _ in VARIANTES)):
+                continue
+            variantes = {
+                codificacao: arquivos[relativo + extensao]
+                for extensao, codificacao in VARIANTES if relativo + extensao in arquivos
+            }
+            mimetype = mimetypes.guess_type(relativo)[0] or 'application/octet-stream'
+            if NOME_COM_HASH.search(relativo):
+                cache_control = CACHE_IMUTAVEL
+            else:
+                cache_control = f'public, max-age={self.max_age}'
+            entradas[relativo] = (arquivo, mimetype, cache_control, variantes)
+        self.arquivos = entradas
+
+        index = arquivos.get('index.html')
+        if index is None:
+            self.index = None
+        else:
+            with open(index.caminho, 'rb') as f:
+                conteudo = f.read()
+            # O index é pequeno: as versões comprimidas também ficam prontas na memória
+            corpos = {None: conteudo, 'gzip': gzip.compress(conteudo, mtime=0)}
+            if brotli is not None:
+                corpos['br'] = brotli.compress(conteudo)
+            self.index = (corpos, index.etag, index.modificado_em)
+
+    def obter(self, caminho):
+        return self.arquivos.get(caminho)
+
+
+def _codificacao(variantes):
+    if not variantes:
+        return None
+    return request.accept_encodings.best_match([c for _, c in VARIANTES if c in variantes])
+
+
+def servir_arquivo(entrada):
+    """Resposta com o arquivo (ou a variante comprimida aceita), sem stat nem leitura em Python"""
+    arquivo, mimetype, cache_control, variantes = entrada
+    codificacao = _codificacao(variantes)
+    servido = variantes[codificacao] if codificacao else arquivo
+
+    resposta = Response(
+        wrap_file(request.environ, open(servido.caminho, 'rb')),
+        mimetype=mimetype, direct_passthrough=True
+    )
+    resposta.content_length = servido.tamanho
+    resposta.last_modified = arquivo.modificado_em
+    resposta.headers['Cache-Control'] = cache_control
+    if variantes:
+        resposta.vary.add('Accept-Encoding')
+    if codificacao:
+        resposta.headers['Content-Encoding'] = codificacao
+        resposta.set_etag(f'{arquivo.etag}-{codificacao}')
+    else:
+        resposta.set_etag(arquivo.etag)
+    return resposta.make_conditional(request.environ, accept_ranges=True, complete_length=servido.tamanho)
+
+
+def servir_index(index):
+    """index.html da memória; revalidado a cada uso, pois aponta para os bundles do deploy atual"""
+    corpos, etag, modificado_em = index
+    codificacao = request.accept_encodings.best_match([c for c in ('br', 'gzip') if c in corpos])
+    resposta = Response(corpos[codificacao], mimetype='text/html')
+    resposta.vary.add('Accept-Encoding')
+    if codificacao:
+        resposta.headers['Content-Encoding'] = codificacao
+        resposta.set_etag(f'{etag}-{codificacao}')
+    else:
+        resposta.set_etag(etag)
+    resposta.last_modified = modificado_em
+    resposta.headers['Cache-Control'] = 'no-cache'
+    return resposta.make_conditional(request.environ)
+
+
+def servir(caminho):
+    """Arquivo estático pelo caminho relativo ou, se não existir, o index.html da SPA"""
+    manifesto = current_app.extensions['estaticos']
+    entrada = manifesto.obter(caminho) if caminho else None
+    if entrada is None and caminho and current_app.debug:
+        # Em desenvolvimento o build muda com o servidor no ar
+        manifesto.construir()
+        entrada = manifesto.obter(caminho)
+    if entrada is not None:
+        return servir_arquivo(entrada)
+    if manifesto.index is None:
+        return 'index.html not found', 404
+    return servir_index(manifesto.index)
+
+
+def comprimir_diretorio(diretorio, tamanho_minimo=500):
+    """Gera as variantes .gz (e .br, se o brotli estiver instalado) dos arquivos de texto.
+
+    Variantes que já existem e são mais novas que o original são mantidas.
+    Devolve a quantidade de arquivos gerados.
+    """
+    compressores = {'.gz': lambda dados: gzip.compress(dados, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressores['.br'] = lambda dados: brotli.compress(dados, quality=11)
+    gerados = 0
+    for raiz, _, nomes in os.walk(diretorio):
+        for nome in nomes:
+            if os.path.splitext(nome)[1] not in TIPOS_PRE_COMPRIMIVEIS:
+                continue
+            caminho = os.path.join(raiz, nome)
+            estado = os.stat(caminho)
+            if estado.st_size < tamanho_minimo:
+                continue
+            with open(caminho, 'rb') as f:
+                conteudo = f.read()
+            for extensao, comprimir in compressores.items():
+                destino = caminho + extensao
+                if os.path.exists(destino) and os.stat(destino).st_mtime >= estado.st_mtime:
+                    continue
+                comprimido = comprimir(conteudo)
+                if len(comprimido) >= estado.st_size:
+                    continue
+                # Arquivo temporário + rename: outro processo nunca vê a variante pela metade
+                descritor, temporario = tempfile.mkstemp(dir=raiz, prefix=f'.{nome}.')
+                try:
+                    with os.fdopen(descritor, 'wb') as f:
+                        f.write(comprimido)
+                    os.chmod(temporario, estado.st_mode & 0o777)
+                    # Mesma data do original: o manifesto usa a do original no Last-Modified
+                    os.utime(temporario, (estado.st_atime, estado.st_mtime))
+                    os.replace(temporario, destino)
+                except BaseException:
+                    os.unlink(temporario)
+                    raise
+                gerados += 1
+    return gerados
+
+
+def init_app(app):
+    """Monta o manifesto do diretório estático e a CLI de pré-compressão"""
+    app.config.setdefault('ESTATICOS_MAX_AGE', 3600)  # segundos, para arquivos sem hash no nome
+    app.config.setdefault('ESTATICOS_PRE_COMPRIMIR', False)  # True: gera no boot as variantes .gz/.br que faltam
+    with app.app_context():
+        app.extensions['estaticos'] = ManifestoEstaticos(
+            app.static_folder, app.config['ESTATICOS_MAX_AGE'], app.config['ESTATICOS_PRE_COMPRIMIR']
+        )
+
+    @app.cli.command('comprimir-estaticos')
+    def comprimir_estaticos():
+        """Gera as variantes .gz/.br dos arquivos estáticos (rodar após copiar o build)"""
+        gerados = comprimir_diretorio(app.static_folder)
+        click.echo(f'{gerados} variantes comprimidas geradas em {app.static_folder}')
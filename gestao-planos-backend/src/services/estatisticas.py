@@ -0,0 +1,141 @@
+from collections import Counter
+
+import click
+from sqlalchemy import event, func, select
+
+from src.database.database import db
+from src.models.beneficiario import Beneficiario
+from src.models.estatistica import ResumoBeneficiario
+
+# Campos que alteram os contadores do resumo
+CAMPOS = ('ativo', 'situacao_cadastral', 'tipo_beneficiario', 'plano_saude_vinculado', 'data_criacao')
+
+resumo = ResumoBeneficiario.__table__
+
+
+def chaves(ativo, situacao, tipo, plano, data_criacao):
+    """Contadores (dimensão, chave) em que um beneficiário é contabilizado.
+
+    Situação e mês de cadastro contam todos os registros; tipo e plano
+    contam apenas os beneficiários ativos (não excluídos).
+    """
+    contadores = [('total', ''), ('situacao', situacao or '')]
+    if data_criacao is not None:
+        contadores.append(('mes_cadastro', data_criacao.strftime('%Y-%m')))
+    if ativo:
+        contadores += [('ativos', ''), ('tipo', tipo or ''), ('plano', plano or '')]
+    return contadores
+
+
+def _chaves_do_registro(valores):
+    return chaves(*(valores[campo] for campo in CAMPOS))
+
+
+def aplicar(conexao, deltas):
+    """Soma os deltas {(dimensão, chave): n} aos contadores do resumo"""
+    for (dimensao, chave), delta in deltas.items():
+        if not delta:
+            continue
+        atualizados = conexao.execute(
+            resumo.update()
+            .where(resumo.c.dimensao == dimensao, resumo.c.chave == chave)
+            .values(quantidade=resumo.c.quantidade + delta)
+        ).rowcount
+        if not atualizados:
+            conexao.execute(resumo.insert().values(dimensao=dimensao, chave=chave, quantidade=delta))
+
+
+def registrar_inclusoes(conexao, registros):
+    """Contabiliza beneficiários incluídos sem passar pelo ORM (insert em massa)"""
+    deltas = Counter()
+    for registro in registros:
+        deltas.update(_chaves_do_registro(registro))
+    aplicar(conexao, deltas)
+
+
+def reconstruir(conexao):
+    """Recalcula todo o resumo com GROUP BY sobre a tabela beneficiarios"""
+    conexao.execute(resumo.delete())
+    deltas = Counter()
+    if conexao.dialect.name == 'sqlite':
+        mes = func.strftime('%Y-%m', Beneficiario.data_criacao)
+    else:
+        mes = func.to_char(Beneficiario.data_criacao, 'YYYY-MM')
+    colunas = [getattr(Beneficiario, campo) for campo in CAMPOS[:-1]] + [mes]
+    agrupamento = select(*colunas, func.count()).group_by(*colunas)
+    for ativo, situacao, tipo, plano, mes, quantidade in conexao.execute(agrupamento):
+        contadores = chaves(ativo, situacao, tipo, plano, None)
+        if mes is not None:
+            contadores.append(('mes_cadastro', mes))
+        for contador in contadores:
+            deltas[contador] += quantidade
+    aplicar(conexao, deltas)
+
+
+def obter():
+    """Estatísticas do dashboard, lidas apenas da tabela de resumo"""
+    contadores = {}
+    for linha in db.session.execute(select(resumo)):
+        contadores.setdefault(linha.dimensao, {})[linha.chave] = linha.quantidade
+
+    def dimensao(nome):
+        return {chave: n for chave, n in sorted(contadores.get(nome, {}).items()) if n}
+
+    por_tipo = dimensao('tipo')
+    titulares = por_tipo.get('Titular', 0)
+    return {
+        'total': contadores.get('total', {}).get('', 0),
+        'ativos': contadores.get('ativos', {}).get('', 0),
+        'por_situacao': dimensao('situacao'),
+        'por_tipo': por_tipo,
+        'por_plano': dimensao('plano'),
+        'dependentes_por_titular': round(por_tipo.get('Dependente', 0) / titulares, 2) if titulares else 0,
+        'novos_por_mes': dimensao('mes_cadastro')
+    }
+
+
+def preparar():
+    """Preenche o resumo se estiver vazio (parte do flask init-db)"""
+    with db.engine.begin() as conexao:
+        vazio = not conexao.execute(select(func.count()).select_from(resumo)).scalar()
+        if vazio and conexao.execute(select(func.count(Beneficiario.id))).scalar():
+            reconstruir(conexao)
+
+
+def init_app(app):
+    """Registra o comando de recálculo do resumo"""
+    @app.cli.command('recalcular-estatisticas')
+    def recalcular_estatisticas():
+        """Recalcula a tabela de resumo das estatísticas de beneficiários"""
+        with db.engine.begin() as conexao:
+            reconstruir(conexao)
+        click.echo('Estatísticas recalculadas')
+
+
+@event.listens_for(Beneficiario, 'after_insert')
+def _contabilizar_inclusao(mapper, conexao, beneficiario):
+    aplicar(conexao, Counter(_chaves_do_registro(
+        {campo: getattr(beneficiario, campo) for campo in CAMPOS}
+    )))
+
+
+@event.listens_for(Beneficiario, 'after_update')
+def _contabilizar_alteracao(mapper, conexao, beneficiario):
+    estado = db.inspect(beneficiario)
+    novos, antigos = {}, {}
+    for campo in CAMPOS:
+        historico = estado.attrs[campo].history
+        novos[campo] = getattr(beneficiario, campo)
+        antigos[campo] = historico.deleted[0] if historico.deleted else novos[campo]
+    if novos == antigos:
+        return
+    deltas = Counter(_chaves_do_registro(novos))
+    deltas.subtract(_chaves_do_registro(antigos))
+    aplicar(conexao, deltas)
+
+
+@event.listens_for(Beneficiario, 'after_delete')
+def _contabilizar_exclusao(mapper, conexao, beneficiario):
+    deltas = Counter()
+    deltas.subtract(_chaves_do_registro({campo: getattr(beneficiario, campo) for campo in CAMPOS}))
+    aplicar(conexao, deltas)
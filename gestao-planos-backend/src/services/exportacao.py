@@ -0,0 +1,319 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import current_app
+
+try:
+    import fcntl
+except ImportError:  # Windows: a deduplicação vale só dentro de cada processo
+    fcntl = None
+
+# Filtros aceitos pelas exportações (os mesmos da listagem)
+FILTROS_EXPORTACAO = ('nome', 'cpf', 'matricula', 'plano', 'situacao', 'tipo')
+
+PENDENTE = 'pendente'
+PROCESSANDO = 'processando'
+CONCLUIDA = 'concluida'
+ERRO = 'erro'
+
+ID_TAREFA = re.compile(r'^[0-9a-f]{32}$')
+BATIMENTO = 10  # segundos entre gravações do estado durante a geração
+INTERVALO_VARREDURA = 60  # segundos entre varreduras do diretório
+
+
+def _processo_vivo(pid):
+    if os.name == 'nt':
+        return True  # no Windows os.kill encerraria o processo: vale só o batimento
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class TarefaExportacao:
+    """Uma exportação de relatório executada em segundo plano"""
+
+    def __init__(self, chave, filtros, ttl):
+        self.id = uuid.uuid4().hex
+        self.chave = chave
+        self.filtros = filtros
+        self.status = PENDENTE
+        self.progresso = 0.0
+        self.total_linhas = None
+        self.arquivo = None
+        self.erro = None
+        self.criada_em = datetime.utcnow()
+        self.concluida_em = None
+        self.expira_em = time.monotonic() + ttl
+        # Processo que executa a tarefa e última gravação do estado (time.time())
+        self.pid = os.getpid()
+        self.batimento = time.time()
+
+    def expirada(self):
+        return time.monotonic() >= self.expira_em
+
+    @classmethod
+    def de_arquivo(cls, caminho):
+        """Tarefa salva por algum processo (ver salvar), ou None se o arquivo não existir"""
+        tarefa = cls.__new__(cls)
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                dados = json.load(arquivo)
+            tarefa.id, tarefa.chave, tarefa.filtros = dados['id'], dados['chave'], dados['filtros']
+            tarefa.status, tarefa.total_linhas = dados['status'], dados['total_linhas']
+            tarefa.progresso = dados['progresso'] / 100
+            tarefa.arquivo, tarefa.erro = dados['arquivo'], dados['erro']
+            tarefa.criada_em = datetime.fromisoformat(dados['criada_em'])
+            tarefa.concluida_em = datetime.fromisoformat(dados['concluida_em']) if dados['concluida_em'] else None
+            tarefa.expira_em = time.monotonic() + (dados['expira_em'] - time.time())
+            tarefa.pid, tarefa.batimento = dados['pid'], dados['batimento']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None  # ausente, incompleto ou de uma versão anterior do formato
+        return tarefa
+
+    def salvar(self, diretorio):
+        """Grava o estado em <id>.json, para que os outros workers também a encontrem"""
+        os.makedirs(diretorio, exist_ok=True)
+        caminho = os.path.join(diretorio, f'{self.id}.json')
+        self.batimento = time.time()
+        dados = {
+            **self.to_dict(), 'chave': self.chave, 'arquivo': self.arquivo,
+            'expira_em': self.batimento + (self.expira_em - time.monotonic()),
+            'pid': self.pid, 'batimento': self.batimento
+        }
+        temporario = f'{caminho}.{os.getpid()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(dados, arquivo, ensure_ascii=False)
+        os.replace(temporario, caminho)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'progresso': round(self.progresso * 100),
+            'total_linhas': self.total_linhas,
+            'filtros': self.filtros,
+            'erro': self.erro,
+            'criada_em': self.criada_em.isoformat(),
+            'concluida_em': self.concluida_em.isoformat() if self.concluida_em else None
+        }
+
+
+class FilaExportacao:
+    """Fila local de exportações em PDF, sem broker externo.
+
+    As tarefas rodam num pool de threads do próprio processo e os arquivos
+    gerados ficam num diretório local. O estado de cada tarefa é gravado no
+    diretório (<id>.json), que é a referência comum aos workers: qualquer um
+    deles responde à consulta e ao download, pedidos com os mesmos filtros
+    reaproveitam a tarefa existente em qualquer worker até ela expirar (TTL),
+    e a varredura por data de modificação apaga os arquivos vencidos de
+    todos. Uma tarefa cujo processo morreu (ou que parou de gravar o
+    batimento por `timeout_batimento` segundos) é marcada como erro.
+    """
+
+    def __init__(self, app, diretorio, workers, ttl, timeout_batimento):
+        self.app = app
+        self.diretorio = diretorio
+        self.workers = workers
+        self.ttl = ttl
+        self.timeout_batimento = timeout_batimento
+        self._tarefas = {}
+        self._por_chave = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._ultima_varredura = 0.0
+
+    @staticmethod
+    def calcular_chave(filtros):
+        """Hash dos filtros normalizados, usado para deduplicar tarefas"""
+        normalizados = json.dumps(filtros, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(normalizados.encode('utf-8')).hexdigest()
+
+    def submeter(self, filtros):
+        """Enfileira uma exportação ou devolve a tarefa equivalente ainda válida"""
+        filtros = {k: v for k, v in filtros.items() if k in FILTROS_EXPORTACAO and v}
+        chave = self.calcular_chave(filtros)
+        with self._trava():
+            self._remover_expiradas()
+            self._varrer()
+            existente = self._tarefas.get(self._por_chave.get(chave)) or self._procurar(chave)
+            if existente and existente.status != ERRO:
+                return existente, False
+
+            tarefa = TarefaExportacao(chave, filtros, self.ttl)
+            tarefa.salvar(self.diretorio)
+            self._tarefas[tarefa.id] = tarefa
+            self._por_chave[chave] = tarefa.id
+            # O pool só é criado no primeiro uso (e, portanto, depois de um fork)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix='exportacao'
+                )
+        self._executor.submit(self._executar, tarefa)
+        return tarefa, True
+
+    def obter(self, tarefa_id):
+        with self._lock:
+            self._remover_expiradas()
+            tarefa = self._tarefas.get(tarefa_id)
+        self._varrer()
+        if tarefa is None and ID_TAREFA.match(tarefa_id):
+            # Tarefa submetida em outro worker
+            tarefa = self._ler(os.path.join(self.diretorio, f'{tarefa_id}.json'))
+        return tarefa
+
+    @contextmanager
+    def _trava(self):
+        """Exclusão entre threads e, com fcntl, entre os processos que usam o diretório"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.diretorio, exist_ok=True)
+            with open(os.path.join(self.diretorio, '.fila.lock'), 'a') as arquivo:
+                fcntl.flock(arquivo, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+    def _orfa(self, tarefa):
+        """Pendente ou em processamento num processo que não existe mais (ou que parou de dar sinal)"""
+        if tarefa.status not in (PENDENTE, PROCESSANDO) or tarefa.id in self._tarefas:
+            return False
+        if not _processo_vivo(tarefa.pid):
+            return True
+        # pid vivo pode ter sido reaproveitado por outro processo: vale o batimento
+        return tarefa.status == PROCESSANDO and time.time() - tarefa.batimento > self.timeout_batimento
+
+    def _ler(self, caminho):
+        """Tarefa gravada no diretório; órfãs viram erro e expiradas são ignoradas"""
+        tarefa = TarefaExportacao.de_arquivo(caminho)
+        if tarefa is None:
+            return None
+        if self._orfa(tarefa):
+            tarefa.status = ERRO
+            tarefa.erro = 'Exportação interrompida: o processo que a executava foi encerrado'
+            tarefa.concluida_em = datetime.utcnow()
+            tarefa.expira_em = time.monotonic() + self.ttl
+            tarefa.salvar(self.diretorio)
+        elif tarefa.expirada() and tarefa.status != PROCESSANDO:
+            return None
+        return tarefa
+
+    def _procurar(self, chave):
+        """Tarefa com os mesmos filtros gravada por qualquer worker (a mais recente)"""
+        encontradas = []
+        for nome in self._arquivos():
+            if nome.endswith('.json'):
+                tarefa = self._ler(os.path.join(self.diretorio, nome))
+                if tarefa is not None and tarefa.chave == chave and tarefa.status != ERRO:
+                    encontradas.append(tarefa)
+        return max(encontradas, key=lambda t: t.criada_em, default=None)
+
+    def _arquivos(self):
+        try:
+            return [nome for nome in os.listdir(self.diretorio) if not nome.startswith('.')]
+        except FileNotFoundError:
+            return []
+
+    def _varrer(self):
+        """Apaga do diretório os arquivos sem modificação há mais que o TTL, de qualquer worker.
+
+        Tarefas em processamento regravam o estado a cada BATIMENTO segundos, por
+        isso só o que já terminou (ou foi abandonado) envelhece até o TTL.
+        """
+        agora = time.time()
+        if agora - self._ultima_varredura < INTERVALO_VARREDURA:
+            return
+        self._ultima_varredura = agora
+        for nome in self._arquivos():
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                if agora - os.stat(caminho).st_mtime >= self.ttl:
+                    os.remove(caminho)
+            except FileNotFoundError:
+                continue  # outro worker apagou antes
+
+    def _remover_expiradas(self):
+        for tarefa in [t for t in self._tarefas.values() if t.expirada()]:
+            if tarefa.status == PROCESSANDO:
+                continue
+            del self._tarefas[tarefa.id]
+            if self._por_chave.get(tarefa.chave) == tarefa.id:
+                del self._por_chave[tarefa.chave]
+            for caminho in (tarefa.arquivo, os.path.join(self.diretorio, f'{tarefa.id}.json')):
+                try:
+                    if caminho:
+                        os.remove(caminho)
+                except FileNotFoundError:
+                    pass  # já apagado pela varredura de outro worker
+
+    def _executar(self, tarefa):
+        from src.services import relatorio_pdf  # reportlab só é carregado na primeira exportação
+
+        tarefa.status = PROCESSANDO
+        tarefa.salvar(self.diretorio)
+        destino = os.path.join(self.diretorio, f'{tarefa.id}.pdf')
+        try:
+            with self.app.app_context():
+                linhas = relatorio_pdf.consultar_linhas(tarefa.filtros)
+                tarefa.total_linhas = linhas.order_by(None).count()
+
+                def atualizar(fracao):
+                    anterior, tarefa.progresso = tarefa.progresso, fracao
+                    # Grava o progresso a cada 5%, não a cada lote, e o batimento a cada BATIMENTO s
+                    if int(fracao * 20) != int(anterior * 20) or time.time() - tarefa.batimento >= BATIMENTO:
+                        tarefa.salvar(self.diretorio)
+
+                os.makedirs(self.diretorio, exist_ok=True)
+                relatorio_pdf.gerar_pdf(
+                    linhas.yield_per(relatorio_pdf.LOTE_LEITURA), destino,
+                    total=tarefa.total_linhas, progresso=atualizar,
+                    workers=self.app.config.get('RELATORIO_PDF_WORKERS')
+                )
+            tarefa.arquivo = destino
+            tarefa.progresso = 1.0
+            tarefa.status = CONCLUIDA
+        except Exception as e:
+            tarefa.erro = str(e)
+            tarefa.status = ERRO
+            if os.path.exists(destino):
+                os.remove(destino)
+        finally:
+            tarefa.concluida_em = datetime.utcnow()
+            tarefa.expira_em = time.monotonic() + self.ttl
+            tarefa.salvar(self.diretorio)
+
+
+def init_app(app):
+    """Configura a fila de exportações do app"""
+    app.config.setdefault('EXPORTACAO_DIRETORIO', os.path.join(app.instance_path, 'exportacoes'))
+    app.config.setdefault('EXPORTACAO_WORKERS', 2)
+    app.config.setdefault('EXPORTACAO_TTL', 3600)
+    # Segundos sem batimento até uma tarefa em processamento ser considerada abandonada
+    app.config.setdefault('EXPORTACAO_TIMEOUT_BATIMENTO', 120)
+    app.extensions['exportacao'] = FilaExportacao(
+        app,
+        app.config['EXPORTACAO_DIRETORIO'],
+        app.config['EXPORTACAO_WORKERS'],
+        app.config['EXPORTACAO_TTL'],
+        app.config['EXPORTACAO_TIMEOUT_BATIMENTO'],
+    )
+
+
+def fila():
+    """Fila de exportações do app atual"""
+    return current_app.extensions['exportacao']
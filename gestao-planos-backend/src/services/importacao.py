@@ -0,0 +1,225 @@
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+from types import SimpleNamespace
+
+from marshmallow import EXCLUDE, ValidationError
+from sqlalchemy import insert, select
+
+from src.database.database import db
+from src.models.beneficiario import Beneficiario, HistoricoBeneficiario
+from src.schemas.validacao_lote import BeneficiarioLoteSchema
+from src.services import busca, estatisticas
+
+LOTE_PADRAO = 500
+
+# Valores padrão preenchidos explicitamente: o insert em lote exige que
+# todas as linhas tenham as mesmas colunas
+OPCIONAIS = (
+    'complemento_endereco', 'telefone_fixo', 'data_termino_cobertura', 'grau_parentesco',
+    'id_titular', 'data_cancelamento_plano', 'motivo_cancelamento'
+)
+
+# CPF, CEP e data de nascimento validados de uma vez por lote (NumPy)
+importacao_schema = BeneficiarioLoteSchema(many=True, unknown=EXCLUDE)
+
+
+def ler_registros(arquivo, formato):
+    """Lê o arquivo enviado linha a linha, gerando (número da linha, dados ou erro)"""
+    texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+    if formato == 'csv':
+        leitor = csv.DictReader(texto)
+        for registro in leitor:
+            # Células vazias equivalem a campos ausentes
+            yield leitor.line_num, {k: v for k, v in registro.items() if k and v not in ('', None)}
+        return
+
+    for numero, linha in enumerate(texto, start=1):
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha)
+        except ValueError:
+            yield numero, ValidationError({'_linha': ['JSON inválido']})
+            continue
+        if not isinstance(registro, dict):
+            yield numero, ValidationError({'_linha': ['Cada linha deve ser um objeto JSON']})
+            continue
+        yield numero, registro
+
+
+class ImportacaoBeneficiarios:
+    """Importação em lote de titulares e dependentes.
+
+    Cada lote é validado com BeneficiarioSchema(many=True), as regras de
+    negócio (CPF duplicado, titular válido) são resolvidas com uma consulta
+    por lote e as inclusões usam insert em massa, com um commit por lote.
+    Dependentes podem referenciar o titular por `id_titular` ou pelo CPF
+    (`cpf_titular`), inclusive titulares incluídos no mesmo arquivo.
+    """
+
+    def __init__(self, tamanho_lote=LOTE_PADRAO, usuario='Sistema'):
+        self.tamanho_lote = tamanho_lote
+        self.usuario = usuario
+        self.total_linhas = 0
+        self.importados = 0
+        self.erros = []
+        self._titulares_importados = {}  # cpf -> id, titulares incluídos nesta importação
+
+    def executar(self, registros):
+        registros = iter(registros)
+        while True:
+            lote = list(islice(registros, self.tamanho_lote))
+            if not lote:
+                break
+            self.total_linhas += len(lote)
+            try:
+                self._processar_lote(lote)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+        return self.resultado()
+
+    def resultado(self):
+        return {
+            'total_linhas': self.total_linhas,
+            'importados': self.importados,
+            'rejeitados': len(self.erros),
+            'erros': sorted(self.erros, key=lambda erro: erro['linha'])
+        }
+
+    def _rejeitar(self, linha, mensagens):
+        self.erros.append({'linha': linha, 'erros': mensagens})
+
+    def _processar_lote(self, lote):
+        linhas, dados, cpfs_titular = [], [], []
+        for numero, registro in lote:
+            if isinstance(registro, ValidationError):
+                self._rejeitar(numero, registro.messages)
+                continue
+            registro = dict(registro)
+            cpfs_titular.append(registro.pop('cpf_titular', None))
+            linhas.append(numero)
+            dados.append(registro)
+
+        # Validação do lote inteiro de uma vez
+        try:
+            validos = importacao_schema.load(dados)
+            erros = {}
+        except ValidationError as e:
+            validos, erros = e.valid_data, e.messages
+
+        titulares, dependentes = [], []
+        for indice, (numero, registro, cpf_titular) in enumerate(zip(linhas, validos, cpfs_titular)):
+            if indice in erros:
+                self._rejeitar(numero, erros[indice])
+            elif registro['tipo_beneficiario'] == 'Titular':
+                titulares.append((numero, registro))
+            else:
+                dependentes.append((numero, registro, cpf_titular))
+
+        self._incluir_titulares(titulares)
+        self._incluir_dependentes(dependentes)
+
+    def _incluir_titulares(self, titulares):
+        cpfs = {registro['cpf'] for _, registro in titulares}
+        existentes = set(db.session.scalars(
+            select(Beneficiario.cpf).where(
+                Beneficiario.cpf.in_(cpfs),
+                Beneficiario.tipo_beneficiario == 'Titular',
+                Beneficiario.ativo.is_(True)
+            )
+        )) if cpfs else set()
+
+        aceitos = []
+        for numero, registro in titulares:
+            if registro['cpf'] in existentes:
+                self._rejeitar(numero, {'cpf': ['CPF já cadastrado como titular']})
+                continue
+            existentes.add(registro['cpf'])
+            aceitos.append(registro)
+
+        for registro, beneficiario_id in zip(aceitos, self._inserir(aceitos)):
+            self._titulares_importados[registro['cpf']] = beneficiario_id
+
+    def _incluir_dependentes(self, dependentes):
+        ids = {registro.get('id_titular') for _, registro, _ in dependentes} - {None}
+        cpfs = {cpf for _, _, cpf in dependentes if cpf} - set(self._titulares_importados)
+        titulares_por_id, titulares_por_cpf = set(), dict(self._titulares_importados)
+        if ids or cpfs:
+            filtro = Beneficiario.id.in_(ids) if ids else None
+            if cpfs:
+                filtro = Beneficiario.cpf.in_(cpfs) if filtro is None else (filtro | Beneficiario.cpf.in_(cpfs))
+            for beneficiario_id, cpf in db.session.execute(
+                select(Beneficiario.id, Beneficiario.cpf).where(
+                    filtro,
+                    Beneficiario.tipo_beneficiario == 'Titular',
+                    Beneficiario.ativo.is_(True)
+                )
+            ):
+                titulares_por_id.add(beneficiario_id)
+                titulares_por_cpf.setdefault(cpf, beneficiario_id)
+        titulares_por_id.update(self._titulares_importados.values())
+
+        aceitos = []
+        for numero, registro, cpf_titular in dependentes:
+            if not registro.get('id_titular') and cpf_titular:
+                registro['id_titular'] = titulares_por_cpf.get(cpf_titular)
+                if not registro['id_titular']:
+                    self._rejeitar(numero, {'cpf_titular': ['Titular não encontrado ou inativo']})
+                    continue
+            if not registro.get('id_titular'):
+                self._rejeitar(numero, {'id_titular': ['Dependente deve ter um titular vinculado']})
+            elif registro['id_titular'] not in titulares_por_id:
+                self._rejeitar(numero, {'id_titular': ['Titular não encontrado ou inativo']})
+            elif not registro.get('grau_parentesco'):
+                self._rejeitar(numero, {'grau_parentesco': ['Grau de parentesco é obrigatório para dependentes']})
+            else:
+                aceitos.append(registro)
+
+        self._inserir(aceitos)
+
+    def _inserir(self, registros):
+        """Insere os beneficiários e o histórico de criação em massa, devolvendo os ids"""
+        if not registros:
+            return []
+        agora = datetime.utcnow()
+        linhas = []
+        for registro in registros:
+            linha = dict.fromkeys(OPCIONAIS)
+            linha.update(
+                nacionalidade='Brasileira', situacao_cadastral='Ativo',
+                data_criacao=agora, data_atualizacao=agora, ativo=True
+            )
+            linha.update(registro)
+            linha['matricula'] = Beneficiario.gerar_matricula()
+            linhas.append(linha)
+
+        ids = list(db.session.scalars(
+            insert(Beneficiario).returning(Beneficiario.id, sort_by_parameter_order=True),
+            linhas
+        ))
+        db.session.execute(insert(HistoricoBeneficiario), [{
+            'beneficiario_id': beneficiario_id,
+            'campo_alterado': 'CRIACAO',
+            'valor_antigo': None,
+            'valor_novo': 'Beneficiário criado',
+            'data_alteracao': agora,
+            'usuario_alteracao': self.usuario
+        } for beneficiario_id in ids])
+
+        # O insert em massa não dispara os eventos do ORM que mantêm o índice
+        # de busca e o resumo das estatísticas
+        estatisticas.registrar_inclusoes(db.session.connection(), linhas)
+        if busca.indice_ativo():
+            busca.indexar(db.session.connection(), [
+                busca.valores_indexados(SimpleNamespace(id=beneficiario_id, **linha))
+                for beneficiario_id, linha in zip(ids, linhas)
+            ])
+
+        self.importados += len(ids)
+        return ids
+
@@ -0,0 +1,57 @@
+"""Codificação JSON com orjson para as listagens, com os mesmos bytes do jsonify.
+
+O jsonify do Flask (fora do modo debug) gera JSON compacto, com chaves
+ordenadas e ensure_ascii. O orjson ordena e compacta igual, mas emite texto
+não ASCII em UTF-8: depois de codificar, cada caractere distinto desses (e o
+DEL, que o json padrão também escapa) é trocado nos bytes por \\uXXXX, com
+pares substitutos acima do BMP. Nomes e cidades repetem poucos caracteres
+acentuados, então são poucas trocas por página.
+
+Só as listagens passam por aqui: o corpo delas tem apenas strings, inteiros,
+booleanos e nulos, e floats em notação exponencial sairiam diferentes
+(1e-7 em vez de 1e-07). O restante do app segue no provedor padrão.
+"""
+from flask import current_app, jsonify
+
+try:
+    import orjson  # dependência opcional: sem ela, fica o jsonify
+except ImportError:
+    orjson = None
+
+# Bytes que o ensure_ascii mantém como estão (0x00-0x7e; os de controle o orjson já escapa)
+ASCII_SEM_ESCAPE = bytes(range(0x7f))
+
+
+def _escape(caractere):
+    codigo = ord(caractere)
+    if codigo < 0x10000:
+        return f'\\u{codigo:04x}'
+    codigo -= 0x10000
+    return f'\\u{0xd800 | (codigo >> 10):04x}\\u{0xdc00 | (codigo & 0x3ff):04x}'
+
+
+def dumps(obj):
+    """JSON compacto, ordenado e só ASCII (bytes), igual ao do provedor padrão"""
+    corpo = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    # Sobram só os bytes dos caracteres a escapar; o UTF-8 não casa no meio de outro caractere
+    restantes = corpo.translate(None, ASCII_SEM_ESCAPE)
+    for caractere in set(restantes.decode('utf-8')):
+        corpo = corpo.replace(caractere.encode('utf-8'), _escape(caractere).encode('ascii'))
+    return corpo
+
+
+def resposta(obj):
+    """Resposta JSON como a do jsonify(obj), codificada pelo orjson quando possível"""
+    if orjson is None or not current_app.config['JSON_ORJSON'] or current_app.debug:
+        return jsonify(obj)
+    try:
+        corpo = dumps(obj)
+    except (orjson.JSONEncodeError, TypeError):
+        # Inteiros acima de 64 bits, chaves não textuais etc.
+        return jsonify(obj)
+    return current_app.response_class(corpo + b'\n', mimetype=current_app.json.mimetype)
+
+
+def init_app(app):
+    """JSON_ORJSON=False mantém as listagens no jsonify"""
+    app.config.setdefault('JSON_ORJSON', True)
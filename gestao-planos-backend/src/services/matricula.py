@@ -0,0 +1,128 @@
+"""Gerador de matrículas monotônicas e sem colisão: BENM + 16 caracteres base 36.
+
+Layout (maiúsculas, largura fixa, por isso a ordem alfabética é a ordem de geração):
+- BEN e a versão M do formato
+- 9 caracteres: milissegundos desde 01/01/1970
+- 3 caracteres: nó (processo) que gerou a matrícula, até 46.656 nós
+- 4 caracteres: sequência dentro do milissegundo, até ~1,6 milhão por ms
+
+As matrículas do formato anterior (BEN + AAAAMMDDHHMMSS + 4 hexadecimais)
+começam com um dígito depois de BEN; a versão M vem depois de qualquer
+dígito, então as novas ficam sempre depois das existentes no índice e na
+ordenação, e as duas nunca se repetem. O tamanho continua 20 caracteres.
+
+Cada processo usa um nó próprio: MATRICULA_NO_BASE + o primeiro slot livre
+entre arquivos de trava (flock) em MATRICULA_LOCK_DIR, mantido enquanto o
+processo viver. Assim, vários workers do mesmo servidor nunca usam o mesmo
+nó. Com mais de um servidor, cada um deve ter uma MATRICULA_NO_BASE
+diferente, distante das outras mais que o número de processos do servidor.
+
+MATRICULA_NO é o nome antigo de MATRICULA_NO_BASE e tem o mesmo efeito: um
+processo sozinho fica com o nó MATRICULA_NO (slot 0), mas os workers do
+gunicorn, que herdam o ambiente, recebem nós seguintes em vez de repetir o
+mesmo. Só no Windows, sem flock, MATRICULA_NO fixa o nó do processo.
+"""
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: nó derivado do pid, sem garantia entre processos
+    fcntl = None
+
+PREFIXO = 'BENM'
+DIGITOS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+LARGURA_TEMPO, LARGURA_NO, LARGURA_SEQUENCIA = 9, 3, 4
+MAX_NO = 36 ** LARGURA_NO
+MAX_SEQUENCIA = 36 ** LARGURA_SEQUENCIA
+
+
+def base36(numero, largura):
+    caracteres = []
+    for _ in range(largura):
+        numero, resto = divmod(numero, 36)
+        caracteres.append(DIGITOS[resto])
+    if numero:
+        raise OverflowError(f'{numero} não cabe em {largura} dígitos base 36')
+    return ''.join(reversed(caracteres))
+
+
+def _reservar_slot(diretorio):
+    """Trava o primeiro arquivo de slot livre; devolve (slot, arquivo aberto)"""
+    os.makedirs(diretorio, exist_ok=True)
+    for slot in range(MAX_NO):
+        arquivo = open(os.path.join(diretorio, f'no_{slot}.lock'), 'a')
+        try:
+            fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            arquivo.close()
+            continue
+        return slot, arquivo
+    raise RuntimeError(f'Nenhum slot de nó livre em {diretorio}')
+
+
+class GeradorMatriculas:
+    """Gera matrículas crescentes e únicas para um nó"""
+
+    def __init__(self, no):
+        if not 0 <= no < MAX_NO:
+            raise ValueError(f'Nó deve estar entre 0 e {MAX_NO - 1}')
+        self.no = no
+        self._no = base36(no, LARGURA_NO)
+        self._lock = threading.Lock()
+        self._ultimo_ms = 0
+        self._sequencia = 0
+
+    def gerar(self):
+        with self._lock:
+            agora = int(time.time() * 1000)
+            if agora > self._ultimo_ms:
+                self._ultimo_ms, self._sequencia = agora, 0
+            else:
+                # Mesmo milissegundo ou relógio atrasado: segue a partir do último
+                self._sequencia += 1
+                if self._sequencia == MAX_SEQUENCIA:
+                    self._ultimo_ms, self._sequencia = self._ultimo_ms + 1, 0
+            return (
+                PREFIXO + base36(self._ultimo_ms, LARGURA_TEMPO) + self._no
+                + base36(self._sequencia, LARGURA_SEQUENCIA)
+            )
+
+
+_gerador = None
+_trava_no = None
+_lock_processo = threading.Lock()
+
+
+def _novo_gerador():
+    global _trava_no
+    fixo = os.environ.get('MATRICULA_NO')
+    base = int(fixo or os.environ.get('MATRICULA_NO_BASE', 0))
+    if fcntl is None:
+        return GeradorMatriculas(base if fixo else (base + os.getpid()) % MAX_NO)
+    diretorio = os.environ.get('MATRICULA_LOCK_DIR') or os.path.join(tempfile.gettempdir(), 'gestao-planos-matricula')
+    slot, _trava_no = _reservar_slot(diretorio)
+    return GeradorMatriculas((base + slot) % MAX_NO)
+
+
+def gerar():
+    """Próxima matrícula do processo atual"""
+    global _gerador
+    if _gerador is None:
+        with _lock_processo:
+            if _gerador is None:
+                _gerador = _novo_gerador()
+    return _gerador.gerar()
+
+
+def _depois_do_fork():
+    # O filho herda a trava do pai (mesmo arquivo aberto): reserva um nó próprio no próximo uso
+    global _gerador, _trava_no, _lock_processo
+    _gerador = _trava_no = None
+    _lock_processo = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_depois_do_fork)
@@ -0,0 +1,198 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import Response, current_app, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PREFIXO = 'gestao_planos'
+FAIXAS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+FAIXAS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histograma:
+    """Histograma cumulativo no formato do Prometheus"""
+
+    def __init__(self, faixas):
+        self.faixas = faixas
+        self.contagens = [0] * len(faixas)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        for indice, limite in enumerate(self.faixas):
+            if valor <= limite:
+                self.contagens[indice] += 1
+        self.soma += valor
+        self.total += 1
+
+
+def _rotulos(**rotulos):
+    valores = (
+        str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        for valor in rotulos.values()
+    )
+    return ','.join(f'{nome}="{valor}"' for nome, valor in zip(rotulos, valores))
+
+
+class MetricasRequisicoes:
+    """Métricas por endpoint: latência, consultas SQL e tempo de serialização.
+
+    Os valores ficam na memória do processo; com vários workers, cada um
+    expõe os próprios números em /metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requisicoes = defaultdict(int)  # (endpoint, método, status) -> n
+        self.latencia = {}  # (endpoint, método) -> Histograma
+        self.consultas = {}  # (endpoint, método) -> Histograma de consultas por requisição
+        self.tempo_sql = defaultdict(float)
+        self.tempo_serializacao = defaultdict(float)
+
+    def registrar(self, endpoint, metodo, status, duracao, consultas, tempo_sql, tempo_serializacao):
+        chave = (endpoint, metodo)
+        with self._lock:
+            self.requisicoes[(endpoint, metodo, status)] += 1
+            self.latencia.setdefault(chave, Histograma(FAIXAS_LATENCIA)).observar(duracao)
+            self.consultas.setdefault(chave, Histograma(FAIXAS_CONSULTAS)).observar(consultas)
+            self.tempo_sql[chave] += tempo_sql
+            self.tempo_serializacao[chave] += tempo_serializacao
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)"""
+        linhas = []
+
+        def cabecalho(nome, tipo, descricao):
+            linhas.append(f'# HELP {PREFIXO}_{nome} {descricao}')
+            linhas.append(f'# TYPE {PREFIXO}_{nome} {tipo}')
+
+        def histograma(nome, valores):
+            for (endpoint, metodo), hist in sorted(valores.items()):
+                rotulos = _rotulos(endpoint=endpoint, method=metodo)
+                for limite, contagem in zip(hist.faixas, hist.contagens):
+                    linhas.append(f'{PREFIXO}_{nome}_bucket{{{rotulos},le="{limite}"}} {contagem}')
+                linhas.append(f'{PREFIXO}_{nome}_bucket{{{rotulos},le="+Inf"}} {hist.total}')
+                linhas.append(f'{PREFIXO}_{nome}_sum{{{rotulos}}} {hist.soma}')
+                linhas.append(f'{PREFIXO}_{nome}_count{{{rotulos}}} {hist.total}')
+
+        def contador(nome, valores):
+            for (endpoint, metodo), valor in sorted(valores.items()):
+                linhas.append(f'{PREFIXO}_{nome}{{{_rotulos(endpoint=endpoint, method=metodo)}}} {valor}')
+
+        with self._lock:
+            cabecalho('http_requests_total', 'counter', 'Requisições atendidas por endpoint e status')
+            for (endpoint, metodo, status), valor in sorted(self.requisicoes.items()):
+                rotulos = _rotulos(endpoint=endpoint, method=metodo, status=status)
+                linhas.append(f'{PREFIXO}_http_requests_total{{{rotulos}}} {valor}')
+
+            cabecalho('http_request_duration_seconds', 'histogram', 'Latência das requisições por endpoint')
+            histograma('http_request_duration_seconds', self.latencia)
+
+            cabecalho('db_queries_per_request', 'histogram', 'Consultas SQL executadas por requisição')
+            histograma('db_queries_per_request', self.consultas)
+
+            cabecalho('db_query_seconds_total', 'counter', 'Tempo total gasto em consultas SQL')
+            contador('db_query_seconds_total', self.tempo_sql)
+
+            cabecalho('serialization_seconds_total', 'counter', 'Tempo total gasto serializando respostas')
+            contador('serialization_seconds_total', self.tempo_serializacao)
+
+        return '\n'.join(linhas) + '\n'
+
+
+class ProvedorJSONMedido(DefaultJSONProvider):
+    """Provedor JSON padrão do Flask que soma o tempo de codificação à requisição"""
+
+    def dumps(self, obj, **kwargs):
+        with cronometro():
+            return super().dumps(obj, **kwargs)
+
+
+def _estado():
+    """Contadores da requisição atual, ou None fora de uma requisição medida"""
+    if not has_request_context():
+        return None
+    return g.get('_metricas')
+
+
+@contextmanager
+def cronometro():
+    """Soma o tempo do bloco ao tempo de serialização da requisição atual"""
+    estado = _estado()
+    if estado is None or estado['serializando']:
+        yield
+        return
+    estado['serializando'] = True
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        estado['serializacao'] += time.perf_counter() - inicio
+        estado['serializando'] = False
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _iniciar_consulta(conexao, cursor, sql, parametros, contexto, executemany):
+    conexao.info.setdefault('_inicio_consultas', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _finalizar_consulta(conexao, cursor, sql, parametros, contexto, executemany):
+    inicios = conexao.info.get('_inicio_consultas')
+    if not inicios:
+        return
+    duracao = time.perf_counter() - inicios.pop()
+    estado = _estado()
+    if estado is not None:
+        estado['consultas'] += 1
+        estado['sql'] += duracao
+
+
+def _iniciar_requisicao():
+    g._metricas = {
+        'inicio': time.perf_counter(), 'consultas': 0, 'sql': 0.0,
+        'serializacao': 0.0, 'serializando': False
+    }
+
+
+def _finalizar_requisicao(resposta):
+    estado = _estado()
+    if estado is None:
+        return resposta
+    duracao = time.perf_counter() - estado['inicio']
+    current_app.extensions['metricas'].registrar(
+        request.endpoint or 'desconhecido', request.method, resposta.status_code,
+        duracao, estado['consultas'], estado['sql'], estado['serializacao']
+    )
+    if current_app.config['METRICAS_SERVER_TIMING']:
+        resposta.headers.add('Server-Timing', ', '.join((
+            f"total;dur={duracao * 1000:.2f}",
+            f"sql;dur={estado['sql'] * 1000:.2f};desc=\"consultas: {estado['consultas']}\"",
+            f"serializacao;dur={estado['serializacao'] * 1000:.2f}",
+        )))
+    return resposta
+
+
+def _exportar_metricas():
+    return Response(
+        current_app.extensions['metricas'].exportar(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+def init_app(app):
+    """Instrumenta as requisições do app e expõe GET /metrics (formato Prometheus)"""
+    app.config.setdefault('METRICAS_ATIVAS', True)
+    app.config.setdefault('METRICAS_SERVER_TIMING', True)
+    if not app.config['METRICAS_ATIVAS']:
+        return
+
+    app.extensions['metricas'] = MetricasRequisicoes()
+    app.json = ProvedorJSONMedido(app)
+    app.before_request(_iniciar_requisicao)
+    app.after_request(_finalizar_requisicao)
+    app.add_url_rule('/metrics', 'metricas', _exportar_metricas)
@@ -0,0 +1,274 @@
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib import colors
+from reportlab.pdfgen import canvas as pdf_canvas
+
+from src.models.beneficiario import Beneficiario
+from src.services.busca import aplicar_filtros
+
+try:
+    from pypdf import PdfReader
+    from pypdf.generic import (
+        ArrayObject, DictionaryObject, IndirectObject, NameObject, StreamObject, create_string_object
+    )
+except ImportError:  # sem pypdf, os lotes são renderizados em sequência num único documento
+    PdfReader = None
+
+# Colunas do relatório, na ordem em que aparecem na tabela
+COLUNAS_PDF = (
+    Beneficiario.matricula, Beneficiario.nome_completo, Beneficiario.cpf,
+    Beneficiario.plano_saude_vinculado, Beneficiario.situacao_cadastral
+)
+CABECALHO_PDF = ['Matrícula', 'Nome Completo', 'CPF', 'Plano de Saúde', 'Situação']
+LOTE_LEITURA = 1000
+
+# Layout: cada página recebe uma tabela própria, já do tamanho da página,
+# com o cabeçalho repetido. Assim o reportlab nunca precisa quebrar uma
+# tabela grande entre páginas (custo superlinear).
+LINHAS_POR_PAGINA = 40
+PAGINAS_POR_LOTE = 50  # páginas renderizadas por tarefa do pool de processos
+MARGEM = 36
+LARGURAS_COLUNAS = [110, 200, 80, 90, 60]
+TITULO = 'Relatório de Beneficiários'
+
+ESTILO_TABELA = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+def consultar_linhas(filtros):
+    """Consulta apenas as colunas do relatório, com os mesmos filtros da listagem"""
+    query = aplicar_filtros(Beneficiario.query.filter_by(ativo=True), filtros)
+    return query.with_entities(*COLUNAS_PDF).order_by(Beneficiario.nome_completo)
+
+
+def _desenhar_pagina(canvas, linhas, numero):
+    largura, altura = letter
+    topo = altura - MARGEM
+    if numero == 1:
+        estilo = getSampleStyleSheet()['h1']
+        canvas.setFont(estilo.fontName, estilo.fontSize)
+        canvas.drawCentredString(largura / 2, topo - estilo.fontSize, TITULO)
+        topo -= estilo.fontSize + estilo.spaceAfter + 12
+
+    tabela = Table([CABECALHO_PDF] + list(linhas), colWidths=LARGURAS_COLUNAS)
+    tabela.setStyle(ESTILO_TABELA)
+    _, altura_tabela = tabela.wrapOn(canvas, largura - 2 * MARGEM, topo - MARGEM)
+    tabela.drawOn(canvas, MARGEM, topo - altura_tabela)
+
+    canvas.setFont('Helvetica', 8)
+    canvas.drawRightString(largura - MARGEM, MARGEM / 2, f'Página {numero}')
+    canvas.showPage()
+
+
+def _paginas(linhas):
+    """Divide as linhas em listas do tamanho de uma página"""
+    iterador = iter(linhas)
+    while True:
+        pagina = [tuple(linha) for linha in islice(iterador, LINHAS_POR_PAGINA)]
+        if not pagina:
+            return
+        yield pagina
+
+
+def renderizar_lote(paginas, primeira_pagina):
+    """Renderiza um lote de páginas em um PDF independente (executado no pool)"""
+    buffer = io.BytesIO()
+    canvas = pdf_canvas.Canvas(buffer, pagesize=letter)
+    canvas.setTitle(TITULO)
+    for deslocamento, pagina in enumerate(paginas):
+        _desenhar_pagina(canvas, pagina, primeira_pagina + deslocamento)
+    canvas.save()
+    return buffer.getvalue()
+
+
+def _lotes(linhas):
+    """Agrupa as páginas em lotes de PAGINAS_POR_LOTE, numerando a primeira de cada lote"""
+    paginas = _paginas(linhas)
+    primeira = 1
+    while True:
+        lote = list(islice(paginas, PAGINAS_POR_LOTE))
+        if not lote:
+            return
+        yield lote, primeira
+        primeira += len(lote)
+
+
+class ConcatenadorPdf:
+    """Concatena PDFs no arquivo de saída à medida que chegam, sem acumular páginas.
+
+    Os objetos de cada documento são renumerados e gravados em seguida; da
+    saída só ficam na memória o deslocamento de cada objeto (tabela xref) e o
+    número dos objetos de página. A árvore de páginas, o catálogo e as
+    informações do documento são gravados em finalizar().
+    """
+
+    CATALOGO, PAGINAS, INFO = 1, 2, 3
+
+    def __init__(self, saida):
+        self.saida = saida
+        self.posicao = 0
+        self.deslocamentos = {}
+        self.paginas = []
+        self.proximo_id = self.INFO + 1
+        self._escrever(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _escrever(self, dados):
+        self.saida.write(dados)
+        self.posicao += len(dados)
+
+    def _novo_id(self):
+        self.proximo_id += 1
+        return self.proximo_id - 1
+
+    def _gravar(self, numero, objeto):
+        buffer = io.BytesIO()
+        objeto.write_to_stream(buffer)
+        self.deslocamentos[numero] = self.posicao
+        self._escrever(f'{numero} 0 obj\n'.encode() + buffer.getvalue() + b'\nendobj\n')
+
+    def _copiar(self, valor, mapa, pendentes):
+        """Cópia com as referências trocadas pelos números da saída; referências novas vão para `pendentes`"""
+        if isinstance(valor, IndirectObject):
+            chave = (valor.idnum, valor.generation)
+            if chave not in mapa:
+                mapa[chave] = self._novo_id()
+                pendentes.append(valor)
+            return IndirectObject(mapa[chave], 0, None)
+        if isinstance(valor, DictionaryObject):
+            copia = valor.__class__()
+            for nome, item in valor.items():
+                if nome != '/Length':
+                    copia[nome] = self._copiar(item, mapa, pendentes)
+            if isinstance(valor, StreamObject):
+                copia._data = valor._data  # conteúdo ainda codificado (/Filter copiado acima)
+            return copia
+        if isinstance(valor, ArrayObject):
+            return ArrayObject(self._copiar(item, mapa, pendentes) for item in valor)
+        return valor
+
+    def anexar(self, documento):
+        """Grava as páginas de `documento` (bytes de um PDF) no fim da saída"""
+        leitor = PdfReader(io.BytesIO(documento))
+        mapa, pendentes = {}, []
+        for pagina in leitor.pages:
+            # As páginas trazem os atributos herdados (MediaBox, Resources); o pai passa a ser a árvore da saída
+            numero = mapa[(pagina.indirect_reference.idnum, pagina.indirect_reference.generation)] = self._novo_id()
+            self.paginas.append(numero)
+            copia = self._copiar(DictionaryObject(
+                (nome, valor) for nome, valor in pagina.items() if nome != '/Parent'
+            ), mapa, pendentes)
+            copia[NameObject('/Parent')] = IndirectObject(self.PAGINAS, 0, None)
+            self._gravar(numero, copia)
+        while pendentes:
+            referencia = pendentes.pop()
+            self._gravar(mapa[(referencia.idnum, referencia.generation)],
+                         self._copiar(referencia.get_object(), mapa, pendentes))
+
+    def finalizar(self, titulo):
+        self.deslocamentos[self.PAGINAS] = self.posicao
+        self._escrever(f'{self.PAGINAS} 0 obj\n<< /Type /Pages /Count {len(self.paginas)} /Kids [\n'.encode())
+        for inicio in range(0, len(self.paginas), 1000):
+            self._escrever(' '.join(f'{n} 0 R' for n in self.paginas[inicio:inicio + 1000]).encode() + b'\n')
+        self._escrever(b'] >>\nendobj\n')
+        self.deslocamentos[self.CATALOGO] = self.posicao
+        self._escrever(f'{self.CATALOGO} 0 obj\n<< /Type /Catalog /Pages {self.PAGINAS} 0 R >>\nendobj\n'.encode())
+        info = DictionaryObject({NameObject('/Title'): create_string_object(titulo)})
+        self._gravar(self.INFO, info)
+
+        inicio_xref = self.posicao
+        total = self.proximo_id
+        self._escrever(f'xref\n0 {total}\n0000000000 65535 f \n'.encode())
+        for numero in range(1, total):
+            self._escrever(f'{self.deslocamentos[numero]:010d} 00000 n \n'.encode())
+        self._escrever(
+            f'trailer\n<< /Size {total} /Root {self.CATALOGO} 0 R /Info {self.INFO} 0 R >>\n'
+            f'startxref\n{inicio_xref}\n%%EOF\n'.encode()
+        )
+
+
+def gerar_pdf(linhas, destino, total=None, progresso=None, workers=None):
+    """Gera o relatório de beneficiários em `destino` (caminho ou arquivo binário).
+
+    As linhas são lidas em lotes de PAGINAS_POR_LOTE páginas; cada lote é
+    renderizado num processo do pool e gravado no destino assim que chega
+    (ConcatenadorPdf), na ordem, então a memória é limitada pelo tamanho do
+    lote e não pelo do relatório. Com um único worker os lotes são
+    renderizados no processo atual, da mesma forma. Com um só lote ou sem
+    pypdf, renderiza tudo num único documento. `progresso`, se informado,
+    recebe a fração concluída (0 a 1).
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    linhas_por_lote = LINHAS_POR_PAGINA * PAGINAS_POR_LOTE
+    lotes = _lotes(linhas)
+    # Relatórios de um só lote não compensam renderizar por partes
+    primeiros = list(islice(lotes, 2))
+    lotes = chain(primeiros, lotes)
+
+    def informar(lotes_concluidos):
+        if progresso and total:
+            progresso(min(1.0, lotes_concluidos * linhas_por_lote / total))
+
+    if PdfReader is None or len(primeiros) < 2:
+        canvas = pdf_canvas.Canvas(destino, pagesize=letter)
+        canvas.setTitle(TITULO)
+        concluidos = 0
+        for paginas, primeira in lotes:
+            for deslocamento, pagina in enumerate(paginas):
+                _desenhar_pagina(canvas, pagina, primeira + deslocamento)
+            concluidos += 1
+            informar(concluidos)
+        if not concluidos:
+            _desenhar_pagina(canvas, [], 1)
+        canvas.save()
+    else:
+        saida = open(destino, 'wb') if isinstance(destino, (str, os.PathLike)) else destino
+        try:
+            concatenador = ConcatenadorPdf(saida)
+            concluidos = 0
+            if workers <= 1:
+                for paginas, primeira in lotes:
+                    concatenador.anexar(renderizar_lote(paginas, primeira))
+                    concluidos += 1
+                    informar(concluidos)
+            else:
+                pendentes = []
+
+                def anexar(futuro):
+                    nonlocal concluidos
+                    concatenador.anexar(futuro.result())
+                    concluidos += 1
+                    informar(concluidos)
+
+                # 'spawn' evita herdar threads e conexões do processo web
+                contexto = multiprocessing.get_context('spawn')
+                with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as pool:
+                    for paginas, primeira in lotes:
+                        pendentes.append(pool.submit(renderizar_lote, paginas, primeira))
+                        # Limita os lotes em memória: no máximo dois por worker
+                        if len(pendentes) >= 2 * workers:
+                            anexar(pendentes.pop(0))
+                    for futuro in pendentes:
+                        anexar(futuro)
+            concatenador.finalizar(TITULO)
+        finally:
+            if saida is not destino:
+                saida.close()
+
+    if progresso:
+        progresso(1.0)
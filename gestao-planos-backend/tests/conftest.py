@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import create_app, inicializar_banco  # noqa: E402
+
+
+def gerar_cpf(numero):
+    """CPF válido (com pontuação) derivado de um número"""
+    digitos = [int(c) for c in f'{100000000 + numero * 7919:09d}'[-9:]]
+    for tamanho in (9, 10):
+        resto = sum(d * (tamanho + 1 - i) for i, d in enumerate(digitos)) % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    cpf = ''.join(map(str, digitos))
+    return f'{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}'
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App com um banco SQLite novo, criado como pelo `flask init-db`"""
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}",
+        'EXPORTACAO_DIRETORIO': str(tmp_path / 'exportacoes'),
+        'HISTORICO_ARQUIVO_DIR': str(tmp_path / 'arquivo_historico'),
+        'TESTING': True,
+    })
+    with app.app_context():
+        inicializar_banco()
+        yield app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def dados_beneficiario():
+    """Fábrica de payloads válidos de POST /api/beneficiarios (CPF único por número)"""
+    def fabrica(numero, **campos):
+        dados = {
+            'nome_completo': f'José Conceição {numero:05d}', 'data_nascimento': '1990-01-01', 'sexo': 'M',
+            'cpf': gerar_cpf(numero), 'rg': '1234567', 'orgao_emissor_rg': 'SSP',
+            'data_emissao_rg': '2010-01-01', 'nome_mae': 'Maria Silva', 'estado_civil': 'Solteiro',
+            'nacionalidade': 'Brasileira', 'logradouro': 'Rua das Flores', 'numero_endereco': '10',
+            'bairro': 'Centro', 'cidade': 'São Paulo', 'uf': 'SP', 'cep': '01001-000',
+            'telefone_celular': '11999999999', 'email': f'benef{numero}@exemplo.com',
+            'plano_saude_vinculado': 'Plano Ouro', 'data_inicio_cobertura': '2020-01-01',
+            'tipo_beneficiario': 'Titular', 'numero_carteira_plano': 'CART12345',
+            'data_adesao_plano': '2020-01-01', 'situacao_cadastral': 'Ativo',
+        }
+        dados.update(campos)
+        return dados
+    return fabrica
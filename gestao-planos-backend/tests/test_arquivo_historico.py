@@ -0,0 +1,84 @@
+"""Histórico arquivado em partições mensais, lido junto com o banco principal"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from src.database.database import db
+from src.models.beneficiario import Beneficiario, HistoricoBeneficiario
+from src.services import arquivo_historico
+from src.services.arquivo_historico import ArquivoHistorico
+
+
+def envelhecer(beneficiario_id, inicio, intervalo_dias):
+    """Move a criação e o histórico do beneficiário para o passado, um registro por intervalo"""
+    db.session.execute(update(Beneficiario).where(Beneficiario.id == beneficiario_id).values(data_criacao=inicio))
+    registros = HistoricoBeneficiario.query.filter_by(beneficiario_id=beneficiario_id) \
+        .order_by(HistoricoBeneficiario.id).all()
+    for n, registro in enumerate(registros):
+        registro.data_alteracao = inicio + timedelta(days=intervalo_dias * n, seconds=n)
+    db.session.commit()
+
+
+@pytest.fixture
+def arquivados(app, client, dados_beneficiario):
+    """Dois beneficiários com histórico antigo arquivado e um recente, sem arquivo"""
+    ids = [client.post('/api/beneficiarios', json=dados_beneficiario(n)).get_json()['id'] for n in range(3)]
+    for n in range(3):
+        client.put(f'/api/beneficiarios/{ids[0]}', json={'telefone_celular': f'1198888000{n}'})
+        client.put(f'/api/beneficiarios/{ids[1]}', json={'telefone_celular': f'1197777000{n}'})
+    envelhecer(ids[0], datetime(2022, 3, 10), 40)
+    envelhecer(ids[1], datetime(2023, 1, 10), 40)
+    antes = {i: client.get(f'/api/beneficiarios/{i}/historico').get_json() for i in ids}
+
+    resultado = app.test_cli_runner().invoke(args=['arquivar-historico'])
+    assert '8 registros' in resultado.output
+    return ids, antes
+
+
+@pytest.fixture
+def abertos(monkeypatch):
+    """Arquivos abertos pelas consultas ao arquivo"""
+    caminhos = []
+    original = ArquivoHistorico._engine_leitura
+
+    def registrar(self, caminho):
+        caminhos.append(os.path.basename(caminho))
+        return original(self, caminho)
+
+    monkeypatch.setattr(ArquivoHistorico, '_engine_leitura', registrar)
+    return caminhos
+
+
+def test_historico_igual_antes_e_depois_do_arquivamento(client, arquivados):
+    ids, antes = arquivados
+    for beneficiario_id in ids:
+        assert client.get(f'/api/beneficiarios/{beneficiario_id}/historico').get_json() == antes[beneficiario_id]
+
+
+def test_beneficiario_recente_nao_abre_o_arquivo(client, arquivados, abertos):
+    ids, _ = arquivados
+    assert client.get(f'/api/beneficiarios/{ids[2]}/historico').status_code == 200
+    assert abertos == []
+
+
+def test_so_abre_os_meses_do_beneficiario(client, arquivados, abertos):
+    ids, antes = arquivados
+    assert client.get(f'/api/beneficiarios/{ids[0]}/historico').get_json() == antes[ids[0]]
+    particoes = [nome for nome in abertos if nome != 'indice.db']
+    assert particoes and all(nome.startswith('historico_2022_') for nome in particoes)
+
+
+def test_arquivo_sem_indice_e_reindexado(app, client, arquivados, abertos):
+    ids, antes = arquivados
+    os.remove(arquivo_historico.arquivo().caminho_indice)
+    # Sem índice (arquivos de versões anteriores) todas as partições são consultadas
+    assert client.get(f'/api/beneficiarios/{ids[1]}/historico').get_json() == antes[ids[1]]
+
+    app.test_cli_runner().invoke(args=['arquivar-historico'])
+    # Criação e três alterações, a cada 40 dias desde 10/01/2023
+    assert arquivo_historico.arquivo().meses_do_beneficiario(ids[1]) == [
+        datetime(2023, 5, 1), datetime(2023, 3, 1), datetime(2023, 2, 1), datetime(2023, 1, 1)
+    ]
@@ -0,0 +1,38 @@
+"""Busca livre (q) e filtros da listagem pelo índice FTS5"""
+
+import pytest
+
+from src.services import busca
+
+
+@pytest.fixture
+def beneficiarios(app, client, dados_beneficiario):
+    if not busca.indice_ativo():
+        pytest.skip('SQLite sem FTS5/trigram')
+    return [client.post('/api/beneficiarios', json=dados_beneficiario(n)).get_json() for n in range(5)]
+
+
+def ids_da_busca(client, **args):
+    resposta = client.get('/api/beneficiarios', query_string=args)
+    assert resposta.status_code == 200
+    return [b['id'] for b in resposta.get_json()['beneficiarios']]
+
+
+@pytest.mark.parametrize('formato', [
+    lambda cpf: cpf,
+    lambda cpf: busca.normalizar_documento(cpf),
+    lambda cpf: cpf[:7],
+    lambda cpf: cpf[4:11],
+], ids=['completo', 'so_digitos', 'inicio_pontuado', 'meio_pontuado'])
+def test_busca_livre_por_cpf_com_ou_sem_pontuacao(client, beneficiarios, formato):
+    alvo = beneficiarios[2]
+    assert ids_da_busca(client, q=formato(alvo['cpf']))[0] == alvo['id']
+
+
+def test_busca_livre_por_nome_sem_acento(client, beneficiarios):
+    assert len(ids_da_busca(client, q='jose conceicao')) == 5
+
+
+def test_filtro_cpf_com_pontuacao(client, beneficiarios):
+    alvo = beneficiarios[1]
+    assert ids_da_busca(client, cpf=alvo['cpf']) == [alvo['id']]
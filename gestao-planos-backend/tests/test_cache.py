@@ -0,0 +1,60 @@
+"""Cache de respostas: gravações invalidam as listagens já guardadas"""
+
+import pytest
+
+from src.services import cache
+
+
+@pytest.fixture
+def cache_respostas(app):
+    return cache.respostas()
+
+
+def listar(client, **args):
+    resposta = client.get('/api/beneficiarios', query_string=args)
+    assert resposta.status_code == 200
+    return resposta
+
+
+def acertos_lista(cache_respostas):
+    return cache_respostas.acertos['lista']
+
+
+def test_listagem_repetida_vem_do_cache(client, cache_respostas, dados_beneficiario):
+    client.post('/api/beneficiarios', json=dados_beneficiario(0))
+    primeira = listar(client)
+    segunda = listar(client)
+    assert acertos_lista(cache_respostas) == 1
+    assert segunda.get_data() == primeira.get_data()
+
+
+def test_post_invalida_listagem_em_cache(client, cache_respostas, dados_beneficiario):
+    client.post('/api/beneficiarios', json=dados_beneficiario(0))
+    etag = listar(client).headers['ETag'].removeprefix('W/').strip('"')
+    chave = cache_respostas.chave_lista(etag)
+    assert cache_respostas.backend.obter(chave) is not None
+
+    novo = client.post('/api/beneficiarios', json=dados_beneficiario(1)).get_json()
+
+    # A mesma ETag já não encontra a entrada antiga (nova geração das listagens)
+    assert cache_respostas.backend.obter(cache_respostas.chave_lista(etag)) is None
+    ids = [b['id'] for b in listar(client).get_json()['beneficiarios']]
+    assert novo['id'] in ids
+    assert acertos_lista(cache_respostas) == 0
+
+
+def test_put_invalida_listagem_e_beneficiario_em_cache(client, cache_respostas, dados_beneficiario):
+    criado = client.post('/api/beneficiarios', json=dados_beneficiario(0)).get_json()
+    listar(client)
+    client.get(f"/api/beneficiarios/{criado['id']}")
+    geracao = cache_respostas._geracao('lista')
+
+    resposta = client.put(f"/api/beneficiarios/{criado['id']}", json={'nome_completo': 'Joana Atualizada'})
+    assert resposta.status_code == 200
+
+    assert cache_respostas._geracao('lista') != geracao
+    nomes = [b['nome_completo'] for b in listar(client).get_json()['beneficiarios']]
+    assert nomes == ['Joana Atualizada']
+    assert client.get(f"/api/beneficiarios/{criado['id']}").get_json()['nome_completo'] == 'Joana Atualizada'
+    assert acertos_lista(cache_respostas) == 0
+    assert cache_respostas.acertos['beneficiario'] == 0
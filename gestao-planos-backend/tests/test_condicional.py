@@ -0,0 +1,53 @@
+"""GET condicional: 304 com If-None-Match e nova ETag após gravações"""
+
+import pytest
+
+from src.routes.beneficiario_simple import MIME_COLUNAR
+
+
+@pytest.fixture
+def beneficiario(client, dados_beneficiario):
+    return client.post('/api/beneficiarios', json=dados_beneficiario(0)).get_json()
+
+
+@pytest.fixture
+def urls(beneficiario):
+    return [
+        '/api/beneficiarios',
+        f"/api/beneficiarios/{beneficiario['id']}",
+        f"/api/beneficiarios/{beneficiario['id']}/historico",
+    ]
+
+
+def test_if_none_match_responde_304_sem_corpo(client, urls):
+    for url in urls:
+        primeira = client.get(url)
+        assert primeira.status_code == 200
+        etag = primeira.headers['ETag']
+        assert primeira.headers['Cache-Control'] == 'no-cache'
+
+        repetida = client.get(url, headers={'If-None-Match': etag})
+        assert repetida.status_code == 304, url
+        assert repetida.get_data() == b''
+        assert repetida.headers['ETag'] == etag
+
+
+def test_put_gera_nova_etag(client, beneficiario, urls):
+    antigas = {url: client.get(url).headers['ETag'] for url in urls}
+
+    resposta = client.put(f"/api/beneficiarios/{beneficiario['id']}", json={'telefone_celular': '11988887777'})
+    assert resposta.status_code == 200
+
+    for url, etag in antigas.items():
+        atual = client.get(url, headers={'If-None-Match': etag})
+        assert atual.status_code == 200, url
+        assert atual.headers['ETag'] != etag
+        assert client.get(url, headers={'If-None-Match': atual.headers['ETag']}).status_code == 304
+
+
+def test_etag_varia_com_parametros_e_formato(client, beneficiario):
+    etag = client.get('/api/beneficiarios').headers['ETag']
+    assert client.get('/api/beneficiarios', query_string={'per_page': 5}).headers['ETag'] != etag
+    colunar = client.get('/api/beneficiarios', headers={'Accept': MIME_COLUNAR})
+    assert colunar.headers['ETag'] != etag
+    assert client.get('/api/beneficiarios', headers={'If-None-Match': colunar.headers['ETag']}).status_code == 200
@@ -0,0 +1,40 @@
+"""Manifesto dos estáticos: o boot só lê as variantes pré-comprimidas"""
+
+import gzip
+
+from src.services import estaticos
+
+
+def criar_build(diretorio):
+    (diretorio / 'assets').mkdir(parents=True)
+    conteudo = b'console.log("gest\xc3\xa3o de planos");\n' * 200
+    (diretorio / 'assets' / 'index-C_yrbXCG.js').write_bytes(conteudo)
+    (diretorio / 'index.html').write_bytes(b'<!doctype html><div id="root"></div>')
+    return conteudo
+
+
+def test_manifesto_nao_gera_variantes_no_boot(app, tmp_path):
+    criar_build(tmp_path / 'static')
+    manifesto = estaticos.ManifestoEstaticos(str(tmp_path / 'static'), 3600)
+
+    assert sorted(p.name for p in (tmp_path / 'static' / 'assets').iterdir()) == ['index-C_yrbXCG.js']
+    assert manifesto.obter('assets/index-C_yrbXCG.js')[3] == {}
+
+
+def test_variantes_do_deploy_sao_servidas(app, tmp_path):
+    conteudo = criar_build(tmp_path / 'static')
+    assert estaticos.comprimir_diretorio(str(tmp_path / 'static')) >= 1
+    app.extensions['estaticos'] = estaticos.ManifestoEstaticos(str(tmp_path / 'static'), 3600)
+    client = app.test_client()
+
+    resposta = client.get('/assets/index-C_yrbXCG.js', headers={'Accept-Encoding': 'gzip'})
+    corpo = resposta.get_data()
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert int(resposta.headers['Content-Length']) == len(corpo)
+    assert gzip.decompress(corpo) == conteudo
+    resposta.close()
+
+    # Faixas continuam valendo no original, sem recompressão por requisição
+    resposta = client.get('/assets/index-C_yrbXCG.js', headers={'Range': 'bytes=0-9'})
+    assert resposta.status_code == 206 and resposta.get_data() == conteudo[:10]
+    resposta.close()
@@ -0,0 +1,75 @@
+"""Importação em lote (POST /api/beneficiarios/import) e o relatório de erros"""
+
+import csv
+import io
+import json
+
+from src.models.beneficiario import Beneficiario
+
+URL = '/api/beneficiarios/import'
+
+
+def importar(client, conteudo, nome='beneficiarios.ndjson', **args):
+    return client.post(
+        URL, query_string=args, content_type='multipart/form-data',
+        data={'arquivo': (io.BytesIO(conteudo.encode('utf-8')), nome)}
+    )
+
+
+def ndjson(*linhas):
+    return ''.join((linha if isinstance(linha, str) else json.dumps(linha)) + '\n' for linha in linhas)
+
+
+def test_relatorio_aponta_linhas_rejeitadas(client, dados_beneficiario):
+    titular = dados_beneficiario(1)
+    dependente = {**dados_beneficiario(2, grau_parentesco='Filho(a)'),
+                  'tipo_beneficiario': 'Dependente', 'cpf_titular': titular['cpf']}
+    conteudo = ndjson(
+        titular,                                                # 1: importado
+        '{"nome_completo": ',                                   # 2: JSON inválido
+        '[1, 2]',                                               # 3: não é objeto
+        dados_beneficiario(3, cpf='111.111.111-11'),            # 4: CPF inválido
+        dependente,                                             # 5: titular do mesmo arquivo, outro lote
+        dados_beneficiario(4, cpf=titular['cpf']),              # 6: titular duplicado
+        {**dependente, 'cpf_titular': '999.999.999-99'},        # 7: titular inexistente
+        {**dependente, 'grau_parentesco': None},                # 8: sem grau de parentesco
+    )
+
+    resposta = importar(client, conteudo, lote=2)
+    assert resposta.status_code == 200
+    relatorio = resposta.get_json()
+    assert relatorio['total_linhas'] == 8
+    assert relatorio['importados'] == 2
+    assert relatorio['rejeitados'] == 6
+    erros = {erro['linha']: erro['erros'] for erro in relatorio['erros']}
+    assert [erro['linha'] for erro in relatorio['erros']] == [2, 3, 4, 6, 7, 8]
+    assert erros[2] == {'_linha': ['JSON inválido']}
+    assert erros[3] == {'_linha': ['Cada linha deve ser um objeto JSON']}
+    assert 'cpf' in erros[4]
+    assert erros[6] == {'cpf': ['CPF já cadastrado como titular']}
+    assert erros[7] == {'cpf_titular': ['Titular não encontrado ou inativo']}
+    assert 'grau_parentesco' in erros[8]
+
+    importados = Beneficiario.query.order_by(Beneficiario.id).all()
+    assert [b.tipo_beneficiario for b in importados] == ['Titular', 'Dependente']
+    assert importados[1].id_titular == importados[0].id
+
+
+def test_csv_usa_numero_da_linha_do_arquivo(client, dados_beneficiario):
+    registros = [dados_beneficiario(1), dados_beneficiario(2, email='invalido')]
+    saida = io.StringIO()
+    escritor = csv.DictWriter(saida, fieldnames=list(registros[0]))
+    escritor.writeheader()
+    escritor.writerows(registros)
+
+    relatorio = importar(client, saida.getvalue(), nome='beneficiarios.csv').get_json()
+    assert (relatorio['importados'], relatorio['rejeitados']) == (1, 1)
+    # Linha 1 é o cabeçalho
+    assert relatorio['erros'][0]['linha'] == 3
+    assert 'email' in relatorio['erros'][0]['erros']
+
+
+def test_requisicao_invalida(client):
+    assert client.post(URL).status_code == 400
+    assert importar(client, ndjson({}), formato='xml').status_code == 400
+    assert importar(client, ndjson({}), lote=0).status_code == 400
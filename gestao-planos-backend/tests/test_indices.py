@@ -0,0 +1,51 @@
+"""Planos de execução (EXPLAIN QUERY PLAN) das consultas da listagem e do histórico"""
+
+from src.database.database import db
+from src.models.beneficiario import Beneficiario
+from src.routes.beneficiario_simple import consulta_historico, filtros_historico
+from src.services.busca import aplicar_filtros
+
+
+def plano(consulta):
+    """Linhas de detalhe do EXPLAIN QUERY PLAN da consulta (valores literais)"""
+    sql = consulta.compile(db.engine, compile_kwargs={'literal_binds': True})
+    with db.engine.connect() as conexao:
+        return [linha[-1] for linha in conexao.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+
+
+def listagem(args):
+    query = aplicar_filtros(Beneficiario.query.filter_by(ativo=True), args)
+    return query.order_by(Beneficiario.nome_completo).limit(10).offset(20).statement
+
+
+def assert_usa_indice(detalhes, tabela, indice):
+    assert any(d.startswith(f'SEARCH {tabela} USING INDEX {indice} ') for d in detalhes), detalhes
+    assert not any(d.startswith('SCAN') for d in detalhes), detalhes
+    # A ordem do índice atende ao ORDER BY, sem ordenação temporária
+    assert not any('TEMP B-TREE' in d for d in detalhes), detalhes
+
+
+def test_listagem_ativos_usa_indice_de_nome(app):
+    assert_usa_indice(plano(listagem({})), 'beneficiarios', 'ix_beneficiarios_ativo_nome')
+
+
+def test_listagem_por_tipo_usa_indice_ativo_tipo_nome(app):
+    detalhes = plano(listagem({'tipo': 'Titular'}))
+    assert_usa_indice(detalhes, 'beneficiarios', 'ix_beneficiarios_ativo_tipo_nome')
+
+
+def test_listagem_por_situacao_usa_indice_ativo_situacao_nome(app):
+    detalhes = plano(listagem({'situacao': 'Suspenso'}))
+    assert_usa_indice(detalhes, 'beneficiarios', 'ix_beneficiarios_ativo_situacao_nome')
+
+
+def test_historico_usa_indice_por_beneficiario_e_data(app):
+    detalhes = plano(consulta_historico(1, [], 101))
+    assert_usa_indice(detalhes, 'historico_beneficiarios', 'ix_historico_beneficiario_data_id')
+
+
+def test_historico_paginado_usa_faixa_do_indice(app):
+    condicoes, _, _ = filtros_historico(since='2026-01-01', until='2026-06-01')
+    detalhes = plano(consulta_historico(1, condicoes, 101))
+    assert_usa_indice(detalhes, 'historico_beneficiarios', 'ix_historico_beneficiario_data_id')
+    assert any('data_alteracao>? AND data_alteracao<?' in d for d in detalhes), detalhes
@@ -0,0 +1,35 @@
+"""Listagens codificadas pelo orjson: mesmos bytes do jsonify (provedor padrão)"""
+
+import pytest
+from flask import jsonify
+
+from src.services import json_rapido
+
+pytest.importorskip('orjson')
+
+
+def test_resposta_igual_ao_jsonify_com_acentos(app):
+    registro = {
+        'nome_completo': 'João Conceição Müller', 'cidade': 'São Paulo', 'emoji': 'ok 😀',
+        'controle': 'a\x00\x1f\t\n"\\/\x7f', 'ativo': True, 'id': 7, 'complemento': None,
+        'lista': [1, 'ç', {'b': 1, 'a': 'ã'}],
+    }
+    with app.test_request_context():
+        assert json_rapido.resposta(registro).get_data() == jsonify(registro).get_data()
+
+
+def test_listagem_tem_os_bytes_do_provedor_padrao(app, client, dados_beneficiario):
+    for numero in range(3):
+        assert client.post('/api/beneficiarios', json=dados_beneficiario(numero)).status_code == 201
+
+    resposta = client.get('/api/beneficiarios')
+
+    assert resposta.status_code == 200
+    assert b'\\u00e3' in resposta.data  # "São Paulo" escapado como no ensure_ascii
+    with app.test_request_context():
+        assert resposta.data == jsonify(resposta.get_json()).get_data()
+
+
+def test_inteiro_grande_volta_ao_jsonify(app):
+    with app.test_request_context():
+        assert json_rapido.resposta({'n': 2 ** 70}).get_data() == jsonify({'n': 2 ** 70}).get_data()
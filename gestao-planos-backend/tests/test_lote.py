@@ -0,0 +1,78 @@
+"""Inclusão em lote (POST /api/beneficiarios:batch)"""
+
+import pytest
+
+from src.models.beneficiario import Beneficiario
+
+URL = '/api/beneficiarios:batch'
+
+
+@pytest.fixture
+def dependente(dados_beneficiario):
+    def fabrica(numero):
+        return dados_beneficiario(numero, grau_parentesco='Filho(a)')
+    return fabrica
+
+
+@pytest.fixture
+def titular(client, dados_beneficiario):
+    return client.post('/api/beneficiarios', json=dados_beneficiario(0)).get_json()
+
+
+def total_beneficiarios():
+    return Beneficiario.query.count()
+
+
+def test_cria_titular_e_dependentes(client, dados_beneficiario, dependente):
+    resposta = client.post(URL, json={
+        'titular': dados_beneficiario(1),
+        'dependentes': [dependente(2), dependente(3)],
+    })
+    assert resposta.status_code == 201
+    corpo = resposta.get_json()
+    assert corpo['titular']['tipo_beneficiario'] == 'Titular'
+    assert [d['id_titular'] for d in corpo['dependentes']] == [corpo['titular']['id']] * 2
+    assert {d['tipo_beneficiario'] for d in corpo['dependentes']} == {'Dependente'}
+
+
+def test_inclui_dependentes_em_titular_existente(client, titular, dependente):
+    resposta = client.post(URL, json={'id_titular': titular['id'], 'dependentes': [dependente(1)]})
+    assert resposta.status_code == 201
+    assert resposta.get_json()['dependentes'][0]['id_titular'] == titular['id']
+
+
+def test_lote_vazio_recusado(client, titular):
+    resposta = client.post(URL, json={'id_titular': titular['id'], 'dependentes': []})
+    assert resposta.status_code == 400
+    assert resposta.get_json()['error'].startswith('Lote vazio')
+
+
+def test_lote_acima_do_limite_recusado_antes_da_validacao(app, client, titular):
+    app.config['LOTE_MAX_DEPENDENTES'] = 2
+    # Dependentes inválidos: o limite é verificado antes da validação dos registros
+    resposta = client.post(URL, json={'id_titular': titular['id'], 'dependentes': [{}, {}, {}]})
+    assert resposta.status_code == 400
+    assert resposta.get_json() == {'error': 'O lote aceita no máximo 2 dependentes'}
+    assert total_beneficiarios() == 1
+
+
+def test_cpf_de_titular_duplicado_recusa_o_lote_inteiro(client, titular, dados_beneficiario, dependente):
+    resposta = client.post(URL, json={
+        'titular': dados_beneficiario(1, cpf=titular['cpf']),
+        'dependentes': [dependente(2)],
+    })
+    assert resposta.status_code == 400
+    assert resposta.get_json() == {'error': 'CPF já cadastrado como titular'}
+    assert total_beneficiarios() == 1
+
+
+def test_dependente_invalido_recusa_o_lote_inteiro(client, dados_beneficiario, dependente):
+    resposta = client.post(URL, json={
+        'titular': dados_beneficiario(1),
+        'dependentes': [dependente(2), dados_beneficiario(3)],
+    })
+    assert resposta.status_code == 400
+    assert resposta.get_json()['details'] == {
+        'dependentes': {'1': {'grau_parentesco': ['Grau de parentesco é obrigatório para dependentes']}}
+    }
+    assert total_beneficiarios() == 0
@@ -0,0 +1,61 @@
+"""Gerador de matrículas: formato, ordem em relação às antigas e unicidade entre processos"""
+
+import multiprocessing
+import os
+
+import pytest
+
+from src.database.database import db
+from src.models.beneficiario import Beneficiario
+from src.services import matricula
+
+POR_PROCESSO = 20000
+
+
+def gerar_lote(saida):
+    with open(saida, 'w') as arquivo:
+        arquivo.write('\n'.join(matricula.gerar() for _ in range(POR_PROCESSO)))
+
+
+def test_formato_e_ordem_depois_das_matriculas_antigas():
+    antiga = 'BEN20261017110528A3F1'  # BEN + AAAAMMDDHHMMSS + 4 hexadecimais
+    novas = [matricula.gerar() for _ in range(1000)]
+
+    assert all(len(m) == 20 and m.startswith('BENM') for m in novas)
+    assert novas == sorted(novas) and len(set(novas)) == len(novas)
+    assert min(novas) > antiga
+    assert min(novas) > 'BEN99991231235959FFFF'  # maior matrícula possível no formato antigo
+
+
+def test_novas_matriculas_ficam_depois_das_antigas_no_banco(app, client, dados_beneficiario):
+    antigo = client.post('/api/beneficiarios', json=dados_beneficiario(1)).get_json()
+    Beneficiario.query.filter_by(id=antigo['id']).update({'matricula': 'BEN20261017110528A3F1'})
+    db.session.commit()
+    novo = client.post('/api/beneficiarios', json=dados_beneficiario(2)).get_json()
+
+    ordem = [b.id for b in Beneficiario.query.order_by(Beneficiario.matricula)]
+    assert ordem == [antigo['id'], novo['id']]
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='workers do gunicorn usam fork')
+def test_processos_geram_matriculas_unicas_e_crescentes(tmp_path, monkeypatch):
+    monkeypatch.setenv('MATRICULA_LOCK_DIR', str(tmp_path / 'travas'))
+    # Mesmo valor herdado por todos os processos, como num deploy com vários workers
+    monkeypatch.setenv('MATRICULA_NO', '7')
+    contexto = multiprocessing.get_context('fork')
+    saidas = [tmp_path / f'{n}.txt' for n in range(4)]
+    processos = [contexto.Process(target=gerar_lote, args=(str(saida),)) for saida in saidas]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join()
+        assert processo.exitcode == 0
+
+    todas, nos = set(), set()
+    for saida in saidas:
+        lote = saida.read_text().split('\n')
+        assert lote == sorted(lote)
+        todas.update(lote)
+        nos.update(m[13:16] for m in lote)
+    assert len(todas) == 4 * POR_PROCESSO
+    assert len(nos) == 4
@@ -0,0 +1,71 @@
+"""Paginação da listagem: cursor (next/prev) e limites de per_page"""
+
+import pytest
+
+from src.routes.beneficiario_simple import MAX_POR_PAGINA, codificar_cursor
+
+
+@pytest.fixture
+def beneficiarios(client, dados_beneficiario):
+    """Sete beneficiários, na ordem da listagem (nome_completo, id)"""
+    return [client.post('/api/beneficiarios', json=dados_beneficiario(n)).get_json() for n in range(7)]
+
+
+def pagina(client, **args):
+    resposta = client.get('/api/beneficiarios', query_string=args)
+    assert resposta.status_code == 200
+    return resposta.get_json()
+
+
+def ids(corpo):
+    return [b['id'] for b in corpo['beneficiarios']]
+
+
+def test_cursor_percorre_paginas_para_frente_e_para_tras(client, beneficiarios):
+    esperado = [b['id'] for b in beneficiarios]
+
+    primeira = pagina(client, cursor='', per_page=3)
+    assert ids(primeira) == esperado[:3]
+    assert primeira['prev_cursor'] is None
+    assert 'total' not in primeira
+
+    segunda = pagina(client, cursor=primeira['next_cursor'], per_page=3)
+    assert ids(segunda) == esperado[3:6]
+
+    ultima = pagina(client, cursor=segunda['next_cursor'], per_page=3)
+    assert ids(ultima) == esperado[6:]
+    assert ultima['next_cursor'] is None
+
+    # Voltando a partir da última página
+    assert ids(pagina(client, cursor=ultima['prev_cursor'], per_page=3)) == esperado[3:6]
+    assert ids(pagina(client, cursor=segunda['prev_cursor'], per_page=3)) == esperado[:3]
+
+
+def test_cursor_com_projecao_mantem_chave(client, beneficiarios):
+    primeira = pagina(client, cursor='', per_page=2, fields='cpf')
+    assert 'cpf' in primeira['beneficiarios'][0]
+    segunda = pagina(client, cursor=primeira['next_cursor'], per_page=2, fields='cpf')
+    assert [b['cpf'] for b in segunda['beneficiarios']] == [b['cpf'] for b in beneficiarios[2:4]]
+
+
+@pytest.mark.parametrize('cursor', [
+    'nao-e-base64!',
+    'e30',  # {} em base64
+    codificar_cursor('Nome', 1, 'lado'),
+    codificar_cursor('Nome', 'um', 'next'),
+], ids=['base64_invalido', 'json_sem_lista', 'direcao_invalida', 'id_nao_inteiro'])
+def test_cursor_invalido_responde_400(client, beneficiarios, cursor):
+    resposta = client.get('/api/beneficiarios', query_string={'cursor': cursor})
+    assert resposta.status_code == 400
+    assert resposta.get_json() == {'error': 'Cursor inválido'}
+
+
+@pytest.mark.parametrize('modo', [{}, {'cursor': ''}], ids=['paginas', 'cursor'])
+def test_per_page_limitado_ao_maximo(client, beneficiarios, modo):
+    assert pagina(client, per_page=MAX_POR_PAGINA + 50, **modo)['per_page'] == MAX_POR_PAGINA
+
+
+@pytest.mark.parametrize('per_page', [0, -1])
+def test_per_page_nao_positivo_responde_400(client, per_page):
+    resposta = client.get('/api/beneficiarios', query_string={'per_page': per_page})
+    assert resposta.status_code == 400
@@ -0,0 +1,11 @@
+"""Ponto de entrada WSGI de produção.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+O esquema do banco não é criado aqui: rode `flask --app src.main db upgrade`
+(ou `flask --app src.main init-db`) antes de subir os workers. As migrações
+criam as tabelas num banco vazio e preenchem o índice de busca e o resumo.
+"""
+from src.main import create_app
+
+app = create_app()
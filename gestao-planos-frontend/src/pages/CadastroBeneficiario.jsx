@@ -14,10 +14,98 @@ import {
   Phone, 
   CreditCard,
   AlertCircle,
-  CheckCircle
+  CheckCircle,
+  History
 } from 'lucide-react'
 import { beneficiarioService } from '../services/api'
 
+// Histórico de alterações do beneficiário, paginado pela API (cursor):
+// a primeira página vem ao abrir e as seguintes só quando pedidas
+function HistoricoAlteracoes({ id }) {
+  const [registros, setRegistros] = useState([])
+  const [cursor, setCursor] = useState(null)
+  const [carregando, setCarregando] = useState(false)
+  const [erro, setErro] = useState('')
+
+  const carregarPagina = async (proximoCursor = null) => {
+    try {
+      setCarregando(true)
+      setErro('')
+      const pagina = await beneficiarioService.obterHistorico(id, proximoCursor)
+      setRegistros(prev => (proximoCursor ? [...prev, ...pagina.registros] : pagina.registros))
+      setCursor(pagina.next_cursor)
+    } catch (error) {
+      setErro('Erro ao carregar histórico: ' + error.message)
+    } finally {
+      setCarregando(false)
+    }
+  }
+
+  useEffect(() => {
+    carregarPagina()
+  }, [id])
+
+  const formatarDataHora = (dataString) => {
+    return dataString ? new Date(dataString).toLocaleString('pt-BR') : ''
+  }
+
+  return (
+    <Card>
+      <CardHeader>
+        <CardTitle className="flex items-center">
+          <History className="h-5 w-5 mr-2" />
+          Histórico de Alterações
+        </CardTitle>
+      </CardHeader>
+      <CardContent className="space-y-4">
+        {erro && (
+          <p className="text-red-500 text-sm flex items-center">
+            <AlertCircle className="h-4 w-4 mr-1" />
+            {erro}
+          </p>
+        )}
+
+        {registros.length === 0 && !carregando && !erro && (
+          <p className="text-gray-500 text-sm">Nenhuma alteração registrada.</p>
+        )}
+
+        <ul className="divide-y divide-gray-200">
+          {registros.map((registro) => (
+            <li key={registro.id} className="py-2 text-sm">
+              <div className="flex justify-between text-gray-500">
+                <span>{formatarDataHora(registro.data_alteracao)}</span>
+                <span>{registro.usuario_alteracao}</span>
+              </div>
+              <div className="text-gray-900">
+                <span className="font-medium">{registro.campo_alterado}</span>
+                {registro.valor_antigo !== null && (
+                  <>: {registro.valor_antigo} → {registro.valor_novo}</>
+                )}
+                {registro.valor_antigo === null && registro.valor_novo && (
+                  <>: {registro.valor_novo}</>
+                )}
+              </div>
+            </li>
+          ))}
+        </ul>
+
+        {cursor && (
+          <div className="flex justify-center">
+            <Button
+              type="button"
+              variant="outline"
+              onClick={() => carregarPagina(cursor)}
+              disabled={carregando}
+            >
+              {carregando ? 'Carregando...' : 'Carregar mais'}
+            </Button>
+          </div>
+        )}
+      </CardContent>
+    </Card>
+  )
+}
+
 function CadastroBeneficiario() {
   const { id } = useParams()
   const navigate = useNavigate()
@@ -914,6 +1002,8 @@ function CadastroBeneficiario() {
           </Button>
         </div>
       </form>
+
+      {isEdicao && <HistoricoAlteracoes id={id} />}
     </div>
   )
 }
@@ -3,6 +3,7 @@ import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card.j
 import { Button } from '@/components/ui/button.jsx'
 import { Users, UserPlus, UserCheck, UserX, TrendingUp, FileText } from 'lucide-react'
 import { Link } from 'react-router-dom'
+import { beneficiarioService } from '../services/api'
 
 function Dashboard() {
   const [stats, setStats] = useState({
@@ -16,18 +17,25 @@ function Dashboard() {
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
-    // Simular carregamento de estatísticas
-    // Em uma aplicação real, isso viria da API
-    setTimeout(() => {
-      setStats({
-        totalBeneficiarios: 1250,
-        beneficiariosAtivos: 1180,
-        beneficiariosSuspensos: 45,
-        beneficiariosCancelados: 25,
-        novosCadastros: 23
-      })
-      setLoading(false)
-    }, 1000)
+    const carregarEstatisticas = async () => {
+      try {
+        const dados = await beneficiarioService.estatisticas()
+        const mesAtual = new Date().toISOString().slice(0, 7)
+        setStats({
+          totalBeneficiarios: dados.total,
+          beneficiariosAtivos: dados.por_situacao.Ativo || 0,
+          beneficiariosSuspensos: dados.por_situacao.Suspenso || 0,
+          beneficiariosCancelados: dados.por_situacao.Cancelado || 0,
+          novosCadastros: dados.novos_por_mes[mesAtual] || 0
+        })
+      } catch (error) {
+        console.error('Erro ao carregar estatísticas:', error)
+      } finally {
+        setLoading(false)
+      }
+    }
+
+    carregarEstatisticas()
   }, [])
 
   const statCards = [
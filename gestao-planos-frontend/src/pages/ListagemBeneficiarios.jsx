@@ -20,6 +20,12 @@ import {
 import { Link } from 'react-router-dom'
 import { beneficiarioService } from '../services/api'
 
+// Apenas as colunas exibidas na tabela (parâmetro fields da API)
+const CAMPOS_LISTAGEM = [
+  'id', 'matricula', 'nome_completo', 'email', 'cpf', 'plano_saude_vinculado',
+  'situacao_cadastral', 'tipo_beneficiario', 'data_criacao'
+]
+
 function ListagemBeneficiarios() {
   const [beneficiarios, setBeneficiarios] = useState([])
   const [loading, setLoading] = useState(true)
@@ -47,7 +53,7 @@ function ListagemBeneficiarios() {
       )
       
       const response = await beneficiarioService.listar(
-        filtrosLimpos, 
+        { ...filtrosLimpos, fields: CAMPOS_LISTAGEM.join(',') }, 
         paginacao.page, 
         paginacao.per_page
       )
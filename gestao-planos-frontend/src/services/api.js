@@ -37,13 +37,19 @@ const apiRequest = async (endpoint, options = {}) => {
 // Serviços para Beneficiários
 export const beneficiarioService = {
   // Listar beneficiários com filtros e paginação
-  listar: async (filtros = {}, page = 1, per_page = 10) => {
+  // Se `cursor` for informado (string vazia para a primeira página), usa a
+  // paginação por cursor: a resposta traz next_cursor/prev_cursor e não traz total
+  listar: async (filtros = {}, page = 1, per_page = 10, cursor = null) => {
     const params = new URLSearchParams({
-      page: page.toString(),
       per_page: per_page.toString(),
       ...filtros
     })
-    
+    if (cursor !== null) {
+      params.set('cursor', cursor)
+    } else {
+      params.set('page', page.toString())
+    }
+
     return apiRequest(`/beneficiarios?${params}`)
   },
 
@@ -75,9 +81,35 @@ export const beneficiarioService = {
     })
   },
 
-  // Obter histórico de alterações
-  obterHistorico: async (id) => {
-    return apiRequest(`/beneficiarios/${id}/historico`)
+  // Obter estatísticas agregadas para o dashboard
+  estatisticas: async () => {
+    return apiRequest('/beneficiarios/estatisticas')
+  },
+
+  // Obter uma página do histórico de alterações, da mais recente à mais antiga
+  // A próxima página vem no cabeçalho X-Next-Cursor: a resposta traz os
+  // registros e next_cursor (null na última página), para carregar sob demanda
+  obterHistorico: async (id, cursor = null, per_page = 50) => {
+    const params = new URLSearchParams({ per_page: per_page.toString() })
+    if (cursor) {
+      params.set('cursor', cursor)
+    }
+
+    try {
+      const response = await fetch(`${API_BASE_URL}/beneficiarios/${id}/historico?${params}`)
+      const data = await response.json()
+      if (!response.ok) {
+        throw new Error(data.error || `HTTP error! status: ${response.status}`)
+      }
+
+      return {
+        registros: data,
+        next_cursor: response.headers.get('X-Next-Cursor'),
+      }
+    } catch (error) {
+      console.error('Erro ao obter histórico:', error)
+      throw error
+    }
   },
 
   // Exportar para CSV
@@ -109,26 +141,34 @@ export const beneficiarioService = {
   },
 
   // Exportar para PDF
-  exportarPDF: async (filtros = {}) => {
-    const params = new URLSearchParams(filtros)
-    const url = `${API_BASE_URL}/beneficiarios/export/pdf?${params}`
-    
+  // O relatório é gerado em segundo plano: a exportação é enfileirada, o
+  // status é consultado periodicamente e o arquivo é baixado quando pronto
+  exportarPDF: async (filtros = {}, onProgresso = null) => {
     try {
-      const response = await fetch(url)
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`)
+      let tarefa = await apiRequest('/beneficiarios/export/pdf/jobs', {
+        method: 'POST',
+        body: JSON.stringify({ filtros }),
+      })
+
+      while (tarefa.status === 'pendente' || tarefa.status === 'processando') {
+        if (onProgresso) {
+          onProgresso(tarefa.progresso)
+        }
+        await new Promise((resolve) => setTimeout(resolve, 1000))
+        tarefa = await apiRequest(`/beneficiarios/export/pdf/jobs/${tarefa.id}`)
       }
-      
-      const blob = await response.blob()
-      const downloadUrl = window.URL.createObjectURL(blob)
+
+      if (tarefa.status !== 'concluida') {
+        throw new Error(tarefa.erro || 'Falha ao gerar o PDF')
+      }
+
       const link = document.createElement('a')
-      link.href = downloadUrl
+      link.href = `${API_BASE_URL}/beneficiarios/export/pdf/jobs/${tarefa.id}/download`
       link.download = `beneficiarios_${new Date().toISOString().split('T')[0]}.pdf`
       document.body.appendChild(link)
       link.click()
       link.remove()
-      window.URL.revokeObjectURL(downloadUrl)
-      
+
       return { success: true }
     } catch (error) {
       console.error('Erro ao exportar PDF:', error)